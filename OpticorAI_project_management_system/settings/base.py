@@ -109,6 +109,19 @@ MEDIA_URL = '/media/'
 # Allow overriding MEDIA_ROOT via env (e.g., when using Render Persistent Disk)
 MEDIA_ROOT = Path(os.environ.get('MEDIA_ROOT', BASE_DIR / 'media'))
 
+# Background report exports (run_export_jobs). Without a worker process, set EXPORT_BACKGROUND=false to render in the request.
+# Finished files go to STORAGES['exports'] when defined (needed when web and worker run on different hosts),
+# otherwise to the private EXPORT_ROOT directory; they are kept for EXPORT_JOB_TTL_HOURS.
+EXPORT_BACKGROUND = os.environ.get('EXPORT_BACKGROUND', 'true').lower() == 'true'
+EXPORT_ROOT = Path(os.environ.get('EXPORT_ROOT', BASE_DIR / 'exports'))
+EXPORT_JOB_TTL_HOURS = float(os.environ.get('EXPORT_JOB_TTL_HOURS', '24'))
+# Admission control: pending jobs overall, queued or running jobs per user, jobs of one user rendered at once
+EXPORT_QUEUE_LIMIT = int(os.environ.get('EXPORT_QUEUE_LIMIT', '50'))
+EXPORT_JOBS_PER_USER = int(os.environ.get('EXPORT_JOBS_PER_USER', '3'))
+EXPORT_RUNNING_PER_USER = int(os.environ.get('EXPORT_RUNNING_PER_USER', '1'))
+# Worker processes of run_export_jobs when --workers is not given (the Procfile worker)
+EXPORT_WORKERS = int(os.environ.get('EXPORT_WORKERS', '1'))
+
 # Optional Cloudinary media storage. If CLOUDINARY_URL is set (env or .env), store media on Cloudinary.
 _cloudinary_url = os.environ.get('CLOUDINARY_URL') or env_config('CLOUDINARY_URL', default=None)
 if _cloudinary_url:
@@ -16,3 +16,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'OpticorAI_project_management_system.settings.prod')
 
 application = get_wsgi_application()
+
+# Register the PDF report fonts before the first export (once in a
+# `gunicorn --preload` master, otherwise once per worker)
+from core.utils import pdf  # noqa: E402
+
+pdf.warm_up()
@@ -1,9 +1,40 @@
-from core.models import CustomUser, Task, KPI, QualityType, Notification, TaskEvaluationSettings, TaskPriorityType, EmployeeProgress, Note, NoteReminder, ChatBot, ChatMessage
-from django.contrib import admin
+from core.models import CustomUser, Task, KPI, QualityType, Notification, TaskEvaluationSettings, TaskPriorityType, EmployeeProgress, Note, NoteReminder, ChatBot, ChatMessage, ScheduledJobRun, TaskScoreRollup, MonthlyStatsSnapshot, ExportJob
+from django.contrib import admin, messages
 from django.contrib.auth.admin import UserAdmin
+from core.services.rescore_service import rescore_tasks
 
 # Register your models here.
 
+# Larger rescores belong in `manage.py rescore_tasks`, not in an admin request
+ADMIN_RESCORE_LIMIT = 2000
+
+RESCORE_COMMAND_HINT = "Run `python manage.py rescore_tasks` (`--manager <id>` for one team) to re-score them."
+
+def _run_rescore(modeladmin, request, tasks):
+    evaluated = tasks.filter(evaluation_status='evaluated', quality__isnull=False).count()
+    if evaluated > ADMIN_RESCORE_LIMIT:
+        modeladmin.message_user(
+            request,
+            f"{evaluated} evaluated tasks are too many to re-score from the admin (limit {ADMIN_RESCORE_LIMIT}). "
+            + RESCORE_COMMAND_HINT,
+            messages.WARNING,
+        )
+        return
+    report = rescore_tasks(tasks)
+    modeladmin.message_user(request, report.summary(), messages.SUCCESS)
+
+@admin.action(description='Re-score selected evaluated tasks')
+def rescore_selected_tasks(modeladmin, request, queryset):
+    _run_rescore(modeladmin, request, queryset)
+
+@admin.action(description='Re-score evaluated tasks using the selected types')
+def rescore_tasks_using_quality(modeladmin, request, queryset):
+    _run_rescore(modeladmin, request, Task.objects.filter(quality__in=queryset))
+
+@admin.action(description='Re-score evaluated tasks using the selected priorities')
+def rescore_tasks_using_priority(modeladmin, request, queryset):
+    _run_rescore(modeladmin, request, Task.objects.filter(priority__in=queryset))
+
 class CustomUserAdmin(UserAdmin):
     list_display = ['username', 'email', 'first_name', 'last_name', 'user_type', 'designation', 'is_active']
     list_filter = ['user_type', 'is_active', 'created_date']
@@ -60,6 +91,7 @@ class TaskAdmin(admin.ModelAdmin):
     list_filter = ['priority', 'kpi', 'quality', 'status', 'approval_status', 'evaluation_status', 'created_date', 'updated_date']
     readonly_fields = ['created_date', 'updated_date', 'final_score', 'quality_score_calculated', 'priority_multiplier', 'time_bonus_penalty', 'completion_date']
     list_select_related = ('responsible', 'priority', 'kpi', 'quality', 'created_by')
+    actions = [rescore_selected_tasks]
 
 class KPIAdmin(admin.ModelAdmin):
     list_display = ['name', 'weight', 'is_active', 'sort_order', 'created_by', 'created_at']
@@ -90,6 +122,7 @@ class TaskPriorityTypeAdmin(admin.ModelAdmin):
     list_editable = ['is_active', 'sort_order']
     readonly_fields = ['created_at']
     ordering = ['sort_order', 'name']
+    actions = [rescore_tasks_using_priority]
     
     fieldsets = (
         ('Basic Information', {
@@ -112,6 +145,7 @@ class QualityTypeAdmin(admin.ModelAdmin):
     readonly_fields = ['created_at', 'created_by']
     ordering = ['sort_order', 'name']
     list_select_related = ('created_by',)
+    actions = [rescore_tasks_using_quality]
     
     fieldsets = (
         ('Basic Information', {
@@ -143,6 +177,14 @@ class NotificationAdmin(admin.ModelAdmin):
 class TaskEvaluationSettingsAdmin(admin.ModelAdmin):
     list_display = ['evaluation_formula', 'updated_at']
     readonly_fields = ['created_at', 'updated_at']
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        # Re-scoring every evaluated task takes far longer than a request may
+        self.message_user(
+            request, "New evaluations use these settings; existing task scores are unchanged. " + RESCORE_COMMAND_HINT,
+            messages.INFO,
+        )
     
     def has_add_permission(self, request):
         # Only allow one instance
@@ -161,8 +203,8 @@ admin.site.register(Notification, NotificationAdmin)
 admin.site.register(TaskEvaluationSettings, TaskEvaluationSettingsAdmin)
 
 class EmployeeProgressAdmin(admin.ModelAdmin):
-    list_display = ['employee', 'manager', 'period_start', 'period_end', 'total_progress_score', 'calculation_date']
-    list_filter = ['manager', 'calculation_date', 'period_start', 'period_end']
+    list_display = ['employee', 'manager', 'period_start', 'period_end', 'total_progress_score', 'is_stale', 'calculation_date']
+    list_filter = ['manager', 'is_stale', 'calculation_date', 'period_start', 'period_end']
     search_fields = ['employee__first_name', 'employee__last_name', 'manager__first_name', 'manager__last_name']
     readonly_fields = ['calculation_date', 'created_at', 'updated_at']
     ordering = ['-period_end', '-created_at']
@@ -176,7 +218,7 @@ class EmployeeProgressAdmin(admin.ModelAdmin):
             'fields': ('period_start', 'period_end')
         }),
         ('Progress Data', {
-            'fields': ('total_progress_score', 'progress_breakdown', 'notes')
+            'fields': ('total_progress_score', 'progress_breakdown', 'is_stale', 'notes')
         }),
         ('Metadata', {
             'fields': ('calculated_by', 'calculation_date', 'created_at', 'updated_at'),
@@ -275,3 +317,52 @@ class ChatMessageAdmin(admin.ModelAdmin):
 
 admin.site.register(ChatBot, ChatBotAdmin)
 admin.site.register(ChatMessage, ChatMessageAdmin)
+
+class ScheduledJobRunAdmin(admin.ModelAdmin):
+    list_display = ['job_name', 'run_date', 'status', 'started_at', 'finished_at']
+    list_filter = ['job_name', 'status', 'run_date']
+    readonly_fields = ['job_name', 'run_date', 'status', 'started_at', 'finished_at', 'result']
+    date_hierarchy = 'run_date'
+
+    def has_add_permission(self, request):
+        return False
+
+admin.site.register(ScheduledJobRun, ScheduledJobRunAdmin)
+
+class TaskScoreRollupAdmin(admin.ModelAdmin):
+    list_display = ['employee', 'kpi', 'month', 'task_count', 'score_sum', 'weight', 'manager', 'updated_at']
+    list_filter = ['month', 'manager']
+    search_fields = ['employee__username', 'employee__first_name', 'employee__last_name', 'kpi__name']
+    readonly_fields = ['employee', 'manager', 'kpi', 'month', 'task_count', 'score_sum', 'weight', 'updated_at']
+    date_hierarchy = 'month'
+
+    def has_add_permission(self, request):
+        return False
+
+admin.site.register(TaskScoreRollup, TaskScoreRollupAdmin)
+
+class MonthlyStatsSnapshotAdmin(admin.ModelAdmin):
+    list_display = ['manager', 'month', 'built_at']
+    list_filter = ['month']
+    search_fields = ['manager__username', 'manager__first_name', 'manager__last_name']
+    readonly_fields = ['manager', 'month', 'rows', 'built_at']
+    date_hierarchy = 'month'
+
+    def has_add_permission(self, request):
+        return False
+
+admin.site.register(MonthlyStatsSnapshot, MonthlyStatsSnapshotAdmin)
+
+class ExportJobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'user', 'view_name', 'export_type', 'status', 'created_at', 'finished_at', 'expires_at']
+    list_filter = ['status', 'view_name', 'export_type']
+    search_fields = ['user__username', 'file_name']
+    readonly_fields = [
+        'user', 'view_name', 'export_type', 'params', 'params_hash', 'status', 'error', 'file_path', 'file_name',
+        'file_size', 'content_type', 'created_at', 'started_at', 'finished_at', 'expires_at',
+    ]
+
+    def has_add_permission(self, request):
+        return False
+
+admin.site.register(ExportJob, ExportJobAdmin)
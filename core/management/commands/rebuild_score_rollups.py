@@ -0,0 +1,15 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.services import score_rollup
+
+
+class Command(BaseCommand):
+    help = 'Recreate the monthly task score rollups from the task table.'
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        count = score_rollup.rebuild()
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} score rollup rows in {elapsed:.1f}s"))
@@ -0,0 +1,103 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from core.services.progress_recalc import PERIOD_CHOICES, build_units, init_worker, iter_periods, recalculate_unit
+from core.utils.dates import business_localdate
+
+
+class Command(BaseCommand):
+    help = (
+        'Recalculate employee progress records for every manager, employee and period '
+        '(monthly, quarterly or one custom window) using a pool of worker processes. '
+        'Progress is checkpointed so an interrupted run resumes where it stopped.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--period', choices=PERIOD_CHOICES, default='monthly', help='Period granularity (default: monthly).')
+        parser.add_argument('--start', type=date.fromisoformat, help='First day to cover, YYYY-MM-DD (default: 1 January this year).')
+        parser.add_argument('--end', type=date.fromisoformat, help='Last day to cover, YYYY-MM-DD (default: today).')
+        parser.add_argument('--manager', type=int, action='append', help='Only this manager (user id); repeatable.')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Worker processes; 1 runs in-process.')
+        parser.add_argument('--batch-size', type=int, default=50, help='Employees per work unit.')
+        parser.add_argument('--checkpoint', help='Checkpoint file (default: derived from the arguments, in the temp directory).')
+        parser.add_argument('--fresh', action='store_true', help='Ignore an existing checkpoint and start over.')
+
+    def handle(self, *args, **options):
+        today = business_localdate()
+        end = options['end'] or today
+        start = options['start'] or end.replace(month=1, day=1)
+        if start > end:
+            raise CommandError('--start must not be after --end.')
+
+        periods = list(iter_periods(options['period'], start, end))
+        units = build_units(periods, manager_ids=options['manager'], batch_size=options['batch_size'])
+        signature = hashlib.sha1(json.dumps(
+            [options['period'], str(start), str(end), sorted(options['manager'] or []), options['batch_size']]
+        ).encode()).hexdigest()[:12]
+        checkpoint_path = options['checkpoint'] or os.path.join(tempfile.gettempdir(), f'recalculate_progress-{signature}.json')
+
+        done = set()
+        if not options['fresh'] and os.path.exists(checkpoint_path):
+            with open(checkpoint_path, encoding='utf-8') as fh:
+                saved = json.load(fh)
+            if saved.get('signature') == signature:
+                done = set(saved.get('done', []))
+                self.stdout.write(f"Resuming from {checkpoint_path}: {len(done)} units already done.")
+        pending = [unit for unit in units if unit.key not in done]
+        total_employees = sum(len(unit.employee_ids) for unit in pending)
+        self.stdout.write(
+            f"{len(periods)} {options['period']} period(s) from {start} to {end}; "
+            f"{len(pending)} of {len(units)} units to run ({total_employees} employee-periods), "
+            f"{options['workers']} worker(s)."
+        )
+
+        def save_checkpoint():
+            tmp_path = f'{checkpoint_path}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as fh:
+                json.dump({'signature': signature, 'done': sorted(done)}, fh)
+            os.replace(tmp_path, checkpoint_path)
+
+        started = time.monotonic()
+        last_report = started
+        processed = written = 0
+
+        def record(unit, result):
+            nonlocal processed, written, last_report
+            employees, records = result
+            processed += employees
+            written += records
+            done.add(unit.key)
+            save_checkpoint()
+            now = time.monotonic()
+            if now - last_report >= 5 or processed == total_employees:
+                last_report = now
+                rate = processed / (now - started) if now > started else 0.0
+                eta = (total_employees - processed) / rate if rate else 0.0
+                self.stdout.write(f"  {processed}/{total_employees} employee-periods, {rate:.0f}/s, ETA {eta:.0f}s")
+
+        if options['workers'] <= 1:
+            for unit in pending:
+                record(unit, recalculate_unit(unit))
+        elif pending:
+            # Forked workers must not share the parent's database sockets
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=options['workers'], initializer=init_worker) as pool:
+                futures = {pool.submit(recalculate_unit, unit): unit for unit in pending}
+                for future in as_completed(futures):
+                    record(futures[future], future.result())
+
+        elapsed = time.monotonic() - started
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        rate = processed / elapsed if elapsed else 0.0
+        self.stdout.write(self.style.SUCCESS(
+            f"Recalculated {processed} employee-periods ({written} records written) in {elapsed:.1f}s, {rate:.0f}/s"
+        ))
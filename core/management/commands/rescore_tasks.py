@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.models import Task
+from core.services.rescore_service import rescore_tasks
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute final scores of evaluated tasks after evaluation settings, quality percentages '
+        'or priority multipliers changed, then recalculate affected employee progress records.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Report the score changes without writing them.')
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Tasks read and written per batch.')
+        parser.add_argument('--manager', type=int, help="Only rescore tasks of this manager's subordinates (user id).")
+        parser.add_argument('--no-progress', action='store_true', help='Do not recalculate employee progress records.')
+
+    def handle(self, *args, **options):
+        queryset = Task.objects.all()
+        if options['manager']:
+            queryset = queryset.filter(responsible__under_supervision_id=options['manager'])
+
+        started = time.monotonic()
+        report = rescore_tasks(
+            queryset,
+            dry_run=options['dry_run'],
+            chunk_size=options['chunk_size'],
+            recalculate_progress=not options['no_progress'],
+        )
+        elapsed = time.monotonic() - started
+
+        self.stdout.write('Final score change distribution:')
+        for label, count in report.histogram_rows():
+            if count:
+                self.stdout.write(f"  {label:>16}: {count}")
+        for title, change in (('Largest increase', report.largest_increase), ('Largest decrease', report.largest_decrease)):
+            if change:
+                task_id, before, after = change
+                self.stdout.write(f"{title}: task {task_id} {before:.2f} -> {after:.2f}")
+        self.stdout.write(self.style.SUCCESS(f"{report.summary()} in {elapsed:.1f}s"))
@@ -0,0 +1,67 @@
+import logging
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from core.utils.dates import business_localdate
+
+from core.models import EmployeeProgress, ScheduledJobRun, Task
+from core.services import monthly_stats
+
+logger = logging.getLogger(__name__)
+
+
+# (job name, callable) pairs run once per business day, in order
+DAILY_JOBS = [
+    ('task_status_refresh', Task.update_all_statuses),
+    ('stale_progress_refresh', EmployeeProgress.recalculate_stale),
+    ('monthly_stats_snapshots', monthly_stats.build_closed_month),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Run the once-per-business-day jobs (task status refresh, stale progress recalculation, month-close '
+        'statistics snapshots). Safe to schedule on every instance: a lock row ensures each job runs once per '
+        'business day across processes. A failing job is logged and does not stop the jobs after it. With '
+        '--interval the command keeps running and checks the jobs every so many seconds (the Procfile scheduler).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Run jobs even if they already succeeded today.')
+        parser.add_argument(
+            '--interval', type=float, default=0,
+            help='Keep running, checking the jobs every this many seconds (0: run once and exit).',
+        )
+
+    def handle(self, *args, **options):
+        if not options['interval']:
+            failed = self.run_jobs(force=options['force'])
+            if failed:
+                raise CommandError(f"Failed daily job(s): {', '.join(failed)}")
+            return
+        force = options['force']
+        while True:
+            self.run_jobs(force=force)
+            force = False  # --force reruns today's jobs once, not on every check
+            close_old_connections()
+            time.sleep(options['interval'])
+
+    def run_jobs(self, force=False):
+        """Run each due job; returns the names of the jobs that failed."""
+        today = business_localdate()
+        failed = []
+        for job_name, func in DAILY_JOBS:
+            try:
+                ran, result = ScheduledJobRun.run_once(job_name, func, run_date=today, force=force)
+            except Exception as exc:
+                # Recorded on the run row (reclaimed on the next check); the remaining jobs still run
+                logger.exception('Daily job %s failed for %s', job_name, today)
+                self.stderr.write(self.style.ERROR(f"{job_name}: failed for {today}: {exc}"))
+                failed.append(job_name)
+                continue
+            if ran:
+                self.stdout.write(self.style.SUCCESS(f"{job_name}: done for {today} {result or ''}"))
+            else:
+                self.stdout.write(f"{job_name}: already claimed for {today}, skipping.")
+        return failed
@@ -0,0 +1,113 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connections
+
+from core.services import export_jobs
+
+
+class Command(BaseCommand):
+    help = (
+        'Render queued Excel/PDF report exports. Runs until stopped, polling for new jobs; '
+        'with --once it drains the queue and exits (for cron). With --workers N, up to N jobs '
+        'render at once in a pool of worker processes. Several commands may run side by side.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Exit when the queue is empty.')
+        parser.add_argument('--poll-interval', type=float, default=2.0, help='Seconds to wait when the queue is empty.')
+        parser.add_argument('--max-jobs', type=int, default=0, help='Exit after this many jobs (0: no limit).')
+        parser.add_argument(
+            '--workers', type=int, default=None,
+            help='Worker processes rendering jobs; 1 renders in-process (default: settings.EXPORT_WORKERS).',
+        )
+
+    def handle(self, *args, **options):
+        self.processed = 0
+        self.options = options
+        self.last_cleanup = 0.0
+        if options['workers'] is None:
+            options['workers'] = getattr(settings, 'EXPORT_WORKERS', 1)
+        if options['workers'] <= 1:
+            self.run_in_process()
+        else:
+            # Forked workers must not share the parent's database sockets
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=options['workers'], initializer=export_jobs.init_worker) as pool:
+                self.run_pool(pool, options['workers'])
+        self.stdout.write(f"Processed {self.processed} export job(s).")
+
+    def limit_reached(self):
+        return bool(self.options['max_jobs']) and self.processed >= self.options['max_jobs']
+
+    def housekeeping(self):
+        now = time.monotonic()
+        if now - self.last_cleanup < 60:
+            return
+        self.last_cleanup = now
+        abandoned = export_jobs.fail_abandoned()
+        expired = export_jobs.purge_expired()['expired']
+        if abandoned or expired:
+            self.stdout.write(f"Failed {abandoned} abandoned job(s), expired {expired} file(s).")
+        depth = export_jobs.queue_depth()
+        self.stdout.write(
+            f"Queue: {depth['pending']} pending, {depth['running']} running, "
+            f"oldest pending {depth['oldest_pending_seconds']:.0f}s"
+        )
+
+    def report(self, job, ok, elapsed):
+        self.processed += 1
+        if ok:
+            self.stdout.write(self.style.SUCCESS(f"Job {job.pk} ({job.view_name} {job.export_type}) done in {elapsed:.1f}s"))
+        else:
+            self.stdout.write(self.style.WARNING(f"Job {job.pk} ({job.view_name} {job.export_type}) failed after {elapsed:.1f}s"))
+
+    def idle(self):
+        close_old_connections()
+        time.sleep(self.options['poll_interval'])
+
+    def run_in_process(self):
+        while not self.limit_reached():
+            self.housekeeping()
+            job = export_jobs.claim_next()
+            if job is None:
+                if self.options['once']:
+                    break
+                self.idle()
+                continue
+            started = time.monotonic()
+            ok = export_jobs.run_job(job)
+            self.report(job, ok, time.monotonic() - started)
+
+    def run_pool(self, pool, workers):
+        running = {}
+        while True:
+            self.housekeeping()
+            # Claim only what the pool can start now; the rest stays pending (and counted) in the queue
+            while len(running) < workers and not (self.options['max_jobs'] and self.processed + len(running) >= self.options['max_jobs']):
+                job = export_jobs.claim_next()
+                if job is None:
+                    break
+                try:
+                    future = pool.submit(export_jobs.run_job_id, job.pk)
+                except Exception as exc:
+                    # The pool is broken (a worker process died); give the job back as failed and stop
+                    export_jobs.fail(job, 'The export worker stopped before the file was ready.')
+                    raise CommandError(f'Export worker pool failed: {exc}') from exc
+                running[future] = (job, time.monotonic())
+            if not running:
+                if self.options['once'] or self.limit_reached():
+                    break
+                self.idle()
+                continue
+            done, _ = wait(running, timeout=self.options['poll_interval'], return_when=FIRST_COMPLETED)
+            for future in done:
+                job, started = running.pop(future)
+                try:
+                    ok = future.result()
+                except Exception as exc:  # noqa: BLE001 - a crashed worker must not stop the others
+                    export_jobs.fail(job, str(exc))
+                    ok = False
+                self.report(job, ok, time.monotonic() - started)
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 from django.db import models
-from django.db.models import Q
+from django.db.models import Case, CharField, Q, Value, When
+
+from core.utils.dates import business_localdate
 
 
 class TaskQuerySet(models.QuerySet):
@@ -21,4 +23,19 @@ class TaskQuerySet(models.QuerySet):
     def open_(self):
         return self.filter(status='open')
 
-
+    def with_effective_status(self, today=None):
+        """
+        Annotate ``effective_status`` computed in SQL with the same rules as
+        ``compute_status``: closed at 100% completion, due once the target date
+        is before the business date, open otherwise. Unlike the stored
+        ``status`` column it does not depend on the daily sweep having run.
+        """
+        today = today or business_localdate()
+        return self.annotate(
+            effective_status=Case(
+                When(percentage_completion__gte=100, then=Value('closed')),
+                When(target_date__lt=today, then=Value('due')),
+                default=Value('open'),
+                output_field=CharField(),
+            )
+        )
@@ -2,8 +2,6 @@ from __future__ import annotations
 
 from django.utils import timezone
 from django.conf import settings
-from django.core.cache import cache
-from core.utils.dates import business_localdate
 try:
     from zoneinfo import ZoneInfo
 except Exception:
@@ -11,7 +9,11 @@ except Exception:
 
 
 class BusinessTimezoneMiddleware:
-    """Activate BUSINESS_TIMEZONE for each request so UI uses local time."""
+    """Activate BUSINESS_TIMEZONE for each request so UI uses local time.
+
+    The daily task status refresh runs from the ``run_daily_jobs`` management
+    command, not on the request path.
+    """
 
     def __init__(self, get_response):
         self.get_response = get_response
@@ -26,21 +28,8 @@ class BusinessTimezoneMiddleware:
                 token = tz
             except Exception:
                 pass
-        # Lightweight daily status refresh: ensures due/open/closed are up-to-date
-        try:
-            today = business_localdate()
-            guard_key = f"task_status_auto_refresh:{today.isoformat()}"
-            if cache.get(guard_key) is None:
-                # Import lazily to avoid import-time issues
-                from core.models import Task  # noqa
-                Task.update_all_statuses()
-                cache.set(guard_key, True, 60 * 60 * 24)
-        except Exception:
-            # Non-blocking if anything goes wrong
-            pass
         response = self.get_response(request)
         if token is not None:
             timezone.deactivate()
         return response
 
-
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.5 on 2026-10-17 03:53
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0033_chatbot_chatmessage_chatbot_chatbot_user_updated_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScheduledJobRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job_name', models.CharField(max_length=100, verbose_name='Job Name')),
+                ('run_date', models.DateField(verbose_name='Business Date')),
+                ('status', models.CharField(choices=[('running', 'Running'), ('succeeded', 'Succeeded'), ('failed', 'Failed')], db_index=True, default='running', max_length=10)),
+                ('started_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('result', models.JSONField(blank=True, default=dict)),
+            ],
+            options={
+                'verbose_name': 'Scheduled Job Run',
+                'verbose_name_plural': 'Scheduled Job Runs',
+                'ordering': ['-run_date', 'job_name'],
+                'constraints': [models.UniqueConstraint(fields=('job_name', 'run_date'), name='job_run_once_per_day')],
+            },
+        ),
+    ]
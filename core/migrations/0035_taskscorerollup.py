@@ -0,0 +1,69 @@
+# Generated by Django 5.2.5 on 2026-10-17 04:14
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, DateField, Sum
+from django.db.models.functions import TruncMonth
+
+from core.utils.dates import business_timezone
+
+
+def populate_score_rollups(apps, schema_editor):
+    """Build the initial rollups from existing evaluated tasks (same grouping as score_rollup.rebuild)"""
+    Task = apps.get_model('core', 'Task')
+    TaskScoreRollup = apps.get_model('core', 'TaskScoreRollup')
+    rows = (
+        Task.objects.filter(
+            status='closed', evaluation_status='evaluated', final_score__isnull=False,
+            kpi__isnull=False, completion_date__isnull=False,
+        )
+        .order_by()
+        .annotate(month=TruncMonth('completion_date', output_field=DateField(), tzinfo=business_timezone()))
+        .values('responsible_id', 'kpi_id', 'kpi__created_by_id', 'kpi__weight', 'month')
+        .annotate(task_count=Count('id'), score_sum=Sum('final_score'))
+    )
+    TaskScoreRollup.objects.bulk_create([
+        TaskScoreRollup(
+            employee_id=row['responsible_id'],
+            manager_id=row['kpi__created_by_id'],
+            kpi_id=row['kpi_id'],
+            month=row['month'],
+            task_count=row['task_count'],
+            score_sum=float(row['score_sum'] or 0.0),
+            weight=float(row['kpi__weight'] or 0.0),
+        )
+        for row in rows
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0034_scheduledjobrun'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskScoreRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='First day of the completion month', verbose_name='Month')),
+                ('task_count', models.PositiveIntegerField(default=0)),
+                ('score_sum', models.FloatField(default=0)),
+                ('weight', models.FloatField(default=0, help_text='KPI weight when the row was last refreshed')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='score_rollups', to=settings.AUTH_USER_MODEL)),
+                ('kpi', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='score_rollups', to='core.kpi')),
+                ('manager', models.ForeignKey(blank=True, help_text='Owner of the KPI', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='team_score_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Task Score Rollup',
+                'verbose_name_plural': 'Task Score Rollups',
+                'ordering': ['-month', 'employee', 'kpi'],
+                'indexes': [models.Index(fields=['manager', 'month'], name='score_rollup_manager_month_idx')],
+                'constraints': [models.UniqueConstraint(fields=('employee', 'kpi', 'month'), name='score_rollup_employee_kpi_month')],
+            },
+        ),
+        migrations.RunPython(populate_score_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.5 on 2026-10-17 04:18
+
+from django.db import migrations, models
+
+
+def mark_existing_stale(apps, schema_editor):
+    """Records calculated before changes were tracked may be out of date; recalculate them on next read"""
+    EmployeeProgress = apps.get_model('core', 'EmployeeProgress')
+    EmployeeProgress.objects.update(is_stale=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0035_taskscorerollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='employeeprogress',
+            name='is_stale',
+            field=models.BooleanField(db_index=True, default=False, verbose_name='Needs Recalculation'),
+        ),
+        migrations.RunPython(mark_existing_stale, migrations.RunPython.noop),
+    ]
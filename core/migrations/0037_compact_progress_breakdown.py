@@ -0,0 +1,33 @@
+# Generated by Django 5.2.5 on 2026-10-17 04:23
+
+from django.db import migrations
+
+
+def strip_task_lists(apps, schema_editor):
+    """Drop the per-KPI task lists from stored breakdowns; task detail is now read from the tasks on demand"""
+    EmployeeProgress = apps.get_model('core', 'EmployeeProgress')
+    batch = []
+    for record in EmployeeProgress.objects.only('id', 'progress_breakdown').iterator(chunk_size=500):
+        breakdown = record.progress_breakdown or {}
+        if not any(isinstance(kpi_data, dict) and 'tasks' in kpi_data for kpi_data in breakdown.values()):
+            continue
+        for kpi_data in breakdown.values():
+            if isinstance(kpi_data, dict):
+                kpi_data.pop('tasks', None)
+        batch.append(record)
+        if len(batch) >= 500:
+            EmployeeProgress.objects.bulk_update(batch, ['progress_breakdown'])
+            batch = []
+    if batch:
+        EmployeeProgress.objects.bulk_update(batch, ['progress_breakdown'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0036_employeeprogress_is_stale'),
+    ]
+
+    operations = [
+        migrations.RunPython(strip_task_lists, migrations.RunPython.noop),
+    ]
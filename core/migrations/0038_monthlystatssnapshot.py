@@ -0,0 +1,31 @@
+# Generated by Django 5.2.5 on 2026-10-17 04:37
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0037_compact_progress_breakdown'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyStatsSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='First day of the month', verbose_name='Month')),
+                ('rows', models.JSONField(blank=True, default=list)),
+                ('built_at', models.DateTimeField(auto_now=True)),
+                ('manager', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_stats_snapshots', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Monthly Stats Snapshot',
+                'verbose_name_plural': 'Monthly Stats Snapshots',
+                'ordering': ['-month', 'manager'],
+                'constraints': [models.UniqueConstraint(fields=('manager', 'month'), name='monthly_stats_manager_month')],
+            },
+        ),
+    ]
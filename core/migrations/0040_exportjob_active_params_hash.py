@@ -0,0 +1,30 @@
+# Generated by Django 5.2.5 on 2026-10-17 05:24
+
+from django.db import migrations, models
+
+
+def fail_duplicate_active_jobs(apps, schema_editor):
+    """Keep the newest unfinished job of each params_hash so the constraint can be created"""
+    ExportJob = apps.get_model('core', 'ExportJob')
+    seen = set()
+    duplicates = []
+    for pk, digest in ExportJob.objects.filter(status__in=('pending', 'running')).order_by('-created_at', '-pk').values_list('pk', 'params_hash'):
+        if digest in seen:
+            duplicates.append(pk)
+        seen.add(digest)
+    ExportJob.objects.filter(pk__in=duplicates).update(status='failed', error='Replaced by an identical export.')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0039_exportjob'),
+    ]
+
+    operations = [
+        migrations.RunPython(fail_duplicate_active_jobs, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='exportjob',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ('pending', 'running'))), fields=('params_hash',), name='export_job_active_params_hash'),
+        ),
+    ]
@@ -1,12 +1,15 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import Q
 import logging
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import MaxValueValidator, MinValueValidator
-from datetime import date
+from datetime import date, datetime, timedelta
 from django.utils import timezone
-from .utils.dates import business_localdate
+from .utils.dates import business_localdate, business_timezone
 from django.templatetags.static import static
 from .managers import TaskQuerySet
+from .services import monthly_stats, progress_service, reference_data, score_rollup
+from .services.task_service import EvaluationSettings, TaskEvaluationInput, compute_automatic_evaluation
 import os
 
 USER_TYPE_CHOICES = [
@@ -190,6 +193,13 @@ class EmployeeProgress(models.Model):
         help_text="Detailed breakdown of progress by KPI"
     )
     
+    # Set when a task in the period is evaluated, changed or deleted after the last calculation
+    is_stale = models.BooleanField(
+        default=False,
+        db_index=True,
+        verbose_name="Needs Recalculation"
+    )
+    
     notes = models.TextField(
         blank=True,
         verbose_name="Notes",
@@ -212,66 +222,47 @@ class EmployeeProgress(models.Model):
         """
         Calculate employee progress based on KPI performance
         Formula: Employee Progress Score = (Average Project KPI Score × Project KPI Weight) + (Average HSE KPI Score × HSE KPI Weight) + ...
+
+        Per-KPI figures come from a single GROUP BY kpi query, regardless of
+        how many KPIs the manager has. Only the per-KPI summary is stored;
+        task-level detail is read on demand with kpi_task_details().
         """
         from django.db.models import Avg, Sum, Count
         
         # Get all active KPIs for the manager
-        manager_kpis = KPI.objects.filter(
-            created_by=self.manager,
-            is_active=True
-        ).order_by('sort_order')
+        manager_kpis = sorted(
+            reference_data.get_snapshot().kpis_for_manager(self.manager_id),
+            key=lambda kpi: kpi.sort_order,
+        )
         
-        if not manager_kpis.exists():
+        if not manager_kpis:
             return None
         
         # Get CLOSED and evaluated tasks for this employee in the period
-        tasks = Task.objects.filter(
-            responsible=self.employee,
-            completion_date__date__gte=self.period_start,
-            completion_date__date__lte=self.period_end,
-            status='closed',
-            evaluation_status='evaluated',
-            final_score__isnull=False
-        )
+        tasks = self._period_tasks([kpi.id for kpi in manager_kpis])
         
-        progress_breakdown = {}
-        total_weighted_score = 0
-        total_weight = 0
+        kpi_stats = {
+            row['kpi_id']: row
+            for row in tasks.order_by().values('kpi_id').annotate(
+                task_count=Count('id'),
+                avg_score=Avg('final_score'),
+                total_score=Sum('final_score'),
+            )
+        }
         
+        progress_breakdown = {}
         for kpi in manager_kpis:
-            # Get tasks for this specific KPI
-            kpi_tasks = tasks.filter(kpi=kpi)
+            stats = kpi_stats.get(kpi.id)
             
-            if kpi_tasks.exists():
-                # Per-task weighting: sum(final_score * weight) over tasks
-                task_count = kpi_tasks.count()
-                avg_score = kpi_tasks.aggregate(avg_score=Avg('final_score'))['avg_score']
-                sum_scores = kpi_tasks.aggregate(total_score=Sum('final_score'))['total_score'] or 0
-                # Contribution of this KPI across all its tasks (no /100 here)
-                weighted_score = float(sum_scores) * float(kpi.weight)
-                
-                # Convert tasks to JSON-serializable format
-                tasks_data = []
-                for task in kpi_tasks:
-                    tasks_data.append({
-                        'id': task.id,
-                        'issue_action': task.issue_action,
-                        'final_score': task.final_score,
-                        'completion_date': task.completion_date.isoformat() if task.completion_date else None
-                    })
-                
+            if stats:
                 progress_breakdown[kpi.name] = {
                     'kpi_id': kpi.id,
                     'weight': kpi.weight,
-                    'task_count': task_count,
-                    'average_score': round(avg_score, 2),
-                    'weighted_score': round(weighted_score, 2),
-                    'tasks': tasks_data
+                    'task_count': stats['task_count'],
+                    'average_score': round(stats['avg_score'], 2),
+                    # Contribution of this KPI across all its tasks (no /100 here)
+                    'weighted_score': round(float(stats['total_score'] or 0) * float(kpi.weight), 2),
                 }
-                
-                total_weighted_score += weighted_score
-                # Denominator sums KPI weight for each task under this KPI
-                total_weight += float(kpi.weight) * float(task_count)
             else:
                 # No CLOSED tasks for this KPI in the period; do not include its weight
                 progress_breakdown[kpi.name] = {
@@ -280,19 +271,27 @@ class EmployeeProgress(models.Model):
                     'task_count': 0,
                     'average_score': 0,
                     'weighted_score': 0,
-                    'tasks': []
                 }
         
-        # Calculate total progress score using per-task weighting
+        # Total progress score using per-task weighting
+        rows = [kpi_stats[kpi.id] for kpi in manager_kpis if kpi.id in kpi_stats]
+        total = progress_service.weighted_scores(
+            [self.employee_id] * len(rows),
+            [row['kpi_id'] for row in rows],
+            [row['total_score'] or 0 for row in rows],
+            {kpi.id: float(kpi.weight) for kpi in manager_kpis},
+            task_counts=[row['task_count'] for row in rows],
+        ).get(self.employee_id)
+        total_weight = total.total_weight if total else 0
         if total_weight > 0:
-            total_progress_score = (total_weighted_score / total_weight)
+            total_progress_score = (total.weighted_sum / total_weight)
         else:
             total_progress_score = 0
         
         # Update the record
         self.total_progress_score = round(total_progress_score, 2)
         self.progress_breakdown = progress_breakdown
-        self.calculated_by = self.manager
+        self.calculated_by_id = self.manager_id
         
         return {
             'total_progress_score': self.total_progress_score,
@@ -300,10 +299,57 @@ class EmployeeProgress(models.Model):
             'total_weight': total_weight
         }
     
+    def _period_tasks(self, kpi_ids):
+        return Task.objects.filter(
+            responsible_id=self.employee_id,
+            completion_date__date__gte=self.period_start,
+            completion_date__date__lte=self.period_end,
+            status='closed',
+            evaluation_status='evaluated',
+            final_score__isnull=False,
+            kpi_id__in=kpi_ids,
+        )
+    
+    def kpi_task_details(self):
+        """
+        Tasks behind each KPI of the stored breakdown, loaded with one query:
+        a list of ``{'kpi_name', 'task_count', 'tasks'}`` in breakdown order
+        for the KPIs that have tasks.
+        """
+        breakdown = {
+            kpi_name: kpi_data for kpi_name, kpi_data in (self.progress_breakdown or {}).items()
+            if kpi_data.get('task_count')
+        }
+        if not breakdown:
+            return []
+        tasks_by_kpi = {}
+        for task in self._period_tasks([kpi_data['kpi_id'] for kpi_data in breakdown.values()]).values(
+            'id', 'kpi_id', 'issue_action', 'final_score', 'completion_date'
+        ):
+            tasks_by_kpi.setdefault(task['kpi_id'], []).append(task)
+        return [
+            {'kpi_name': kpi_name, 'task_count': kpi_data['task_count'], 'tasks': tasks_by_kpi.get(kpi_data['kpi_id'], [])}
+            for kpi_name, kpi_data in breakdown.items()
+        ]
+    
+    def recalculate(self):
+        """
+        Recalculate and save the record. The stale flag is cleared before the
+        calculation and not written by the save, so a task change that marks
+        the record stale meanwhile is not lost.
+        """
+        EmployeeProgress.objects.filter(pk=self.pk, is_stale=True).update(is_stale=False)
+        self.is_stale = False
+        result = self.calculate_progress()
+        if result:
+            self.save(update_fields=['total_progress_score', 'progress_breakdown', 'calculated_by', 'updated_at'])
+        return result
+    
     @classmethod
     def calculate_employee_progress(cls, employee, manager, period_start, period_end, force_recalculate=False):
         """
         Calculate or get existing progress for an employee
+        Stale records are recalculated on read.
         """
         progress_record, created = cls.objects.get_or_create(
             employee=employee,
@@ -313,13 +359,60 @@ class EmployeeProgress(models.Model):
             defaults={'calculated_by': manager}
         )
         
-        if created or force_recalculate:
-            result = progress_record.calculate_progress()
-            if result:
-                progress_record.save()
-                return progress_record
+        if created or force_recalculate or progress_record.is_stale:
+            progress_record.recalculate()
         
         return progress_record
+    
+    @classmethod
+    def mark_stale(cls, entries, batch_size=200):
+        """
+        Flag the records whose period contains a task completion.
+        ``entries`` are ``(employee_id, completion_date)`` pairs; returns the number of records flagged.
+        """
+        days = set()
+        for employee_id, completed in entries:
+            if not employee_id or not completed:
+                continue
+            if isinstance(completed, datetime):
+                # Days in the business timezone, as the views' completion_date__date filters see them
+                completed = timezone.localtime(completed, business_timezone()).date() if timezone.is_aware(completed) else completed.date()
+            days.add((employee_id, completed))
+        days = sorted(days)
+        flagged = 0
+        for offset in range(0, len(days), batch_size):
+            condition = Q()
+            for employee_id, day in days[offset:offset + batch_size]:
+                condition |= Q(employee_id=employee_id, period_start__lte=day, period_end__gte=day)
+            flagged += cls.objects.filter(condition, is_stale=False).update(is_stale=True)
+        return flagged
+    
+    @classmethod
+    def mark_stale_for_tasks(cls, task_ids, batch_size=1000):
+        """Flag the records covering the completion of the given tasks."""
+        task_ids = list(task_ids)
+        flagged = 0
+        for offset in range(0, len(task_ids), batch_size):
+            flagged += cls.mark_stale(
+                Task.objects.filter(pk__in=task_ids[offset:offset + batch_size], completion_date__isnull=False)
+                .values_list('responsible_id', 'completion_date')
+            )
+        return flagged
+    
+    @classmethod
+    def recalculate_stale(cls, queryset=None):
+        """
+        Recalculate every stale record (or the stale ones in ``queryset``); used
+        by the daily jobs. Runs in the business timezone like a request, so the
+        period filters on completion dates match the in-request recalculation.
+        """
+        records = (cls.objects.all() if queryset is None else queryset).filter(is_stale=True)
+        recalculated = 0
+        with timezone.override(business_timezone()):
+            for record in records.defer('progress_breakdown').iterator():
+                record.recalculate()
+                recalculated += 1
+        return {'recalculated': recalculated}
 
 class QualityType(models.Model):
     """
@@ -531,6 +624,20 @@ class TaskEvaluationSettings(models.Model):
             settings = cls.objects.create()
         return settings
 
+    def as_evaluation_settings(self):
+        """Immutable snapshot of the scoring parameters for ``task_service``"""
+        return EvaluationSettings(
+            use_quality_score=self.use_quality_score,
+            use_priority_multiplier=self.use_priority_multiplier,
+            use_time_bonus_penalty=self.use_time_bonus_penalty,
+            use_manager_closure_penalty=self.use_manager_closure_penalty,
+            early_completion_bonus_per_day=self.early_completion_bonus_per_day,
+            max_early_completion_bonus=self.max_early_completion_bonus,
+            late_completion_penalty_per_day=self.late_completion_penalty_per_day,
+            max_late_completion_penalty=self.max_late_completion_penalty,
+            manager_closure_penalty=self.manager_closure_penalty,
+        )
+
 class Task(models.Model):
     """
     Task model according to exact requirements:
@@ -700,25 +807,78 @@ class Task(models.Model):
     # Custom queryset/manager for common filters
     objects = TaskQuerySet.as_manager()
 
+    # Fields written by apply_automatic_evaluation()
+    EVALUATION_FIELDS = (
+        'quality_score_calculated', 'priority_multiplier', 'time_bonus_penalty', 'final_score',
+        'manager_closure_penalty_applied', 'completion_date', 'evaluation_status',
+    )
+
     def __str__(self):
         return f"{self.issue_action} - {self.responsible.get_full_name()}"
 
+    def get_effective_status_display(self):
+        """Display label for the ``with_effective_status()`` annotation, falling back to the stored status."""
+        status = getattr(self, 'effective_status', None) or self.status
+        return dict(TASK_STATUS_CHOICES).get(status, status)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember what was loaded so save() can detect changes without re-reading the row
+        instance._loaded_values = instance._current_values(field_names)
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        attnames = None
+        if fields is not None:
+            attnames = [self._meta.get_field(name).attname for name in fields]
+        self._remember_loaded_values(attnames)
+
+    def _current_values(self, attnames=None):
+        values = {}
+        for field in self._meta.concrete_fields:
+            if field.attname not in self.__dict__:
+                continue  # deferred
+            if attnames is not None and field.attname not in attnames:
+                continue
+            value = self.__dict__[field.attname]
+            # File fields are wrapped in FieldFile once accessed; compare by stored name
+            values[field.attname] = getattr(value, 'name', value) if isinstance(field, models.FileField) else value
+        return values
+
+    def _remember_loaded_values(self, attnames=None):
+        loaded = getattr(self, '_loaded_values', None)
+        if loaded is None or attnames is None:
+            self._loaded_values = self._current_values(attnames)
+        else:
+            loaded.update(self._current_values(attnames))
+
+    def changed_fields(self):
+        """
+        Return the names of fields whose current value differs from the value
+        loaded from the database. Unsaved tasks report every field as changed;
+        deferred fields are never reported.
+        """
+        loaded = getattr(self, '_loaded_values', None)
+        names = {field.attname: field.name for field in self._meta.concrete_fields}
+        return {
+            names[attname]
+            for attname, value in self._current_values().items()
+            if loaded is None or (attname in loaded and loaded[attname] != value)
+        }
+
     def save(self, *args, **kwargs):
-        # Store original status and completion for comparison
+        # Original values come from the snapshot taken when the task was loaded
+        original_status = original_quality_id = None
         if self.pk:
-            try:
-                original_task = Task.objects.get(pk=self.pk)
-                original_status = original_task.status
-                original_completion = original_task.percentage_completion
-                original_quality = original_task.quality
-            except Task.DoesNotExist:
-                original_status = None
-                original_completion = None
-                original_quality = None
-        else:
-            original_status = None
-            original_completion = None
-            original_quality = None
+            loaded = dict(getattr(self, '_loaded_values', None) or {})
+            missing = [f for f in ('status', 'quality_id') if f not in loaded]
+            if missing:
+                # Built in memory with an explicit pk, or the fields were deferred
+                loaded.update(Task.objects.filter(pk=self.pk).values(*missing).first() or {})
+            original_status = loaded.get('status')
+            original_quality_id = loaded.get('quality_id')
         
         # Auto-update status based on dates and completion
         if self.percentage_completion >= 100:
@@ -727,31 +887,27 @@ class Task(models.Model):
             self.status = 'due'
         else:
             self.status = 'open'
+
+        # Auto-evaluate completed tasks in memory so the task is written once:
+        # pending tasks with a quality rating, and evaluated tasks whose quality changed
+        if (self.quality_id and
+            self.percentage_completion >= 100 and
+            not getattr(self, '_evaluation_applied', False) and
+            (self.evaluation_status == 'pending' or
+             (self.evaluation_status == 'evaluated' and original_quality_id != self.quality_id))):
+            if self.apply_automatic_evaluation():
+                update_fields = kwargs.get('update_fields')
+                if update_fields is not None:
+                    kwargs['update_fields'] = set(update_fields) | set(self.EVALUATION_FIELDS)
         
         # Save the task
         super().save(*args, **kwargs)
-        
-        # Auto-evaluate task if quality is set and task is completed
-        if (self.quality and 
-            self.percentage_completion >= 100 and 
-            self.evaluation_status == 'pending'):
-            self.apply_automatic_evaluation()
-            super().save(update_fields=[
-                'quality_score_calculated', 'priority_multiplier', 
-                'time_bonus_penalty', 'final_score', 'manager_closure_penalty_applied',
-                'completion_date', 'evaluation_status'
-            ])
-        
-        # Auto-evaluate task if quality is changed and task is already completed
-        if (self.quality and 
-            self.percentage_completion >= 100 and 
-            original_quality != self.quality and
-            self.evaluation_status == 'evaluated'):
-            self.apply_automatic_evaluation()
-            super().save(update_fields=[
-                'quality_score_calculated', 'priority_multiplier', 
-                'time_bonus_penalty', 'final_score', 'manager_closure_penalty_applied'
-            ])
+        self._evaluation_applied = False
+
+        update_fields = kwargs.get('update_fields')
+        self._remember_loaded_values(
+            None if update_fields is None else [self._meta.get_field(name).attname for name in update_fields]
+        )
         
         # Notify employee if status changed automatically
         if original_status and original_status != self.status and self.responsible:
@@ -790,75 +946,39 @@ class Task(models.Model):
             return [self.created_by]
         return []
     
-    def calculate_automatic_evaluation(self, manager_closure=False):
+    def calculate_automatic_evaluation(self, manager_closure=False, settings=None):
         """
         Calculate automatic evaluation score based on quality, priority, and timing
         """
-        if not self.quality:
+        if not self.quality_id:
             return None
         
-        settings = TaskEvaluationSettings.get_settings()
-        
-        # 1. Quality Score (from QualityType percentage)
-        if settings.use_quality_score and self.quality:
-            quality_score = self.quality.percentage
-        else:
-            quality_score = 0
-        
-        # 2. Priority Multiplier
-        if settings.use_priority_multiplier and self.priority:
-            priority_multiplier = self.priority.multiplier
-        else:
-            priority_multiplier = 1.0
-        
-        # 3. Time Bonus/Penalty
-        time_bonus_penalty = 0
-        if settings.use_time_bonus_penalty and self.completion_date and self.target_date:
-            completion_date = self.completion_date.date()
-            target_date = self.target_date
-            
-            if completion_date < target_date:
-                # Early completion - calculate bonus
-                days_early = (target_date - completion_date).days
-                bonus_per_day = settings.early_completion_bonus_per_day
-                max_bonus = settings.max_early_completion_bonus
-                time_bonus_penalty = min(days_early * bonus_per_day, max_bonus)
-            elif completion_date > target_date:
-                # Late completion - calculate penalty
-                days_late = (completion_date - target_date).days
-                penalty_per_day = settings.late_completion_penalty_per_day
-                max_penalty = settings.max_late_completion_penalty
-                time_bonus_penalty = -min(days_late * penalty_per_day, max_penalty)
-        
-        # 4. Manager closure penalty
-        manager_closure_penalty_applied = False
-        if settings.use_manager_closure_penalty and manager_closure and self.percentage_completion < 100:
-            time_bonus_penalty -= settings.manager_closure_penalty
-            manager_closure_penalty_applied = True
-        
-        # 5. Calculate final score using the formula: Final Score = (Quality Score × Priority Multiplier) ± Time Bonus/Penalty
-        base_score = quality_score * priority_multiplier
-        final_score = base_score + time_bonus_penalty
-        
-        # Ensure score is within 0-100 range
-        final_score = max(0, min(100, final_score))
-        
-        return {
-            'quality_score': quality_score,
-            'priority_multiplier': priority_multiplier,
-            'time_bonus_penalty': time_bonus_penalty,
-            'final_score': final_score,
-            'manager_closure_penalty_applied': manager_closure_penalty_applied
-        }
+        # Reference rows come from the per-process snapshot unless already loaded on the task
+        refs = reference_data.get_snapshot()
+        if settings is None:
+            settings = refs.evaluation_settings
+        quality = self.quality if Task.quality.is_cached(self) else (refs.qualities_by_id.get(self.quality_id) or self.quality)
+        priority = None
+        if self.priority_id:
+            priority = self.priority if Task.priority.is_cached(self) else (refs.priorities_by_id.get(self.priority_id) or self.priority)
+        data = TaskEvaluationInput(
+            quality_percentage=quality.percentage,
+            priority_multiplier=priority.multiplier if priority else None,
+            completion_date=self.completion_date.date() if self.completion_date else None,
+            target_date=self.target_date,
+            percentage_completion=self.percentage_completion,
+        )
+        return compute_automatic_evaluation(data, settings, manager_closure=manager_closure)
     
-    def apply_automatic_evaluation(self, manager_closure=False):
+    def apply_automatic_evaluation(self, manager_closure=False, settings=None):
         """
-        Apply automatic evaluation and save the results
+        Apply automatic evaluation to the task in memory; the next save() writes
+        the results without evaluating again.
         """
-        if not self.quality:
+        if not self.quality_id:
             return False
         
-        evaluation_result = self.calculate_automatic_evaluation(manager_closure)
+        evaluation_result = self.calculate_automatic_evaluation(manager_closure, settings=settings)
         if not evaluation_result:
             return False
         
@@ -876,6 +996,7 @@ class Task(models.Model):
         
         # Update evaluation status
         self.evaluation_status = 'evaluated'
+        self._evaluation_applied = True
 
         # --- Audit logging (non-invasive) ---
         try:
@@ -885,8 +1006,8 @@ class Task(models.Model):
                 'quality_score=%s priority_multiplier=%s time_bonus_penalty=%s final_score=%s '
                 'completion_date=%s target_date=%s percentage_completion=%s',
                 getattr(self, 'id', None),
-                getattr(self.responsible, 'id', None) if hasattr(self, 'responsible') else None,
-                getattr(self.evaluated_by, 'id', None) if hasattr(self, 'evaluated_by') else None,
+                self.responsible_id,
+                self.evaluated_by_id,
                 bool(manager_closure),
                 evaluation_result.get('quality_score'),
                 evaluation_result.get('priority_multiplier'),
@@ -957,7 +1078,7 @@ class Task(models.Model):
         elif user.user_type == 'manager':
             # Managers can only evaluate tasks assigned to their subordinates
             # They CANNOT evaluate tasks assigned to themselves (only their supervisor can)
-            return self.responsible.under_supervision == user
+            return self.responsible.under_supervision_id == user.pk
         elif user.user_type == 'employee':
             # Employees cannot evaluate tasks
             return False
@@ -974,89 +1095,103 @@ class Task(models.Model):
         return False
 
     @classmethod
-    def update_all_statuses(cls):
+    def update_all_statuses(cls, queryset=None, batch_size=500):
         """
         Update statuses for all tasks based on current date and completion
         Returns a dictionary with update statistics
+
+        Each transition (closed/due/open) is applied with one UPDATE per
+        ``batch_size`` locked ids inside one transaction; the matching
+        notifications are created in batches once the transaction commits.
+        Pass ``queryset`` to restrict the sweep, e.g. to a manager's team.
         """
         today = business_localdate()
+        tasks = cls.objects.all() if queryset is None else queryset
+        transitions = [
+            # (new status, candidate filter, notification suffix)
+            ('closed', Q(percentage_completion__gte=100, status__in=['open', 'due']),
+             "has been completed automatically (100% completion)."),
+            ('due', Q(target_date__lt=today, percentage_completion__lt=100, status='open'),
+             "is now due (past target date)."),
+            ('open', Q(target_date__gte=today, percentage_completion__lt=100, status='due'),
+             "is now open (not yet due by target date)."),
+        ]
         updates = {
             'closed': 0,
             'due': 0,
             'open': 0,
             'total_updated': 0
         }
-        
+
         # Import here to avoid circular imports
         from .models import Notification
-        
-        # Update tasks to 'closed' (100% completion)
-        closed_tasks = cls.objects.filter(
-            percentage_completion__gte=100,
-            status__in=['open', 'due']
-        )
-        for task in closed_tasks:
-            task.status = 'closed'
-            task.save()
-            updates['closed'] += 1
-            updates['total_updated'] += 1
-            
-            # Notify employee
-            if task.responsible:
-                notification_message = f"Your task '{task.issue_action[:40]}...' has been completed automatically (100% completion)."
-                Notification.objects.create(
-                    recipient=task.responsible,
-                    sender=None,  # System notification
-                    message=notification_message,
-                    link=f"/projects/task/{task.id}/"
-                )
-        
-        # Update tasks to 'due' (past target date but not 100% complete)
-        due_tasks = cls.objects.filter(
-            target_date__lt=today,
-            percentage_completion__lt=100,
-            status='open'
-        )
-        for task in due_tasks:
-            task.status = 'due'
-            task.save()
-            updates['due'] += 1
-            updates['total_updated'] += 1
-            
-            # Notify employee
-            if task.responsible:
-                notification_message = f"Your task '{task.issue_action[:40]}...' is now due (past target date)."
-                Notification.objects.create(
-                    recipient=task.responsible,
-                    sender=None,  # System notification
-                    message=notification_message,
-                    link=f"/projects/task/{task.id}/"
-                )
-        
-        # Update tasks to 'open' (not past target date and not 100% complete)
-        open_tasks = cls.objects.filter(
-            target_date__gte=today,
-            percentage_completion__lt=100,
-            status='due'
-        )
-        for task in open_tasks:
-            task.status = 'open'
-            task.save()
-            updates['open'] += 1
-            updates['total_updated'] += 1
-            
-            # Notify employee
-            if task.responsible:
-                notification_message = f"Your task '{task.issue_action[:40]}...' is now open (not yet due by target date)."
-                Notification.objects.create(
-                    recipient=task.responsible,
-                    sender=None,  # System notification
-                    message=notification_message,
-                    link=f"/projects/task/{task.id}/"
+
+        notifications = []
+        closed_ids = []
+        moved_ids = []
+        now = timezone.now()
+        with transaction.atomic():
+            for new_status, condition, suffix in transitions:
+                candidates = tasks.filter(condition)
+                # Lock the rows we are about to move so the notifications match the UPDATE
+                rows = list(
+                    candidates.select_for_update(of=('self',))
+                    .values_list('id', 'responsible_id', 'issue_action')
                 )
-        
+                if not rows:
+                    continue
+                # Update exactly the locked rows: re-evaluating the filter could pick up rows that changed since
+                task_ids = [task_id for task_id, _, _ in rows]
+                updated = 0
+                for offset in range(0, len(task_ids), batch_size):
+                    updated += cls.objects.filter(pk__in=task_ids[offset:offset + batch_size]).update(
+                        status=new_status, updated_date=now
+                    )
+                updates[new_status] += updated
+                updates['total_updated'] += updated
+                if new_status == 'closed':
+                    closed_ids = task_ids
+                moved_ids += task_ids
+                for task_id, responsible_id, issue_action in rows:
+                    if responsible_id:
+                        notifications.append(Notification(
+                            recipient_id=responsible_id,
+                            sender=None,  # System notification
+                            message=f"Your task '{(issue_action or '')[:40]}...' {suffix}",
+                            link=f"/projects/task/{task_id}/"
+                        ))
+
+            # Newly closed tasks that already carry a quality rating are evaluated,
+            # as Task.save() would have done for them
+            cls._evaluate_closed_tasks(closed_ids)
+            # Status and evaluation were written with UPDATEs, which skip the post_save rollup refresh
+            score_rollup.refresh_for_tasks(closed_ids)
+            EmployeeProgress.mark_stale_for_tasks(closed_ids)
+            # Statistics snapshots also hold open/due counts, which move with the date alone
+            monthly_stats.invalidate_for_tasks(moved_ids)
+
+        if notifications:
+            transaction.on_commit(lambda: Notification.bulk_notify(notifications))
         return updates
 
+    @classmethod
+    def _evaluate_closed_tasks(cls, task_ids, batch_size=500):
+        """Apply automatic evaluation to pending, quality-rated tasks among ``task_ids``."""
+        settings = None
+        for offset in range(0, len(task_ids), batch_size):
+            pending = list(
+                cls.objects.filter(
+                    pk__in=task_ids[offset:offset + batch_size],
+                    quality__isnull=False,
+                    evaluation_status='pending',
+                ).select_related('quality', 'priority')
+            )
+            if pending and settings is None:
+                settings = reference_data.get_evaluation_settings()
+            evaluated = [task for task in pending if task.apply_automatic_evaluation(settings=settings)]
+            if evaluated:
+                cls.objects.bulk_update(evaluated, cls.EVALUATION_FIELDS)
+
 
 class Notification(models.Model):
     recipient = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='notifications')
@@ -1075,6 +1210,19 @@ class Notification(models.Model):
     def __str__(self):
         return f"To: {self.recipient.get_full_name()} | {self.message[:40]}..."
 
+    @classmethod
+    def bulk_notify(cls, notifications, batch_size=500):
+        """
+        Create notifications in batches and email their recipients.
+
+        ``bulk_create`` does not fire ``post_save``, so the emails normally sent by
+        ``core.signals`` are dispatched here over a single mail connection.
+        """
+        created = cls.objects.bulk_create(notifications, batch_size=batch_size)
+        from .signals import send_notification_emails
+        send_notification_emails(created)
+        return created
+
 
 class TaskReminder(models.Model):
     """One-off scheduled reminder for a task.
@@ -1306,4 +1454,249 @@ class NoteReminder(models.Model):
     def mark_sent(self):
         from django.utils import timezone
         self.sent_at = timezone.now()
-        self.save(update_fields=['sent_at'])
\ No newline at end of file
+        self.save(update_fields=['sent_at'])
+
+
+JOB_RUN_STATUS_CHOICES = [
+    ('running', 'Running'),
+    ('succeeded', 'Succeeded'),
+    ('failed', 'Failed'),
+]
+
+
+class ScheduledJobRun(models.Model):
+    """
+    Lock row for scheduled jobs that must run once per business day.
+
+    The unique (job_name, run_date) pair is the cross-process lock: whichever
+    process inserts the row runs the job, every other worker or cron instance
+    skips it. Failed runs, and runs whose process died mid-way, can be
+    reclaimed.
+    """
+    STALE_AFTER = timedelta(hours=2)
+
+    job_name = models.CharField(max_length=100, verbose_name="Job Name")
+    run_date = models.DateField(verbose_name="Business Date")
+    status = models.CharField(max_length=10, choices=JOB_RUN_STATUS_CHOICES, default='running', db_index=True)
+    started_at = models.DateTimeField(default=timezone.now)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    result = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        ordering = ['-run_date', 'job_name']
+        verbose_name = "Scheduled Job Run"
+        verbose_name_plural = "Scheduled Job Runs"
+        constraints = [
+            models.UniqueConstraint(fields=['job_name', 'run_date'], name='job_run_once_per_day'),
+        ]
+
+    def __str__(self):
+        return f"{self.job_name} on {self.run_date} ({self.status})"
+
+    @classmethod
+    def claim(cls, job_name, run_date, force=False):
+        """Return the claimed run row, or None if another process owns this run."""
+        try:
+            with transaction.atomic():
+                return cls.objects.create(job_name=job_name, run_date=run_date)
+        except IntegrityError:
+            pass
+        now = timezone.now()
+        reclaimable = Q(status='failed') | Q(status='running', started_at__lt=now - cls.STALE_AFTER)
+        if force:
+            reclaimable |= Q(status='succeeded')
+        # Conditional UPDATE: only one contender can flip the row back to running
+        claimed = cls.objects.filter(reclaimable, job_name=job_name, run_date=run_date).update(
+            status='running', started_at=now, finished_at=None, result={}
+        )
+        return cls.objects.get(job_name=job_name, run_date=run_date) if claimed else None
+
+    @classmethod
+    def run_once(cls, job_name, func, run_date=None, force=False):
+        """
+        Run ``func`` once for ``job_name`` on ``run_date`` (default: today's business date).
+        Returns ``(ran, result)``; ``ran`` is False when the run was already claimed.
+        """
+        run = cls.claim(job_name, run_date or business_localdate(), force=force)
+        if run is None:
+            return False, None
+        try:
+            result = func()
+        except Exception as exc:
+            run.status = 'failed'
+            run.finished_at = timezone.now()
+            run.result = {'error': str(exc)}
+            run.save(update_fields=['status', 'finished_at', 'result'])
+            raise
+        run.status = 'succeeded'
+        run.finished_at = timezone.now()
+        run.result = result if isinstance(result, dict) else {}
+        run.save(update_fields=['status', 'finished_at', 'result'])
+        return True, result
+
+
+class DataVersion(models.Model):
+    """
+    Counter bumped whenever a family of per-process caches must be rebuilt.
+
+    Processes compare the counter of ``name`` with the value their copy was
+    built from (see ``core.services.reference_data``). Kept in the database
+    rather than the Django cache so every worker and command process sees
+    the same value even with a per-process cache backend.
+    """
+    name = models.CharField(max_length=100, unique=True)
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Data Version"
+        verbose_name_plural = "Data Versions"
+
+    def __str__(self):
+        return f"{self.name}: {self.version}"
+
+    @classmethod
+    def current(cls, name):
+        """Counter of ``name``; 0 until it is first bumped."""
+        return cls.objects.filter(name=name).values_list('version', flat=True).first() or 0
+
+    @classmethod
+    def bump(cls, name):
+        """Increment the counter of ``name`` in the current transaction."""
+        if cls.objects.filter(name=name).update(version=models.F('version') + 1, updated_at=timezone.now()):
+            return
+        _, created = cls.objects.get_or_create(name=name, defaults={'version': 1})
+        if not created:
+            # Another process created the row first
+            cls.objects.filter(name=name).update(version=models.F('version') + 1, updated_at=timezone.now())
+
+
+class TaskScoreRollup(models.Model):
+    """
+    Monthly totals of evaluated task scores per employee and KPI.
+
+    A row holds the number and score sum of the employee's closed, evaluated
+    tasks under one KPI that were completed in ``month``, plus the KPI weight
+    and owner (the manager) so KPI-weighted scores for any range of months
+    are a sum over a few rows. Rows are kept current from task changes by
+    ``core.services.score_rollup``; ``rebuild_score_rollups`` recreates them.
+    """
+    employee = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='score_rollups')
+    manager = models.ForeignKey(
+        CustomUser, on_delete=models.SET_NULL, null=True, blank=True, related_name='team_score_rollups',
+        help_text="Owner of the KPI"
+    )
+    kpi = models.ForeignKey(KPI, on_delete=models.CASCADE, related_name='score_rollups')
+    month = models.DateField(verbose_name="Month", help_text="First day of the completion month")
+    task_count = models.PositiveIntegerField(default=0)
+    score_sum = models.FloatField(default=0)
+    weight = models.FloatField(default=0, help_text="KPI weight when the row was last refreshed")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-month', 'employee', 'kpi']
+        verbose_name = "Task Score Rollup"
+        verbose_name_plural = "Task Score Rollups"
+        constraints = [
+            models.UniqueConstraint(fields=['employee', 'kpi', 'month'], name='score_rollup_employee_kpi_month'),
+        ]
+        indexes = [
+            models.Index(fields=['manager', 'month'], name='score_rollup_manager_month_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.employee_id} / KPI {self.kpi_id} / {self.month:%Y-%m}: {self.task_count} tasks"
+
+
+class MonthlyStatsSnapshot(models.Model):
+    """
+    Month-close copy of a manager's monthly statistics table.
+
+    ``rows`` holds one entry per team member (``employee_id`` plus the
+    columns of ``core.services.monthly_stats.STAT_FIELDS``) computed over the
+    tasks created in ``month``. Snapshots exist only for months that have
+    ended and are deleted when a task of their month changes; see
+    ``core.services.monthly_stats``.
+    """
+    manager = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='monthly_stats_snapshots')
+    month = models.DateField(verbose_name="Month", help_text="First day of the month")
+    rows = models.JSONField(default=list, blank=True)
+    built_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-month', 'manager']
+        verbose_name = "Monthly Stats Snapshot"
+        verbose_name_plural = "Monthly Stats Snapshots"
+        constraints = [
+            models.UniqueConstraint(fields=['manager', 'month'], name='monthly_stats_manager_month'),
+        ]
+
+    def __str__(self):
+        return f"{self.manager_id} / {self.month:%Y-%m}: {len(self.rows)} rows"
+
+
+class ExportJob(models.Model):
+    """
+    Excel/PDF report export rendered in the background by ``run_export_jobs``.
+
+    ``params`` is the query string of the report request and ``params_hash``
+    identifies (report, user, parameters) so repeated requests reuse an
+    unfinished job. ``file_path`` is the name of the finished file in the
+    export storage, kept until ``expires_at``; see ``core.services.export_jobs``.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Ready'),
+        ('failed', 'Failed'),
+        ('expired', 'Expired'),
+    ]
+    ACTIVE_STATUSES = ('pending', 'running')
+
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='export_jobs')
+    view_name = models.CharField(max_length=100, help_text="URL name of the report view")
+    export_type = models.CharField(max_length=10)
+    params = models.JSONField(default=dict, blank=True)
+    params_hash = models.CharField(max_length=64, db_index=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending', db_index=True)
+    error = models.TextField(blank=True)
+    file_path = models.CharField(max_length=500, blank=True)
+    file_name = models.CharField(max_length=255, blank=True)
+    file_size = models.PositiveBigIntegerField(null=True, blank=True)
+    content_type = models.CharField(max_length=100, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    expires_at = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = "Export Job"
+        verbose_name_plural = "Export Jobs"
+        constraints = [
+            # One unfinished job per (report, user, parameters); see export_jobs.enqueue
+            models.UniqueConstraint(
+                fields=['params_hash'],
+                condition=models.Q(status__in=('pending', 'running')),
+                name='export_job_active_params_hash',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.view_name} {self.export_type} for {self.user_id}: {self.status}"
+
+    def as_status(self):
+        """JSON-friendly state used by the polling endpoint."""
+        from django.urls import reverse
+
+        return {
+            'id': self.pk,
+            'status': self.status,
+            'status_display': self.get_status_display(),
+            'export_type': self.export_type,
+            'file_name': self.file_name,
+            'error': self.error,
+            'status_url': reverse('core:export-job-status', args=[self.pk]),
+            'download_url': reverse('core:export-job-download', args=[self.pk]) if self.status == 'done' else None,
+            'expires_at': self.expires_at.isoformat() if self.expires_at else None,
+        }
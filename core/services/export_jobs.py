@@ -0,0 +1,353 @@
+"""
+Background Excel/PDF exports (``ExportJob``).
+
+Report views hand export requests to ``enqueue`` and answer immediately with
+the job; a request for the same report, parameters and user while an
+earlier job is still pending or running gets that job back. The
+``run_export_jobs`` worker claims pending jobs and renders each by replaying
+the original GET against the view in-process, with ``request.export_job``
+set so the view builds the file instead of enqueueing again. The file is
+saved to ``export_storage()`` and kept for ``EXPORT_JOB_TTL_HOURS``;
+``purge_expired`` removes it afterwards. When the web and worker processes
+run on different hosts, configure ``STORAGES['exports']`` with a storage
+both can reach. With ``EXPORT_BACKGROUND`` off (no worker deployed) the
+views render their files in the request, as before.
+
+A partial unique constraint allows one pending or running job per
+``params_hash``, so concurrent identical requests share a single job.
+
+Admission control keeps the queue bounded: ``submit`` refuses a new export
+while the user already has ``EXPORT_JOBS_PER_USER`` jobs queued or running,
+or while ``EXPORT_QUEUE_LIMIT`` jobs are pending overall. ``claim_next``
+skips users who already have ``EXPORT_RUNNING_PER_USER`` jobs running, so
+one user's batch cannot occupy every worker. The limits are checked without
+locking and may be overshot by concurrent requests. ``queue_depth`` is the
+metric to watch (logged by the worker, served to admins as JSON).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+from datetime import timedelta
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage, storages
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Min
+from django.urls import resolve, reverse
+from django.utils import timezone
+
+from core.utils.dates import business_timezone
+
+
+EXPORT_TYPES = ('excel', 'pdf')
+
+# Query parameters that never change the exported file
+IGNORED_PARAMS = ('page',)
+
+
+def export_root() -> str:
+    return str(getattr(settings, 'EXPORT_ROOT', os.path.join(settings.BASE_DIR, 'exports')))
+
+
+def export_storage():
+    """Storage of the finished files: ``STORAGES['exports']`` if configured, else ``EXPORT_ROOT`` on local disk."""
+    if 'exports' in settings.STORAGES:
+        return storages['exports']
+    return FileSystemStorage(location=export_root())
+
+
+def background_enabled() -> bool:
+    """Whether exports are queued for ``run_export_jobs`` (False: the views render them in the request)."""
+    return bool(getattr(settings, 'EXPORT_BACKGROUND', True))
+
+
+def job_ttl() -> timedelta:
+    return timedelta(hours=float(getattr(settings, 'EXPORT_JOB_TTL_HOURS', 24)))
+
+
+def queue_limit() -> int:
+    return int(getattr(settings, 'EXPORT_QUEUE_LIMIT', 50))
+
+
+def per_user_limit() -> int:
+    return int(getattr(settings, 'EXPORT_JOBS_PER_USER', 3))
+
+
+def running_per_user() -> int:
+    return int(getattr(settings, 'EXPORT_RUNNING_PER_USER', 1))
+
+
+class ExportRefused(Exception):
+    """An export was not queued; ``status`` is the HTTP status to answer with."""
+
+    def __init__(self, message: str, status: int = 429):
+        super().__init__(message)
+        self.status = status
+
+
+def _params(query) -> Dict[str, str]:
+    return {key: query.get(key, '') for key in sorted(query) if key not in IGNORED_PARAMS}
+
+
+def params_hash(view_name: str, user_id: int, params: Dict[str, str]) -> str:
+    """Identity of an export: same report, user and parameters give the same file."""
+    return hashlib.sha256(json.dumps([view_name, user_id, params], sort_keys=True).encode()).hexdigest()
+
+
+def enqueue(request, view_name: str):
+    """
+    Create a pending export of ``view_name`` for ``request.GET``, or return the
+    pending or running job with identical parameters. Returns ``(job, created)``;
+    raises ``ExportRefused`` when admission control turns the export down.
+    """
+    from core.models import ExportJob
+
+    params = _params(request.GET)
+    digest = params_hash(view_name, request.user.pk, params)
+    job = ExportJob.objects.filter(params_hash=digest, status__in=ExportJob.ACTIVE_STATUSES).first()
+    if job is not None:
+        return job, False
+    active = ExportJob.objects.filter(status__in=ExportJob.ACTIVE_STATUSES)
+    if active.filter(user=request.user).count() >= per_user_limit():
+        raise ExportRefused('You already have exports in progress. Please wait for them to finish.', status=429)
+    if active.filter(status='pending').count() >= queue_limit():
+        raise ExportRefused('The export queue is full. Please try again in a few minutes.', status=503)
+    try:
+        with transaction.atomic():
+            job = ExportJob.objects.create(
+                user=request.user,
+                view_name=view_name,
+                export_type=params.get('export', '').strip().lower(),
+                params=params,
+                params_hash=digest,
+            )
+    except IntegrityError:
+        # A concurrent identical request created the active job first
+        job = ExportJob.objects.filter(params_hash=digest, status__in=ExportJob.ACTIVE_STATUSES).first()
+        if job is None:
+            raise
+        return job, False
+    return job, True
+
+
+def _wants_json(request) -> bool:
+    return request.headers.get('x-requested-with') == 'XMLHttpRequest' or 'application/json' in request.headers.get('accept', '')
+
+
+def job_response(request, job, created: bool = True):
+    """Answer an export request: JSON for scripts and XHR, otherwise the job status page."""
+    from django.http import JsonResponse
+    from django.shortcuts import redirect
+
+    if _wants_json(request):
+        return JsonResponse(dict(job.as_status(), reused=not created), status=202)
+    return redirect('core:export-job', job_id=job.pk)
+
+
+def submit(request, view_name: str):
+    """Enqueue the export of ``request`` and answer it; refused exports go back to the report with a message."""
+    from django.contrib import messages
+    from django.http import JsonResponse
+    from django.shortcuts import redirect
+
+    try:
+        return job_response(request, *enqueue(request, view_name))
+    except ExportRefused as exc:
+        if _wants_json(request):
+            response = JsonResponse({'error': str(exc)}, status=exc.status)
+            response['Retry-After'] = '60'
+            return response
+        messages.error(request, str(exc))
+        query = request.GET.copy()
+        for key in ('export', 'lang'):
+            query.pop(key, None)
+        return redirect(reverse(f'core:{view_name}') + (f'?{query.urlencode()}' if query else ''))
+
+
+def claim_next():
+    """
+    Atomically move the oldest pending job whose user is below the running
+    cap to running and return it (None when there is nothing to start).
+    """
+    from core.models import ExportJob
+
+    while True:
+        # Users at their running cap wait until one of their jobs finishes
+        busy_users = (
+            ExportJob.objects.filter(status='running').order_by().values('user_id')
+            .annotate(running=Count('id')).filter(running__gte=running_per_user()).values('user_id')
+        )
+        job = (
+            ExportJob.objects.filter(status='pending').exclude(user_id__in=busy_users)
+            .order_by('created_at', 'pk').first()
+        )
+        if job is None:
+            return None
+        now = timezone.now()
+        # Conditional UPDATE so two workers never claim the same job
+        if ExportJob.objects.filter(pk=job.pk, status='pending').update(status='running', started_at=now):
+            job.status, job.started_at = 'running', now
+            return job
+
+
+def _filename(response, job) -> str:
+    disposition = response.get('Content-Disposition', '')
+    match = re.search(r'filename="?([^";]+)"?', disposition)
+    name = os.path.basename(match.group(1)) if match else ''
+    return name or f'export_{job.pk}.{"xlsx" if job.export_type == "excel" else "pdf"}'
+
+
+def _replay(job):
+    """
+    Run the job's GET against its view as the job's user. Returns the response
+    and any flash messages. The request is built by hand: it carries the
+    path, the query string and the user, but no host or headers, and does not
+    pass through the middleware.
+    """
+    from django.contrib.messages.storage.cookie import CookieStorage
+    from django.contrib.sessions.backends.signed_cookies import SessionStore
+    from django.http import HttpRequest, QueryDict
+    from django.utils.http import urlencode
+
+    path = reverse(f'core:{job.view_name}')
+    query_string = urlencode(job.params)
+    request = HttpRequest()
+    request.method = 'GET'
+    request.path = request.path_info = path
+    request.META.update(REQUEST_METHOD='GET', PATH_INFO=path, QUERY_STRING=query_string)
+    request.GET = QueryDict(query_string)
+    request.user = job.user
+    request.session = SessionStore()
+    request._messages = CookieStorage(request)
+    request.export_job = job
+    with timezone.override(business_timezone()):
+        response = resolve(path).func(request)
+    return response, [str(message) for message in request._messages]
+
+
+def fail(job, message: str) -> None:
+    from core.models import ExportJob
+
+    ExportJob.objects.filter(pk=job.pk).update(status='failed', error=message[:2000], finished_at=timezone.now())
+
+
+def run_job(job) -> bool:
+    """Render a claimed job to its file. Returns True when the file was produced."""
+    from core.models import ExportJob
+
+    try:
+        response, notes = _replay(job)
+        if response.status_code != 200 or 'attachment' not in response.get('Content-Disposition', ''):
+            # Views report refused exports (no access, employee not found) with a message and a redirect
+            raise ValueError(' '.join(notes) or f'The report did not produce a file (HTTP {response.status_code}).')
+        file_name = _filename(response, job)
+        with tempfile.TemporaryFile() as fh:
+            chunks = response.streaming_content if response.streaming else [response.content]
+            for chunk in chunks:
+                fh.write(chunk)
+            size = fh.tell()
+            fh.seek(0)
+            path = export_storage().save(f'{job.pk}/{file_name}', File(fh, name=file_name))
+        if hasattr(response, 'close'):
+            response.close()
+    except Exception as exc:  # noqa: BLE001 - recorded on the job for the user
+        fail(job, str(exc))
+        return False
+    now = timezone.now()
+    ExportJob.objects.filter(pk=job.pk).update(
+        status='done', file_path=path, file_name=file_name, file_size=size,
+        content_type=response.get('Content-Type', 'application/octet-stream'),
+        finished_at=now, expires_at=now + job_ttl(),
+    )
+    return True
+
+
+def run_job_id(job_id: int) -> bool:
+    """Pool entry point: run a job claimed by the parent process."""
+    from core.models import ExportJob
+
+    return run_job(ExportJob.objects.select_related('user').get(pk=job_id))
+
+
+def init_worker() -> None:
+    """
+    Process-pool initializer: set Django up (needed under spawn), drop the
+    connections inherited from the parent and register the PDF fonts once.
+    """
+    import django
+    from django.db import connections
+
+    django.setup()
+    connections.close_all()
+    from core.utils import pdf
+
+    pdf.warm_up()
+
+
+def queue_depth(now=None) -> Dict[str, object]:
+    """Queue metric: pending and running jobs and the age of the oldest pending one."""
+    from core.models import ExportJob
+
+    now = now or timezone.now()
+    counts = dict(
+        ExportJob.objects.filter(status__in=ExportJob.ACTIVE_STATUSES).order_by()
+        .values_list('status').annotate(total=Count('id'))
+    )
+    oldest = ExportJob.objects.filter(status='pending').aggregate(oldest=Min('created_at'))['oldest']
+    return {
+        'pending': counts.get('pending', 0),
+        'running': counts.get('running', 0),
+        'oldest_pending_seconds': round((now - oldest).total_seconds(), 1) if oldest else 0.0,
+        'limit': queue_limit(),
+    }
+
+
+def fail_abandoned(timeout: timedelta = timedelta(minutes=30)) -> int:
+    """Fail running jobs whose worker stopped (started longer than ``timeout`` ago)."""
+    from core.models import ExportJob
+
+    return ExportJob.objects.filter(status='running', started_at__lt=timezone.now() - timeout).update(
+        status='failed', error='The export worker stopped before the file was ready.', finished_at=timezone.now(),
+    )
+
+
+def purge_expired(now=None) -> Dict[str, int]:
+    """Delete the files of finished jobs past their expiry and mark the jobs expired."""
+    from core.models import ExportJob
+
+    now = now or timezone.now()
+    storage = export_storage()
+    expired = list(ExportJob.objects.filter(status='done', expires_at__lte=now).values_list('pk', 'file_path'))
+    for _, path in expired:
+        if not path:
+            continue
+        try:
+            storage.delete(path)
+        except (OSError, SuspiciousFileOperation):
+            continue
+        if isinstance(storage, FileSystemStorage):
+            # Drop the job's now empty directory
+            try:
+                os.rmdir(os.path.dirname(storage.path(path)))
+            except OSError:
+                pass
+    ExportJob.objects.filter(pk__in=[pk for pk, _ in expired]).update(status='expired', file_path='')
+    return {'expired': len(expired)}
+
+
+def open_file(job) -> Optional[object]:
+    """Binary file handle of a finished, unexpired job, or None."""
+    if job.status != 'done' or not job.file_path or (job.expires_at and job.expires_at <= timezone.now()):
+        return None
+    try:
+        return export_storage().open(job.file_path, 'rb')
+    except (OSError, SuspiciousFileOperation):
+        return None
@@ -0,0 +1,271 @@
+"""
+Per-employee rows of the monthly statistics page and their month-close snapshots.
+
+``compute_rows`` produces the statistics table of ``MonthlyEmployeeStatsView``
+(two grouped queries for the whole team). For a month that has ended the
+rows are stored in a ``MonthlyStatsSnapshot`` per (manager, month): built by
+the daily jobs once the month is over, or by the first view of it, and
+served from then on. A snapshot is deleted when a task created in its month
+is edited or deleted, when the daily status sweep moves one (a target date
+passing turns open into due without an edit), or when one of the manager's
+KPIs changes, and is rebuilt on the next view or job run.
+"""
+
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db.models import Avg, Count, DurationField, ExpressionWrapper, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from core.services import progress_service, reference_data, score_rollup
+from core.utils.dates import business_localdate, business_timezone
+
+
+# Columns of a statistics row, in table order
+STAT_FIELDS = (
+    'total_assigned', 'total_completed', 'priority_high', 'priority_medium', 'priority_low',
+    'completion_rate', 'avg_timeliness_days', 'open_count', 'closed_count', 'due_count', 'avg_final_score',
+)
+
+# Task fields the statistics read; edits to any of them invalidate the task's month
+SOURCE_FIELDS = (
+    'responsible_id', 'created_date', 'target_date', 'close_date', 'completion_date', 'percentage_completion',
+    'priority_id', 'kpi_id', 'evaluation_status', 'final_score',
+)
+
+
+def empty_row() -> Dict:
+    row = dict.fromkeys(STAT_FIELDS, 0)
+    row.update(completion_rate=0.0, avg_timeliness_days=None, avg_final_score=None)
+    return row
+
+
+def month_bounds(month: date) -> Tuple[date, date]:
+    """First and last day of ``month``'s calendar month."""
+    start = month.replace(day=1)
+    following = date(start.year + start.month // 12, start.month % 12 + 1, 1)
+    return start, following - timedelta(days=1)
+
+
+def created_month(value: datetime) -> date:
+    """Month a task belongs to on the statistics page: its creation month in the business timezone."""
+    return timezone.localtime(value, business_timezone()).date().replace(day=1)
+
+
+def is_closed_month(month: date, today: Optional[date] = None) -> bool:
+    """True once ``month`` has ended in the business timezone."""
+    today = today or business_localdate()
+    return month.replace(day=1) < today.replace(day=1)
+
+
+def compute_rows(manager_id, employee_ids: Iterable[int], start_date: date, end_date: date,
+                 created_in_period: bool = False) -> Dict[int, Dict]:
+    """
+    Statistics rows keyed by employee id for the tasks of ``manager_id``'s
+    team touching ``start_date``..``end_date`` (only tasks created in the
+    period with ``created_in_period``). Every id in ``employee_ids`` gets a
+    row. Dates are evaluated in the business timezone, as in a request.
+    """
+    from core.models import CustomUser, Task
+
+    employee_ids = list(employee_ids)
+    with timezone.override(business_timezone()):
+        subordinates = CustomUser.objects.filter(under_supervision_id=manager_id).exclude(user_type='admin')
+        team_tasks = Task.objects.filter(responsible__in=subordinates).with_effective_status()
+        if created_in_period:
+            team_tasks = team_tasks.filter(created_date__date__gte=start_date, created_date__date__lte=end_date)
+
+        # Completed within period: closed by close_date or completion_date window
+        completed = Q(effective_status='closed') & (
+            Q(close_date__gte=start_date, close_date__lte=end_date) |
+            Q(completion_date__date__gte=start_date, completion_date__date__lte=end_date)
+        )
+
+        # KPI-weighted scores of CLOSED & evaluated tasks completed in the period (align with Employees Progress)
+        try:
+            manager_kpi_weights = {
+                kpi.id: float(kpi.weight) for kpi in reference_data.get_snapshot().kpis_for_manager(manager_id)
+            }
+            scored_rows = list(team_tasks.filter(
+                completed, evaluation_status='evaluated', final_score__isnull=False,
+                kpi_id__in=list(manager_kpi_weights),
+            ).order_by().values('responsible_id', 'kpi_id').annotate(task_count=Count('id'), score_sum=Sum('final_score')))
+            team_scores = progress_service.weighted_scores(
+                [row['responsible_id'] for row in scored_rows],
+                [row['kpi_id'] for row in scored_rows],
+                [row['score_sum'] or 0.0 for row in scored_rows],
+                manager_kpi_weights,
+                task_counts=[row['task_count'] for row in scored_rows],
+            )
+        except Exception:
+            team_scores = {}
+
+        # Assigned within period: include any task that touches the period
+        # - created within the window OR
+        # - target date in the window OR
+        # - closed within the window OR
+        # - active during the window (created before end and not closed before start)
+        assigned_window = (
+            Q(created_date__date__gte=start_date, created_date__date__lte=end_date) |
+            Q(target_date__gte=start_date, target_date__lte=end_date) |
+            Q(close_date__gte=start_date, close_date__lte=end_date) |
+            Q(completion_date__date__gte=start_date, completion_date__date__lte=end_date) |
+            (
+                Q(created_date__date__lte=end_date) &
+                (Q(close_date__isnull=True) | Q(close_date__gte=start_date) | Q(completion_date__date__gte=start_date))
+            )
+        )
+        # Timeliness: days before/after target date, on the stored (UTC) completion date like Task evaluation
+        timeliness = ExpressionWrapper(
+            TruncDate('completion_date', tzinfo=dt_timezone.utc) - F('target_date'), output_field=DurationField()
+        )
+        counts = team_tasks.filter(assigned_window, responsible_id__in=employee_ids).order_by().values('responsible_id').annotate(
+            total_assigned=Count('id'),
+            total_completed=Count('id', filter=completed),
+            priority_high=Count('id', filter=Q(priority__code='high')),
+            priority_medium=Count('id', filter=Q(priority__code='medium')),
+            priority_low=Count('id', filter=Q(priority__code='low')),
+            open_count=Count('id', filter=Q(effective_status='open')),
+            closed_count=Count('id', filter=Q(effective_status='closed')),
+            due_count=Count('id', filter=Q(effective_status='due')),
+            avg_timeliness=Avg(timeliness, filter=completed & Q(
+                completion_date__isnull=False, target_date__isnull=False,
+            )),
+        )
+        counts = {row['responsible_id']: row for row in counts}
+
+    rows = {}
+    for employee_id in employee_ids:
+        row = empty_row()
+        found = counts.get(employee_id)
+        if found:
+            row.update({name: found[name] for name in STAT_FIELDS if name in found})
+            if found['total_assigned']:
+                row['completion_rate'] = round((found['total_completed'] / found['total_assigned']) * 100, 2)
+            if found['avg_timeliness'] is not None:
+                row['avg_timeliness_days'] = round(found['avg_timeliness'].total_seconds() / 86400, 2)
+        score = team_scores.get(employee_id)
+        if score is not None and score.score is not None:
+            row['avg_final_score'] = round(float(score.score), 2)
+        rows[employee_id] = row
+    return rows
+
+
+def _team_ids(manager_id) -> List[int]:
+    from core.models import CustomUser
+
+    return list(
+        CustomUser.objects.filter(under_supervision_id=manager_id).exclude(user_type='admin')
+        .order_by('id').values_list('id', flat=True)
+    )
+
+
+def build_snapshot(manager_id, month: date):
+    """Compute and store the rows of ``manager_id``'s whole team for a month."""
+    from core.models import MonthlyStatsSnapshot
+
+    month, end = month_bounds(month)
+    rows = compute_rows(manager_id, _team_ids(manager_id), month, end, created_in_period=True)
+    snapshot, _ = MonthlyStatsSnapshot.objects.update_or_create(
+        manager_id=manager_id, month=month,
+        defaults={'rows': [{'employee_id': employee_id, **row} for employee_id, row in rows.items()]},
+    )
+    return snapshot
+
+
+def snapshot_rows(manager_id, month: date, employee_ids: Iterable[int], build: bool = True) -> Optional[Dict[int, Dict]]:
+    """
+    Stored rows for a month that has ended, building the snapshot first when
+    it is missing (``build``). Returns None for the current month and when the
+    snapshot does not cover every one of ``employee_ids`` (team changed).
+    """
+    from core.models import MonthlyStatsSnapshot
+
+    month = month.replace(day=1)
+    if not is_closed_month(month):
+        return None
+    snapshot = MonthlyStatsSnapshot.objects.filter(manager_id=manager_id, month=month).first()
+    if snapshot is None:
+        if not build:
+            return None
+        snapshot = build_snapshot(manager_id, month)
+    stored = {row['employee_id']: {name: row.get(name) for name in STAT_FIELDS} for row in snapshot.rows}
+    employee_ids = list(employee_ids)
+    if not set(employee_ids) <= stored.keys():
+        return None
+    return {employee_id: stored[employee_id] for employee_id in employee_ids}
+
+
+def build_closed_month(today: Optional[date] = None) -> Dict[str, int]:
+    """
+    Daily job: build missing snapshots of the month that ended last, for every
+    manager with a team. Invalidated older months are rebuilt on their next view.
+    """
+    from core.models import CustomUser, MonthlyStatsSnapshot
+
+    today = today or business_localdate()
+    month = month_bounds(today.replace(day=1) - timedelta(days=1))[0]
+    managers = set(
+        CustomUser.objects.filter(under_supervision__isnull=False).exclude(user_type='admin')
+        .values_list('under_supervision_id', flat=True)
+    )
+    managers -= set(MonthlyStatsSnapshot.objects.filter(month=month).values_list('manager_id', flat=True))
+    for manager_id in sorted(managers):
+        build_snapshot(manager_id, month)
+    return {'built': len(managers)}
+
+
+def invalidate(entries: Iterable[Tuple[Optional[int], Optional[datetime]]]) -> int:
+    """
+    Delete the snapshots holding tasks of these (responsible id, created date)
+    pairs: the creation month of each, for the responsible's manager.
+    """
+    from core.models import CustomUser, MonthlyStatsSnapshot
+
+    today = business_localdate()
+    months: Dict[int, set] = {}
+    for responsible_id, created in entries:
+        if responsible_id and created and is_closed_month(created_month(created), today):
+            months.setdefault(responsible_id, set()).add(created_month(created))
+    if not months:
+        return 0
+    managers = dict(
+        CustomUser.objects.filter(id__in=months, under_supervision__isnull=False)
+        .values_list('id', 'under_supervision_id')
+    )
+    condition = Q()
+    for responsible_id, manager_id in managers.items():
+        condition |= Q(manager_id=manager_id, month__in=months[responsible_id])
+    if not condition:
+        return 0
+    return MonthlyStatsSnapshot.objects.filter(condition).delete()[0]
+
+
+def invalidate_for_tasks(task_ids: Iterable[int], batch_size: int = 1000) -> int:
+    """Invalidate the snapshots of tasks changed with bulk UPDATEs (which skip ``post_save``)."""
+    from core.models import Task
+
+    task_ids = list(task_ids)
+    deleted = 0
+    for offset in range(0, len(task_ids), batch_size):
+        deleted += invalidate(
+            Task.objects.filter(pk__in=task_ids[offset:offset + batch_size]).values_list('responsible_id', 'created_date')
+        )
+    return deleted
+
+
+def task_saved(task) -> int:
+    """Invalidate the month a saved task belongs to (and belonged to), if a field the statistics read changed."""
+    change = score_rollup.task_change(task, fields=SOURCE_FIELDS)
+    if change is None:
+        return 0
+    return invalidate(
+        (values['responsible_id'], values['created_date']) for values in change if values
+    )
+
+
+def task_deleted(task) -> int:
+    return invalidate([(task.responsible_id, task.created_date)])
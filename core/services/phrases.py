@@ -0,0 +1,133 @@
+"""
+Per-process catalog of the frontend phrase dictionaries for server-side text.
+
+The Excel/PDF exports translate their labels with the same JSON files the
+browser uses (``core/i18n/<lang>.json`` and ``core/i18n/phrases.<lang>.json``).
+Each language is loaded and merged once into an immutable lookup that
+already includes the export overrides (headings kept in English, built-in
+Arabic fallbacks), so translating is one dictionary get. The files' mtimes
+are checked at most every ``MTIME_CHECK_INTERVAL`` seconds and the catalog
+is rebuilt when one of them changed, appeared or disappeared.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple
+import json
+import os
+import threading
+import time
+
+
+MTIME_CHECK_INTERVAL = 5  # seconds between file stat checks
+
+# Headings the exports keep in English even when Arabic is selected
+ENGLISH_HEADINGS = frozenset({
+    'Monthly Employee Statistics', 'Charts', 'Monthly Status',
+    'Number of Tasks', 'Status', 'Monthly Task Creation Trend', 'Month',
+    'Open', 'Closed', 'Due',
+})
+
+# Direct fallback for specific Arabic translations if not found in files
+ARABIC_FALLBACKS = {
+    'Task Priority Distribution': 'توزيع الأولويات للمهام',
+    'Employee': 'الموظف',
+    'Open': 'مفتوح',
+    'Closed': 'مغلق',
+    'Due': 'مستحق',
+    'High': 'عالي',
+    'Medium': 'متوسط',
+    'Low': 'منخفض',
+}
+
+
+@dataclass(frozen=True)
+class PhraseCatalog:
+    lang: str
+    lookup: Mapping[str, str]
+    # (path, (mtime_ns, size) or None when missing) of every candidate file
+    sources: Tuple[Tuple[str, Optional[Tuple[int, int]]], ...]
+
+    def translate(self, text) -> str:
+        """Translation of ``text``, or ``text`` itself when the catalog has none."""
+        if not text:
+            return ''
+        return self.lookup.get(text, text)
+
+
+def _candidate_paths(lang: str) -> List[str]:
+    """Phrase files in merge order (later files override earlier ones)."""
+    from django.conf import settings
+    from django.contrib.staticfiles import finders
+
+    names = (f'{lang}.json', f'phrases.{lang}.json')
+    paths = [finders.find(f'core/i18n/{name}') for name in names]
+    # Direct static file paths as fallback
+    paths += [os.path.join(settings.BASE_DIR, 'OpticorAI_Lynx_Project_Management_System', 'static', 'core', 'i18n', name) for name in names]
+    paths += [os.path.join(settings.STATIC_ROOT or '', 'core', 'i18n', name) for name in names]
+    return [path for path in paths if path]
+
+
+def _stat(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _build(lang: str) -> PhraseCatalog:
+    sources = tuple((path, _stat(path)) for path in _candidate_paths(lang))
+    phrases: Dict[str, str] = {}
+    if lang == 'ar':
+        phrases.update(ARABIC_FALLBACKS)
+    for path, stamp in sources:
+        if stamp is None:
+            continue
+        try:
+            with open(path, 'r', encoding='utf-8') as fh:
+                data = json.load(fh)
+        except Exception:
+            continue
+        if isinstance(data, dict):
+            # Nested sections (nav, ...) are for the frontend only
+            phrases.update((key, value) for key, value in data.items() if isinstance(value, str))
+    if lang == 'ar':
+        phrases.update((heading, heading) for heading in ENGLISH_HEADINGS)
+    return PhraseCatalog(lang=lang, lookup=MappingProxyType(phrases), sources=sources)
+
+
+_lock = threading.Lock()
+_catalogs: Dict[str, PhraseCatalog] = {}
+_checked_at: Dict[str, float] = {}
+
+
+def _stale(catalog: PhraseCatalog) -> bool:
+    return any(_stat(path) != stamp for path, stamp in catalog.sources)
+
+
+def get_catalog(lang: str) -> PhraseCatalog:
+    """Catalog of ``lang`` ('ar' or 'en'), reloaded when its files changed on disk."""
+    now = time.monotonic()
+    catalog = _catalogs.get(lang)
+    if catalog is not None and now - _checked_at.get(lang, 0.0) < MTIME_CHECK_INTERVAL:
+        return catalog
+    with _lock:
+        catalog = _catalogs.get(lang)
+        if catalog is None or _stale(catalog):
+            catalog = _catalogs[lang] = _build(lang)
+        _checked_at[lang] = now
+        return catalog
+
+
+def translate(text, lang: str) -> str:
+    return get_catalog(lang).translate(text)
+
+
+def invalidate() -> None:
+    """Drop every catalog so the next lookup reloads the files."""
+    with _lock:
+        _catalogs.clear()
+        _checked_at.clear()
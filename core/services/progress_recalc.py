@@ -0,0 +1,136 @@
+"""
+Bulk recalculation of ``EmployeeProgress`` records.
+
+Work is split into units of one manager, one period and a slice of that
+manager's employees. A unit is self-contained (ids and dates only) so it can
+be pickled to a worker process, which opens its own database connection,
+computes every record of the unit with ``EmployeeProgress.calculate_progress``
+and upserts them with a single ``bulk_create``.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+
+PERIOD_CHOICES = ('monthly', 'quarterly', 'custom')
+
+UPSERT_FIELDS = ['total_progress_score', 'progress_breakdown', 'calculated_by', 'updated_at']
+
+
+@dataclass(frozen=True)
+class ProgressUnit:
+    manager_id: int
+    period_start: date
+    period_end: date
+    employee_ids: Tuple[int, ...]
+
+    @property
+    def key(self) -> str:
+        """Stable identifier used in checkpoint files."""
+        return f"{self.manager_id}:{self.period_start}:{self.period_end}:{self.employee_ids[0]}-{self.employee_ids[-1]}"
+
+
+def _add_months(day: date, months: int) -> date:
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def iter_periods(kind: str, start: date, end: date) -> Iterator[Tuple[date, date]]:
+    """
+    Calendar months or quarters overlapping ``start``..``end`` (whole periods),
+    or the single ``start``..``end`` window for ``custom``.
+    """
+    if kind == 'custom':
+        yield start, end
+        return
+    step = 3 if kind == 'quarterly' else 1
+    month_index = (start.month - 1) // step * step
+    period_start = date(start.year, month_index + 1, 1)
+    while period_start <= end:
+        following = _add_months(period_start, step)
+        yield period_start, following - timedelta(days=1)
+        period_start = following
+
+
+def build_units(periods: Sequence[Tuple[date, date]], manager_ids: Optional[Sequence[int]] = None,
+                batch_size: int = 50) -> List[ProgressUnit]:
+    """
+    Enumerate (manager, period, employees) units for every supervised employee
+    whose manager has active KPIs.
+    """
+    from core.models import CustomUser
+    from core.services import reference_data
+
+    refs = reference_data.get_snapshot()
+    teams = {}
+    employees = CustomUser.objects.filter(under_supervision__isnull=False)
+    if manager_ids:
+        employees = employees.filter(under_supervision_id__in=manager_ids)
+    for employee_id, manager_id in employees.order_by('under_supervision_id', 'id').values_list('id', 'under_supervision_id'):
+        teams.setdefault(manager_id, []).append(employee_id)
+
+    units = []
+    for manager_id, employee_ids in teams.items():
+        if not refs.kpis_for_manager(manager_id):
+            continue  # calculate_progress() yields nothing without active KPIs
+        for period_start, period_end in periods:
+            for offset in range(0, len(employee_ids), batch_size):
+                units.append(ProgressUnit(manager_id, period_start, period_end, tuple(employee_ids[offset:offset + batch_size])))
+    return units
+
+
+def recalculate_unit(unit: ProgressUnit) -> Tuple[int, int]:
+    """
+    Recalculate and upsert the records of one unit. Returns ``(employees, records written)``.
+    Runs in the business timezone, like the in-request recalculation. Stale
+    flags are cleared before calculating, as in ``EmployeeProgress.recalculate``,
+    and set again on the records that are not written back.
+    """
+    from django.utils import timezone
+
+    from core.models import EmployeeProgress
+    from core.utils.dates import business_timezone
+
+    existing = EmployeeProgress.objects.filter(
+        manager_id=unit.manager_id, period_start=unit.period_start, period_end=unit.period_end,
+        employee_id__in=unit.employee_ids,
+    )
+    stale_ids = set(existing.filter(is_stale=True).values_list('employee_id', flat=True))
+    if stale_ids:
+        existing.filter(employee_id__in=stale_ids).update(is_stale=False)
+    records = []
+    with timezone.override(business_timezone()):
+        for employee_id in unit.employee_ids:
+            record = EmployeeProgress(
+                employee_id=employee_id, manager_id=unit.manager_id,
+                period_start=unit.period_start, period_end=unit.period_end,
+            )
+            if record.calculate_progress():
+                records.append(record)
+    if records:
+        EmployeeProgress.objects.bulk_create(
+            records,
+            update_conflicts=True,
+            unique_fields=['employee', 'manager', 'period_start', 'period_end'],
+            update_fields=UPSERT_FIELDS,
+        )
+    unwritten = stale_ids - {record.employee_id for record in records}
+    if unwritten:
+        existing.filter(employee_id__in=unwritten).update(is_stale=True)
+    return len(unit.employee_ids), len(records)
+
+
+def init_worker() -> None:
+    """
+    Process-pool initializer. The parent closes its connections before the
+    pool starts; each worker sets Django up (needed under spawn) and opens
+    its own connection on first query.
+    """
+    import django
+    from django.db import connections
+
+    django.setup()
+    connections.close_all()
@@ -1,6 +1,103 @@
 from __future__ import annotations
 
-from typing import Dict, Any, Iterable
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Iterable, Mapping, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is optional; weighted_scores falls back to pure Python
+    np = None
+
+
+@dataclass(frozen=True)
+class WeightedScore:
+    weighted_sum: float  # sum(final_score * KPI weight)
+    total_weight: float  # sum(KPI weight), one per task
+    task_count: int
+
+    @property
+    def score(self) -> Optional[float]:
+        return round(self.weighted_sum / self.total_weight, 2) if self.total_weight > 0 else None
+
+
+def weighted_scores(
+    group_ids: Sequence[Hashable],
+    kpi_ids: Sequence[Optional[int]],
+    final_scores: Sequence[float],
+    kpi_weights: Mapping[int, float],
+    task_counts: Optional[Sequence[int]] = None,
+) -> Dict[Hashable, WeightedScore]:
+    """
+    Per-task KPI weighting for many groups (employees, managers) at once:
+    score = sum(final_score * weight) / sum(weight), every task counting with
+    the weight of its KPI. This is the formula of the progress reports.
+
+    Inputs are columns with one entry per task. With ``task_counts`` each
+    entry is instead a pre-aggregated group of tasks under one KPI (e.g. a SQL
+    GROUP BY or a score rollup row) and ``final_scores`` holds the score sum.
+    Tasks whose KPI is not in ``kpi_weights`` are ignored; groups without any
+    weighted task are left out of the result.
+    """
+    if np is not None and len(group_ids):
+        groups, kpis = _int_column(group_ids), _int_column(kpi_ids)
+        if groups is not None and kpis is not None:
+            return _weighted_scores_numpy(groups, kpis, final_scores, kpi_weights, task_counts)
+
+    totals: Dict[Hashable, list] = {}
+    counts = task_counts if task_counts is not None else [1] * len(group_ids)
+    for group_id, kpi_id, score, count in zip(group_ids, kpi_ids, final_scores, counts):
+        weight = kpi_weights.get(kpi_id)
+        if weight is None:
+            continue
+        total = totals.setdefault(group_id, [0.0, 0.0, 0])
+        total[0] += float(score) * weight
+        total[1] += count * weight
+        total[2] += count
+    return {group_id: WeightedScore(*total) for group_id, total in totals.items()}
+
+
+def _int_column(values):
+    """int64 array with None as -1, or None if the values are not all ints or None."""
+    column = np.asarray(values)
+    if column.dtype.kind in 'iu':
+        return column.astype(np.int64, copy=False)
+    if column.dtype != object:
+        return None
+    try:
+        return np.fromiter((-1 if v is None else v for v in column), dtype=np.int64, count=len(column))
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+def _factorize(values):
+    """(sorted distinct values, index of each value into them); ids are >= -1."""
+    if len(values) and values.min() >= -1 and values.max() < 4 * len(values) + 1024:
+        # Compact id range: a presence table avoids the sort in np.unique
+        present = np.zeros(int(values.max()) + 2, dtype=bool)
+        present[values + 1] = True
+        position = np.cumsum(present) - 1
+        return np.flatnonzero(present) - 1, position[values + 1]
+    return np.unique(values, return_inverse=True)
+
+
+def _weighted_scores_numpy(groups, kpis, final_scores, kpi_weights, task_counts):
+    kpi_values, kpi_index = _factorize(kpis)
+    weights = np.array([kpi_weights.get(int(k), np.nan) if k != -1 else np.nan for k in kpi_values], dtype=float)[kpi_index]
+    weighted = ~np.isnan(weights)
+
+    weights = weights[weighted]
+    scores = np.asarray(final_scores, dtype=float)[weighted]
+    counts = np.ones(len(weights)) if task_counts is None else np.asarray(task_counts, dtype=float)[weighted]
+    group_values, group_index = _factorize(groups[weighted])
+    size = len(group_values)
+    # bincount adds in input order, so sums match the pure-Python path exactly
+    weighted_sums = np.bincount(group_index, weights=scores * weights, minlength=size)
+    total_weights = np.bincount(group_index, weights=counts * weights, minlength=size)
+    task_totals = np.bincount(group_index, weights=counts, minlength=size)
+    return {
+        (None if group_id == -1 else int(group_id)): WeightedScore(float(ws), float(tw), int(tc))
+        for group_id, ws, tw, tc in zip(group_values.tolist(), weighted_sums.tolist(), total_weights.tolist(), task_totals.tolist())
+    }
 
 
 def compute_weighted_progress(
@@ -12,7 +109,16 @@ def compute_weighted_progress(
 
     tasks: iterable of { 'final_score': float, 'kpi_id': int, 'completion_date': str|None }
     kpis: iterable of { 'id': int, 'name': str, 'weight': float }
+
+    Uses the same per-task weighting as ``weighted_scores`` and
+    ``EmployeeProgress.calculate_progress``: every task counts with its KPI's
+    weight, sum(final_score * weight) / sum(weight). This function used to
+    average each KPI first, sum(avg_k * weight_k) / sum(weight_k), so a KPI
+    counted once however many tasks it had; the two agree only when every
+    scored KPI has the same number of tasks. ``weighted_score`` in the
+    breakdown is likewise sum(final_score) * weight, no longer avg * weight / 100.
     """
+    kpis = list(kpis)
     kpi_by_id = {k['id']: k for k in kpis}
     grouped: Dict[int, list] = {}
     for t in tasks:
@@ -24,24 +130,16 @@ def compute_weighted_progress(
         grouped.setdefault(kpi_id, []).append(float(t['final_score']))
 
     breakdown = {}
-    total_weighted = 0.0
-    total_weight = 0.0
-
     for kpi in kpis:
         scores = grouped.get(kpi['id'], [])
         if scores:
-            avg = sum(scores) / len(scores)
-            weighted = (avg * kpi['weight']) / 100.0
             breakdown[kpi['name']] = {
                 'kpi_id': kpi['id'],
                 'weight': kpi['weight'],
                 'task_count': len(scores),
-                'average_score': round(avg, 2),
-                'weighted_score': round(weighted, 2),
+                'average_score': round(sum(scores) / len(scores), 2),
+                'weighted_score': round(sum(scores) * float(kpi['weight']), 2),
             }
-            total_weighted += weighted
-            # Denominator accounts only for KPIs that have at least one included task
-            total_weight += kpi['weight']
         else:
             breakdown[kpi['name']] = {
                 'kpi_id': kpi['id'],
@@ -52,12 +150,14 @@ def compute_weighted_progress(
             }
             # Do NOT add this KPI's weight to total_weight when there are no included tasks
 
-    total_progress = (total_weighted / total_weight) * 100 if total_weight > 0 else 0.0
+    kpi_ids = [kpi_id for kpi_id in grouped]
+    total = weighted_scores(
+        [0] * len(kpi_ids), kpi_ids, [sum(grouped[kpi_id]) for kpi_id in kpi_ids],
+        {k['id']: float(k['weight']) for k in kpis}, task_counts=[len(grouped[kpi_id]) for kpi_id in kpi_ids],
+    ).get(0)
 
     return {
-        'total_progress_score': round(total_progress, 2),
+        'total_progress_score': (total.score or 0.0) if total else 0.0,
         'progress_breakdown': breakdown,
-        'total_weight': total_weight,
+        'total_weight': total.total_weight if total else 0.0,
     }
-
-
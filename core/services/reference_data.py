@@ -0,0 +1,147 @@
+"""
+Per-process cache of small reference tables.
+
+Evaluation settings, priority types, quality types and KPIs change rarely
+but are read on every evaluation, dashboard and report. They are kept in an
+immutable per-process snapshot. A version counter in the database
+(``DataVersion``) is bumped whenever one of these models is saved or
+deleted (see ``core.signals``); each process checks the counter at most
+every ``VERSION_CHECK_INTERVAL`` seconds and rebuilds its snapshot when it
+moved. The database is shared by every process, the Django cache may not be.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping, Optional, Tuple
+import threading
+import time
+
+from core.services.task_service import EvaluationSettings
+
+
+VERSION_NAME = 'reference_data'
+VERSION_CHECK_INTERVAL = 5  # seconds between shared-cache version checks
+MAX_AGE = 300  # rebuild at least this often in case a version bump was missed
+
+
+@dataclass(frozen=True)
+class PriorityRef:
+    id: int
+    name: str
+    code: str
+    multiplier: float
+    is_active: bool
+    sort_order: int
+
+
+@dataclass(frozen=True)
+class QualityRef:
+    id: int
+    name: str
+    percentage: float
+    is_active: bool
+    sort_order: int
+
+
+@dataclass(frozen=True)
+class KPIRef:
+    id: int
+    name: str
+    weight: float
+    is_active: bool
+    sort_order: int
+    created_by_id: Optional[int]
+
+
+@dataclass(frozen=True)
+class ReferenceSnapshot:
+    version: int
+    evaluation_settings: EvaluationSettings
+    priorities: Tuple[PriorityRef, ...]
+    qualities: Tuple[QualityRef, ...]
+    kpis: Tuple[KPIRef, ...]
+    priorities_by_id: Mapping[int, PriorityRef]
+    qualities_by_id: Mapping[int, QualityRef]
+    kpis_by_id: Mapping[int, KPIRef]
+
+    def active_priorities(self) -> Tuple[PriorityRef, ...]:
+        return tuple(p for p in self.priorities if p.is_active)
+
+    def kpis_for_manager(self, manager_id: int, active_only: bool = True) -> Tuple[KPIRef, ...]:
+        """KPIs created by ``manager_id`` in display order (sort_order, name)."""
+        return tuple(
+            k for k in self.kpis
+            if k.created_by_id == manager_id and (k.is_active or not active_only)
+        )
+
+
+_lock = threading.Lock()
+_snapshot: Optional[ReferenceSnapshot] = None
+_built_at = 0.0
+_checked_at = 0.0
+
+
+def _build(version: int) -> ReferenceSnapshot:
+    from core.models import KPI, QualityType, TaskEvaluationSettings, TaskPriorityType
+
+    # Unlike get_settings(), never create the row here; fall back to field defaults
+    settings_row = TaskEvaluationSettings.objects.first() or TaskEvaluationSettings()
+    priorities = tuple(
+        PriorityRef(id=p['id'], name=p['name'], code=p['code'], multiplier=p['multiplier'],
+                    is_active=p['is_active'], sort_order=p['sort_order'])
+        for p in TaskPriorityType.objects.values('id', 'name', 'code', 'multiplier', 'is_active', 'sort_order')
+    )
+    qualities = tuple(
+        QualityRef(id=q['id'], name=q['name'], percentage=q['percentage'],
+                   is_active=q['is_active'], sort_order=q['sort_order'])
+        for q in QualityType.objects.values('id', 'name', 'percentage', 'is_active', 'sort_order')
+    )
+    kpis = tuple(
+        KPIRef(id=k['id'], name=k['name'], weight=k['weight'], is_active=k['is_active'],
+               sort_order=k['sort_order'], created_by_id=k['created_by_id'])
+        for k in KPI.objects.values('id', 'name', 'weight', 'is_active', 'sort_order', 'created_by_id')
+    )
+    return ReferenceSnapshot(
+        version=version,
+        evaluation_settings=settings_row.as_evaluation_settings(),
+        priorities=priorities,
+        qualities=qualities,
+        kpis=kpis,
+        priorities_by_id=MappingProxyType({p.id: p for p in priorities}),
+        qualities_by_id=MappingProxyType({q.id: q for q in qualities}),
+        kpis_by_id=MappingProxyType({k.id: k for k in kpis}),
+    )
+
+
+def get_snapshot() -> ReferenceSnapshot:
+    """Return the current reference snapshot, rebuilding it if another process changed the data."""
+    global _snapshot, _built_at, _checked_at
+    now = time.monotonic()
+    snapshot = _snapshot
+    if snapshot is not None and now - _checked_at < VERSION_CHECK_INTERVAL:
+        return snapshot
+    from core.models import DataVersion
+
+    with _lock:
+        version = DataVersion.current(VERSION_NAME)
+        _checked_at = now
+        if _snapshot is None or _snapshot.version != version or now - _built_at > MAX_AGE:
+            _snapshot = _build(version)
+            _built_at = now
+        return _snapshot
+
+
+def get_evaluation_settings() -> EvaluationSettings:
+    return get_snapshot().evaluation_settings
+
+
+def invalidate() -> None:
+    """Publish a new version so every process rebuilds its snapshot on next use."""
+    from core.models import DataVersion
+
+    global _snapshot
+    DataVersion.bump(VERSION_NAME)
+    with _lock:
+        _snapshot = None
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from django.db import transaction
+from django.utils import timezone
+
+from core.services import monthly_stats, reference_data, score_rollup
+from core.services.task_service import compute_automatic_evaluation_batch, manager_closure_flags
+
+
+# Columns rewritten by a rescore; completion_date and evaluation_status are left alone
+RESCORE_FIELDS = (
+    'quality_score_calculated', 'priority_multiplier', 'time_bonus_penalty',
+    'final_score', 'manager_closure_penalty_applied',
+)
+
+UPDATE_BATCH_SIZE = 500
+
+# Upper bounds (exclusive) of the score-delta histogram buckets; the last bucket is open-ended
+DELTA_BUCKETS = (-20.0, -10.0, -5.0, -1.0, -0.005, 0.005, 1.0, 5.0, 10.0, 20.0)
+
+
+def delta_bucket(delta):
+    """Index of the histogram bucket for a score change."""
+    return bisect_right(DELTA_BUCKETS, delta)
+
+
+def delta_bucket_labels():
+    labels = [f"< {DELTA_BUCKETS[0]:+g}"]
+    labels += [f"[{lower:+g}, {upper:+g})" for lower, upper in zip(DELTA_BUCKETS, DELTA_BUCKETS[1:])]
+    labels.append(f">= {DELTA_BUCKETS[-1]:+g}")
+    return labels
+
+
+@dataclass
+class RescoreReport:
+    dry_run: bool = False
+    scanned: int = 0
+    changed: int = 0  # tasks whose final score moved
+    updated: int = 0  # tasks with any evaluation column rewritten
+    score_before: float = 0.0
+    score_after: float = 0.0
+    largest_increase: Optional[Tuple[int, float, float]] = None  # (task id, before, after)
+    largest_decrease: Optional[Tuple[int, float, float]] = None
+    histogram: List[int] = field(default_factory=lambda: [0] * (len(DELTA_BUCKETS) + 1))
+    progress_recalculated: int = 0
+    # employee id -> (earliest, latest) completion date among changed tasks
+    affected: Dict[int, Tuple[date, date]] = field(default_factory=dict)
+
+    def record(self, task_id, responsible_id, completion_date, before, after):
+        self.scanned += 1
+        before = before or 0.0
+        self.score_before += before
+        self.score_after += after
+        delta = after - before
+        self.histogram[delta_bucket(delta)] += 1
+        if abs(delta) < 0.005:
+            return
+        self.changed += 1
+        if delta > 0 and (self.largest_increase is None or delta > self.largest_increase[2] - self.largest_increase[1]):
+            self.largest_increase = (task_id, before, after)
+        if delta < 0 and (self.largest_decrease is None or delta < self.largest_decrease[2] - self.largest_decrease[1]):
+            self.largest_decrease = (task_id, before, after)
+        if responsible_id and completion_date:
+            low, high = self.affected.get(responsible_id, (completion_date, completion_date))
+            self.affected[responsible_id] = (min(low, completion_date), max(high, completion_date))
+
+    @property
+    def mean_before(self):
+        return self.score_before / self.scanned if self.scanned else 0.0
+
+    @property
+    def mean_after(self):
+        return self.score_after / self.scanned if self.scanned else 0.0
+
+    def histogram_rows(self):
+        """(label, count) pairs for the score-delta histogram."""
+        return list(zip(delta_bucket_labels(), self.histogram))
+
+    def summary(self):
+        return (
+            f"{'Would update' if self.dry_run else 'Updated'} {self.updated} of {self.scanned} evaluated tasks "
+            f"({self.changed} with a different final score); "
+            f"mean final score {self.mean_before:.2f} -> {self.mean_after:.2f}; "
+            f"{self.progress_recalculated} progress records recalculated"
+        )
+
+
+def _as_list(column):
+    return column.tolist() if hasattr(column, 'tolist') else list(column)
+
+
+def rescore_tasks(queryset=None, dry_run=False, chunk_size=2000, recalculate_progress=True):
+    """
+    Recompute the automatic evaluation of evaluated tasks with the current
+    evaluation settings, quality percentages and priority multipliers.
+
+    Tasks are read in primary-key chunks as plain rows, scored column-wise with
+    ``compute_automatic_evaluation_batch`` and written back with set-based UPDATEs;
+    ``Task.save()`` (and its notifications) is not involved; the score rollups
+    and monthly statistics snapshots of changed tasks are refreshed in the
+    same transaction. Tasks that were
+    evaluated while incomplete are treated as manager closures
+    (``manager_closure_flags``). Employee
+    progress records covering a changed task are recalculated afterwards.
+    """
+    from core.models import EmployeeProgress, Task
+
+    if queryset is None:
+        queryset = Task.objects.all()
+    queryset = queryset.filter(evaluation_status='evaluated', quality__isnull=False).order_by('pk')
+
+    refs = reference_data.get_snapshot()
+    settings = refs.evaluation_settings
+    report = RescoreReport(dry_run=dry_run)
+    columns = (
+        'pk', 'responsible_id', 'quality_id', 'priority_id', 'completion_date', 'target_date',
+        'percentage_completion',
+    ) + RESCORE_FIELDS
+    last_pk = 0
+    while True:
+        rows = list(queryset.filter(pk__gt=last_pk).values_list(*columns)[:chunk_size])
+        if not rows:
+            break
+        last_pk = rows[-1][0]
+        # Rescored tasks share few distinct results, so group them and write one
+        # UPDATE ... WHERE id IN (...) per result; far cheaper than bulk_update's CASE per row
+        changed: Dict[tuple, List[int]] = {}
+        rows = [row for row in rows if row[2] in refs.qualities_by_id]
+        if not rows:
+            continue
+        (pks, responsible_ids, quality_ids, priority_ids, completion_dates, target_dates, percentages,
+         *current) = zip(*rows)
+        completed_on = [value.date() if value else None for value in completion_dates]
+        result = compute_automatic_evaluation_batch(
+            settings,
+            quality_percentage=[refs.qualities_by_id[quality_id].percentage for quality_id in quality_ids],
+            priority_multiplier=[
+                refs.priorities_by_id[priority_id].multiplier if priority_id in refs.priorities_by_id else None
+                for priority_id in priority_ids
+            ],
+            completion_day=[value.toordinal() if value else None for value in completed_on],
+            target_day=[value.toordinal() if value else None for value in target_dates],
+            percentage_completion=percentages,
+            manager_closure=manager_closure_flags(percentages),
+        )
+        new_columns = [_as_list(result[key]) for key in (
+            'quality_score', 'priority_multiplier', 'time_bonus_penalty', 'final_score',
+            'manager_closure_penalty_applied',
+        )]
+        for index, new_values in enumerate(zip(*new_columns)):
+            old_values = tuple(column[index] for column in current)
+            report.record(pks[index], responsible_ids[index], completed_on[index], old_values[3], new_values[3])
+            if new_values != old_values:
+                changed.setdefault(new_values, []).append(pks[index])
+        report.updated += sum(len(pks) for pks in changed.values())
+        if changed and not dry_run:
+            now = timezone.now()
+            with transaction.atomic():
+                for new_values, pks in changed.items():
+                    for offset in range(0, len(pks), UPDATE_BATCH_SIZE):
+                        Task.objects.filter(pk__in=pks[offset:offset + UPDATE_BATCH_SIZE]).update(
+                            updated_date=now, **dict(zip(RESCORE_FIELDS, new_values))
+                        )
+                changed_pks = [pk for pks in changed.values() for pk in pks]
+                score_rollup.refresh_for_tasks(changed_pks)
+                monthly_stats.invalidate_for_tasks(changed_pks)
+
+    if recalculate_progress and not dry_run and report.affected:
+        records = EmployeeProgress.objects.filter(employee_id__in=report.affected).select_related('employee', 'manager')
+        for record in records:
+            low, high = report.affected[record.employee_id]
+            if record.period_start <= high and record.period_end >= low:
+                record.recalculate()
+                report.progress_recalculated += 1
+
+    return report
@@ -0,0 +1,250 @@
+"""
+Monthly score rollups (``TaskScoreRollup``).
+
+Each rollup row counts the closed, evaluated tasks of one employee under one
+KPI completed in one month. Rows are never adjusted incrementally: whenever
+a task's contribution may have changed (evaluated, re-scored, reassigned,
+moved to another KPI or month, deleted) the affected rows are recomputed
+from the task table inside a transaction, so they cannot drift. Months are
+calendar months in the business timezone, the zone the views' and progress
+records' ``completion_date__date`` filters run in.
+"""
+
+from __future__ import annotations
+
+from datetime import date, datetime, time
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Count, DateField, Q, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from core.services import progress_service
+from core.utils.dates import business_timezone
+
+
+RollupKey = Tuple[int, int, date]  # (employee id, KPI id, first day of month)
+
+# Task fields that decide which rollup row a task counts towards and with what score
+SOURCE_FIELDS = ('responsible_id', 'kpi_id', 'completion_date', 'status', 'evaluation_status', 'final_score')
+
+KEY_BATCH_SIZE = 200
+
+
+def month_start(value) -> date:
+    """First day of the month of a date or datetime (datetimes in the business timezone)."""
+    if isinstance(value, datetime):
+        if timezone.is_aware(value):
+            value = timezone.localtime(value, business_timezone())
+        value = value.date()
+    return value.replace(day=1)
+
+
+def _month_bounds(month: date) -> Tuple[datetime, datetime]:
+    tz = business_timezone()
+    following = date(month.year + month.month // 12, month.month % 12 + 1, 1)
+    return (
+        timezone.make_aware(datetime.combine(month, time.min), tz),
+        timezone.make_aware(datetime.combine(following, time.min), tz),
+    )
+
+
+def rollup_key(values: Mapping) -> Optional[RollupKey]:
+    """Rollup row a task with these ``SOURCE_FIELDS`` values counts towards, or None."""
+    if (values.get('status') != 'closed' or values.get('evaluation_status') != 'evaluated'
+            or values.get('final_score') is None or not values.get('responsible_id')
+            or not values.get('kpi_id') or not values.get('completion_date')):
+        return None
+    return values['responsible_id'], values['kpi_id'], month_start(values['completion_date'])
+
+
+def _scored_tasks():
+    from core.models import Task
+
+    return Task.objects.filter(
+        status='closed', evaluation_status='evaluated', final_score__isnull=False,
+        kpi__isnull=False, completion_date__isnull=False,
+    )
+
+
+def _grouped(queryset):
+    return (
+        queryset.order_by()
+        .annotate(month=TruncMonth('completion_date', output_field=DateField(), tzinfo=business_timezone()))
+        .values('responsible_id', 'kpi_id', 'kpi__created_by_id', 'kpi__weight', 'month')
+        .annotate(task_count=Count('id'), score_sum=Sum('final_score'))
+    )
+
+
+def _rollup(row):
+    from core.models import TaskScoreRollup
+
+    return TaskScoreRollup(
+        employee_id=row['responsible_id'],
+        manager_id=row['kpi__created_by_id'],
+        kpi_id=row['kpi_id'],
+        month=row['month'],
+        task_count=row['task_count'],
+        score_sum=float(row['score_sum'] or 0.0),
+        weight=float(row['kpi__weight'] or 0.0),
+    )
+
+
+def _refresh_batch(keys: set) -> int:
+    from core.models import TaskScoreRollup
+
+    months = sorted(month for _, _, month in keys)
+    queryset = _scored_tasks().filter(
+        responsible_id__in={employee_id for employee_id, _, _ in keys},
+        kpi_id__in={kpi_id for _, kpi_id, _ in keys},
+        completion_date__gte=_month_bounds(months[0])[0],
+        completion_date__lt=_month_bounds(months[-1])[1],
+    )
+    rows = {}
+    for row in _grouped(queryset):
+        key = (row['responsible_id'], row['kpi_id'], row['month'])
+        if key in keys:
+            rows[key] = _rollup(row)
+
+    emptied = keys - rows.keys()
+    if emptied:
+        condition = Q()
+        for employee_id, kpi_id, month in emptied:
+            condition |= Q(employee_id=employee_id, kpi_id=kpi_id, month=month)
+        TaskScoreRollup.objects.filter(condition).delete()
+    if rows:
+        TaskScoreRollup.objects.bulk_create(
+            rows.values(),
+            update_conflicts=True,
+            unique_fields=['employee', 'kpi', 'month'],
+            update_fields=['manager', 'task_count', 'score_sum', 'weight', 'updated_at'],
+        )
+    return len(rows)
+
+
+def refresh(keys: Iterable[Optional[RollupKey]]) -> int:
+    """Recompute the rollup rows for ``keys`` from the task table. Returns the number of rows kept."""
+    keys = sorted({key for key in keys if key})
+    kept = 0
+    with transaction.atomic():
+        for offset in range(0, len(keys), KEY_BATCH_SIZE):
+            kept += _refresh_batch(set(keys[offset:offset + KEY_BATCH_SIZE]))
+    return kept
+
+
+def refresh_for_tasks(task_ids: Iterable[int], batch_size: int = 1000) -> int:
+    """Recompute the rollup rows the given tasks currently count towards."""
+    from core.models import Task
+
+    task_ids = list(task_ids)
+    keys = set()
+    for offset in range(0, len(task_ids), batch_size):
+        for values in Task.objects.filter(pk__in=task_ids[offset:offset + batch_size]).values(*SOURCE_FIELDS):
+            keys.add(rollup_key(values))
+    return refresh(keys)
+
+
+def task_change(task, fields=SOURCE_FIELDS):
+    """
+    Compare a task being saved with the values it was loaded with.
+
+    Returns None when none of ``fields`` changed, otherwise ``(previous,
+    current)`` value dicts; ``previous`` is None for new tasks and for tasks
+    whose original values are unknown (deferred or never loaded).
+    """
+    loaded = getattr(task, '_loaded_values', None) or {}
+    current = {name: getattr(task, name) for name in fields}
+    previous = {name: loaded[name] for name in fields if name in loaded}
+    if previous == current:
+        return None
+    return (previous if len(previous) == len(fields) else None), current
+
+
+def task_saved(task) -> None:
+    """Refresh the rows a saved task left and joined, if its contribution changed."""
+    change = task_change(task)
+    if change is None:
+        return
+    previous, current = change
+    refresh([rollup_key(current), rollup_key(previous) if previous else None])
+
+
+def task_deleted(task) -> None:
+    refresh([rollup_key({name: getattr(task, name) for name in SOURCE_FIELDS})])
+
+
+def sync_kpi(kpi) -> int:
+    """Copy a KPI's current weight and owner onto its rollup rows."""
+    from core.models import TaskScoreRollup
+
+    return (
+        TaskScoreRollup.objects.filter(kpi_id=kpi.pk)
+        .exclude(weight=kpi.weight, manager_id=kpi.created_by_id)
+        .update(weight=kpi.weight, manager_id=kpi.created_by_id)
+    )
+
+
+def rebuild(batch_size: int = 1000) -> int:
+    """Replace every rollup row with totals recomputed from the task table. Returns the row count."""
+    from core.models import TaskScoreRollup
+
+    with transaction.atomic():
+        TaskScoreRollup.objects.all().delete()
+        rollups: List = [_rollup(row) for row in _grouped(_scored_tasks())]
+        TaskScoreRollup.objects.bulk_create(rollups, batch_size=batch_size)
+    return len(rollups)
+
+
+def employee_scores(manager_id, employee_ids=None, kpi_ids=None, start_month=None, end_month=None,
+                    include_undated=False) -> Dict[int, Optional[float]]:
+    """
+    KPI-weighted scores per employee from the rollups of ``manager_id``'s KPIs:
+    sum(final_score * weight) / sum(weight) over the tasks, as in the progress
+    reports. ``start_month``/``end_month`` are inclusive; any date in the month
+    will do. Employees without weighted tasks map to None.
+
+    Scored tasks without a completion date belong to no month and have no
+    rollup row; ``include_undated`` adds them from the task table (one grouped
+    query), for all-time scores.
+    """
+    from core.models import TaskScoreRollup
+
+    rollups = TaskScoreRollup.objects.filter(manager_id=manager_id)
+    if employee_ids is not None:
+        rollups = rollups.filter(employee_id__in=employee_ids)
+    if kpi_ids is not None:
+        rollups = rollups.filter(kpi_id__in=kpi_ids)
+    if start_month is not None:
+        rollups = rollups.filter(month__gte=month_start(start_month))
+    if end_month is not None:
+        rollups = rollups.filter(month__lte=month_start(end_month))
+    rows = list(rollups.order_by().values_list('employee_id', 'kpi_id', 'score_sum', 'task_count', 'weight'))
+    if include_undated:
+        rows += _undated_rows(manager_id, employee_ids, kpi_ids)
+    totals = progress_service.weighted_scores(
+        [row[0] for row in rows],
+        [row[1] for row in rows],
+        [row[2] for row in rows],
+        {row[1]: row[4] for row in rows},  # the weight snapshot of each KPI's rows
+        task_counts=[row[3] for row in rows],
+    )
+    return {employee_id: total.score for employee_id, total in totals.items()}
+
+
+def _undated_rows(manager_id, employee_ids=None, kpi_ids=None) -> List[tuple]:
+    """Rollup-shaped rows of the scored tasks without a completion date."""
+    from core.models import Task
+
+    tasks = Task.objects.filter(
+        status='closed', evaluation_status='evaluated', final_score__isnull=False,
+        kpi__isnull=False, completion_date__isnull=True, kpi__created_by_id=manager_id,
+    )
+    if employee_ids is not None:
+        tasks = tasks.filter(responsible_id__in=employee_ids)
+    if kpi_ids is not None:
+        tasks = tasks.filter(kpi_id__in=kpi_ids)
+    return [
+        (row['responsible_id'], row['kpi_id'], float(row['score_sum'] or 0.0), row['task_count'], float(row['kpi__weight'] or 0.0))
+        for row in tasks.order_by().values('responsible_id', 'kpi_id', 'kpi__weight').annotate(task_count=Count('id'), score_sum=Sum('final_score'))
+    ]
@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+import threading
+
+from django.core.cache import cache
+from django.db.models import Count, Max, Sum
+
+from core.services import progress_service, reference_data
+from core.services.rescore_service import delta_bucket, delta_bucket_labels
+from core.services.task_service import EvaluationSettings, compute_automatic_evaluation_batch, manager_closure_flags
+
+
+CACHE_KEY = 'score_simulation:columns'
+CACHE_TIMEOUT = 600  # seconds
+VERSION_NAME = 'score_simulation'
+
+
+@dataclass(frozen=True)
+class TaskScoreColumns:
+    """
+    Column-wise copy of the fields a rescore needs for every evaluated task.
+    Day values are date ordinals; ``fingerprint`` identifies the task data it
+    was built from.
+    """
+    fingerprint: Tuple
+    responsible_id: Tuple[int, ...]
+    manager_id: Tuple[Optional[int], ...]
+    kpi_id: Tuple[Optional[int], ...]
+    quality_id: Tuple[int, ...]
+    priority_id: Tuple[Optional[int], ...]
+    completion_day: Tuple[Optional[int], ...]
+    target_day: Tuple[Optional[int], ...]
+    percentage_completion: Tuple[Optional[float], ...]
+    final_score: Tuple[float, ...]
+
+    def __len__(self):
+        return len(self.responsible_id)
+
+
+_lock = threading.Lock()
+_local: Optional[TaskScoreColumns] = None
+
+
+def _evaluated_tasks():
+    from core.models import Task
+
+    return Task.objects.filter(evaluation_status='evaluated', quality__isnull=False, final_score__isnull=False)
+
+
+def _fingerprint():
+    """
+    Cheap aggregate that changes whenever an evaluated task is added, removed
+    or rewritten, plus sums of the assignee and supervisor columns for updates
+    that leave ``updated_date`` alone (a moved employee, queryset updates), and
+    the ``DataVersion`` counter ``invalidate`` bumps when users are saved
+    (see ``core.signals``).
+    """
+    from core.models import DataVersion
+
+    stats = _evaluated_tasks().aggregate(
+        count=Count('id'), last_id=Max('id'), last_update=Max('updated_date'),
+        responsible_sum=Sum('responsible_id'), manager_sum=Sum('responsible__under_supervision_id'),
+    )
+    return (
+        stats['count'], stats['last_id'], stats['last_update'].isoformat() if stats['last_update'] else None,
+        stats['responsible_sum'], stats['manager_sum'], DataVersion.current(VERSION_NAME),
+    )
+
+
+def _build(fingerprint) -> TaskScoreColumns:
+    rows = list(_evaluated_tasks().order_by().values_list(
+        'responsible_id', 'responsible__under_supervision_id', 'kpi_id', 'quality_id', 'priority_id',
+        'completion_date', 'target_date', 'percentage_completion', 'final_score',
+    ))
+    columns = list(zip(*rows)) if rows else [()] * 9
+    return TaskScoreColumns(
+        fingerprint=fingerprint,
+        responsible_id=columns[0],
+        manager_id=columns[1],
+        kpi_id=columns[2],
+        quality_id=columns[3],
+        priority_id=columns[4],
+        # Same day basis as Task.calculate_automatic_evaluation (completion_date.date())
+        completion_day=tuple(value.date().toordinal() if value else None for value in columns[5]),
+        target_day=tuple(value.toordinal() if value else None for value in columns[6]),
+        percentage_completion=columns[7],
+        final_score=columns[8],
+    )
+
+
+def get_task_columns() -> TaskScoreColumns:
+    """
+    Return the columnar snapshot of evaluated tasks, reusing the copy held by
+    this process or the shared cache while the task data is unchanged.
+    """
+    global _local
+    fingerprint = _fingerprint()
+    local = _local
+    if local is not None and local.fingerprint == fingerprint:
+        return local
+    with _lock:
+        shared = cache.get(CACHE_KEY)
+        if shared is None or shared.fingerprint != fingerprint:
+            shared = _build(fingerprint)
+            cache.set(CACHE_KEY, shared, CACHE_TIMEOUT)
+        _local = shared
+        return shared
+
+
+def invalidate() -> None:
+    """Publish a new version so every process rebuilds its task columns on next use."""
+    from core.models import DataVersion
+
+    global _local
+    DataVersion.bump(VERSION_NAME)
+    with _lock:
+        _local = None
+
+
+def simulate(settings: EvaluationSettings) -> Dict[str, Any]:
+    """
+    Rescore every evaluated task in memory with candidate ``settings`` and
+    compare against the stored scores. Nothing is written.
+
+    Employee and manager scores use the same per-task KPI weighting as the
+    progress reports: each task counts with the weight of its KPI when that
+    KPI is an active KPI of the employee's manager.
+    """
+    from core.models import CustomUser
+
+    columns = get_task_columns()
+    refs = reference_data.get_snapshot()
+    count = len(columns)
+
+    result = compute_automatic_evaluation_batch(
+        settings,
+        quality_percentage=[
+            refs.qualities_by_id[q].percentage if q in refs.qualities_by_id else 0.0 for q in columns.quality_id
+        ],
+        priority_multiplier=[
+            refs.priorities_by_id[p].multiplier if p in refs.priorities_by_id else None for p in columns.priority_id
+        ],
+        completion_day=columns.completion_day,
+        target_day=columns.target_day,
+        percentage_completion=columns.percentage_completion,
+        manager_closure=manager_closure_flags(columns.percentage_completion),
+    )
+    simulated = result['final_score']
+    simulated = simulated.tolist() if hasattr(simulated, 'tolist') else list(simulated)
+
+    histogram = [0] * len(delta_bucket_labels())
+    changed = 0
+    for current, new in zip(columns.final_score, simulated):
+        histogram[delta_bucket(new - current)] += 1
+        if abs(new - current) >= 0.005:
+            changed += 1
+
+    # A task counts only under an active, weighted KPI of its employee's manager
+    weights = {kpi.id: kpi.weight for kpi in refs.kpis if kpi.is_active and kpi.weight}
+    kpi_ids = [
+        kpi_id if kpi_id in weights and refs.kpis_by_id[kpi_id].created_by_id == manager_id else None
+        for kpi_id, manager_id in zip(columns.kpi_id, columns.manager_id)
+    ]
+    employee_current = progress_service.weighted_scores(columns.responsible_id, kpi_ids, columns.final_score, weights)
+    employee_simulated = progress_service.weighted_scores(columns.responsible_id, kpi_ids, simulated, weights)
+    manager_current = progress_service.weighted_scores(columns.manager_id, kpi_ids, columns.final_score, weights)
+    manager_simulated = progress_service.weighted_scores(columns.manager_id, kpi_ids, simulated, weights)
+    employee_tasks = Counter(columns.responsible_id)
+    manager_tasks = Counter(columns.manager_id)
+    employee_manager = dict(zip(columns.responsible_id, columns.manager_id))
+
+    user_ids = {key for key in list(employee_manager) + list(manager_tasks) if key is not None}
+    names = {}
+    for user in CustomUser.objects.filter(id__in=user_ids).only('id', 'username', 'first_name', 'last_name'):
+        names[user.id] = user.get_full_name() or user.username
+
+    def rows(tasks, current_scores, simulated_scores, extra=None):
+        out: List[Dict[str, Any]] = []
+        for key, task_count in tasks.items():
+            current = current_scores[key].score if key in current_scores else None
+            new = simulated_scores[key].score if key in simulated_scores else None
+            row = {
+                'id': key,
+                'name': names.get(key, 'Unassigned'),
+                'task_count': task_count,
+                'current_score': current,
+                'simulated_score': new,
+                'delta': round(new - current, 2) if current is not None else None,
+            }
+            if extra:
+                row.update(extra(key))
+            out.append(row)
+        out.sort(key=lambda row: abs(row['delta'] or 0), reverse=True)
+        return out
+
+    total_current, total_simulated = sum(columns.final_score), sum(simulated)
+    return {
+        'task_count': count,
+        'changed_count': changed,
+        'current_mean': round(total_current / count, 2) if count else None,
+        'simulated_mean': round(total_simulated / count, 2) if count else None,
+        'histogram': [{'label': label, 'count': n} for label, n in zip(delta_bucket_labels(), histogram)],
+        'managers': rows(manager_tasks, manager_current, manager_simulated),
+        'employees': rows(employee_tasks, employee_current, employee_simulated,
+                          extra=lambda key: {'manager_id': employee_manager[key]}),
+    }
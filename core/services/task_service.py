@@ -4,9 +4,14 @@ from dataclasses import dataclass
 from datetime import date
 from django.utils import timezone
 from core.utils.dates import business_localdate
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Sequence, Union
 import logging
 
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is optional; the batch kernel falls back to pure Python
+    np = None
+
 
 @dataclass(frozen=True)
 class TaskEvaluationInput:
@@ -38,41 +43,50 @@ def compute_status(percentage_completion: Optional[float], target_date: Optional
     return 'open'
 
 
-def compute_automatic_evaluation(
-    data: TaskEvaluationInput,
-    settings: EvaluationSettings,
-    manager_closure: bool = False,
-) -> Optional[Dict[str, Any]]:
-    if data.quality_percentage is None:
-        return None
+def manager_closure_flags(percentage_completion: Sequence[Optional[float]]) -> list:
+    """
+    ``manager_closure`` flags for re-scoring evaluated tasks, which do not
+    store how they were closed. Tasks reach evaluation below 100% completion
+    only through a manager closing them early (``EvaluateTaskView`` sets 100%
+    first), so completion decides it.
+    """
+    return [(pct or 0) < 100 for pct in percentage_completion]
 
+
+def _score(
+    settings: EvaluationSettings,
+    quality_percentage: float,
+    priority_multiplier: Optional[float],
+    completion_day: Optional[int],
+    target_day: Optional[int],
+    percentage_completion: Optional[float],
+    manager_closure: bool,
+) -> Dict[str, Any]:
     # Quality score
-    quality_score = data.quality_percentage if settings.use_quality_score else 0
+    quality_score = quality_percentage if settings.use_quality_score else 0
 
     # Priority multiplier
-    priority_multiplier = data.priority_multiplier if (settings.use_priority_multiplier and data.priority_multiplier) else 1.0
+    priority_multiplier = priority_multiplier if (settings.use_priority_multiplier and priority_multiplier) else 1.0
 
-    # Time bonus/penalty
+    # Time bonus/penalty (day numbers are date ordinals)
     time_bonus_penalty = 0.0
-    if settings.use_time_bonus_penalty and data.completion_date and data.target_date:
-        completion = data.completion_date
-        target = data.target_date
-        if completion < target:
-            days_early = (target - completion).days
+    if settings.use_time_bonus_penalty and completion_day is not None and target_day is not None:
+        if completion_day < target_day:
+            days_early = target_day - completion_day
             time_bonus_penalty = min(days_early * settings.early_completion_bonus_per_day, settings.max_early_completion_bonus)
-        elif completion > target:
-            days_late = (completion - target).days
+        elif completion_day > target_day:
+            days_late = completion_day - target_day
             time_bonus_penalty = -min(days_late * settings.late_completion_penalty_per_day, settings.max_late_completion_penalty)
 
     manager_closure_penalty_applied = False
-    if settings.use_manager_closure_penalty and manager_closure and (data.percentage_completion or 0) < 100:
+    if settings.use_manager_closure_penalty and manager_closure and (percentage_completion or 0) < 100:
         time_bonus_penalty -= settings.manager_closure_penalty
         manager_closure_penalty_applied = True
 
     base_score = quality_score * priority_multiplier
     final_score = max(0.0, min(100.0, base_score + time_bonus_penalty))
 
-    result = {
+    return {
         'quality_score': quality_score,
         'priority_multiplier': priority_multiplier,
         'time_bonus_penalty': time_bonus_penalty,
@@ -80,6 +94,25 @@ def compute_automatic_evaluation(
         'manager_closure_penalty_applied': manager_closure_penalty_applied,
     }
 
+
+def compute_automatic_evaluation(
+    data: TaskEvaluationInput,
+    settings: EvaluationSettings,
+    manager_closure: bool = False,
+) -> Optional[Dict[str, Any]]:
+    if data.quality_percentage is None:
+        return None
+
+    result = _score(
+        settings,
+        data.quality_percentage,
+        data.priority_multiplier,
+        data.completion_date.toordinal() if data.completion_date else None,
+        data.target_date.toordinal() if data.target_date else None,
+        data.percentage_completion,
+        manager_closure,
+    )
+
     # --- Audit logging (non-invasive) ---
     try:
         audit_logger = logging.getLogger('core.audit')
@@ -101,3 +134,98 @@ def compute_automatic_evaluation(
     return result
 
 
+def compute_automatic_evaluation_batch(
+    settings: EvaluationSettings,
+    quality_percentage: Sequence[float],
+    priority_multiplier: Sequence[Optional[float]],
+    completion_day: Sequence[Optional[int]],
+    target_day: Sequence[Optional[int]],
+    percentage_completion: Sequence[Optional[float]],
+    manager_closure: Union[bool, Sequence[bool]] = False,
+) -> Dict[str, Any]:
+    """
+    Score a batch of tasks given as columns; same rules and clamps as
+    ``compute_automatic_evaluation``.
+
+    Days are date ordinals (``date.toordinal()``); ``None`` skips the time
+    bonus/penalty for that task, like a missing completion or target date.
+    ``manager_closure`` is one flag for the whole batch or one per task.
+    Returns the same keys as the scalar function, each holding one value per
+    task (numpy arrays when numpy is installed, lists otherwise). Logs one
+    audit summary line per batch instead of one line per task.
+    """
+    count = len(quality_percentage)
+    if isinstance(manager_closure, bool):
+        manager_closure = [manager_closure] * count
+
+    if np is not None:
+        result = _score_batch_numpy(settings, quality_percentage, priority_multiplier, completion_day,
+                                    target_day, percentage_completion, manager_closure)
+    else:
+        rows = [
+            _score(settings, *row)
+            for row in zip(quality_percentage, priority_multiplier, completion_day, target_day,
+                           percentage_completion, manager_closure)
+        ]
+        result = {key: [row[key] for row in rows] for key in (
+            'quality_score', 'priority_multiplier', 'time_bonus_penalty', 'final_score',
+            'manager_closure_penalty_applied',
+        )}
+
+    try:
+        audit_logger = logging.getLogger('core.audit')
+        if audit_logger.isEnabledFor(logging.INFO):
+            total = float(sum(result['final_score']))
+            audit_logger.info(
+                'task_eval_batch_computed count=%s manager_closure_applied=%s mean_final_score=%s',
+                count,
+                int(sum(bool(v) for v in result['manager_closure_penalty_applied'])),
+                round(total / count, 2) if count else None,
+            )
+    except Exception:
+        pass
+
+    return result
+
+
+def _float_column(values, missing):
+    return np.array([missing if v is None else v for v in values], dtype=float)
+
+
+def _score_batch_numpy(settings, quality_percentage, priority_multiplier, completion_day, target_day,
+                       percentage_completion, manager_closure):
+    count = len(quality_percentage)
+    quality = _float_column(quality_percentage, 0.0)
+    quality_score = quality if settings.use_quality_score else np.zeros(count)
+
+    multiplier = _float_column(priority_multiplier, 0.0)
+    if settings.use_priority_multiplier:
+        # Missing or zero multipliers count as 1.0, like the scalar path
+        multiplier = np.where(multiplier == 0, 1.0, multiplier)
+    else:
+        multiplier = np.ones(count)
+
+    bonus = np.zeros(count)
+    if settings.use_time_bonus_penalty:
+        completion = _float_column(completion_day, np.nan)
+        target = _float_column(target_day, np.nan)
+        days = target - completion  # positive: early, negative: late; NaN when a date is missing
+        days = np.nan_to_num(days, nan=0.0)
+        early = np.minimum(days * settings.early_completion_bonus_per_day, settings.max_early_completion_bonus)
+        late = -np.minimum(-days * settings.late_completion_penalty_per_day, settings.max_late_completion_penalty)
+        bonus = np.where(days > 0, early, np.where(days < 0, late, 0.0))
+
+    closure = np.zeros(count, dtype=bool)
+    if settings.use_manager_closure_penalty:
+        pct = _float_column(percentage_completion, 0.0)
+        closure = np.asarray(manager_closure, dtype=bool) & (pct < 100)
+        bonus = bonus - np.where(closure, settings.manager_closure_penalty, 0.0)
+
+    final = np.clip(quality_score * multiplier + bonus, 0.0, 100.0)
+    return {
+        'quality_score': quality_score,
+        'priority_multiplier': multiplier,
+        'time_bonus_penalty': bonus,
+        'final_score': final,
+        'manager_closure_penalty_applied': closure,
+    }
@@ -0,0 +1,126 @@
+"""
+Monthly time series for charts and exports.
+
+``monthly_counts`` turns any task (or other model) queryset into zero-filled
+per-month counts with a single ``TruncMonth`` grouped query, optionally split
+by a grouping column (e.g. one series per employee) and into several named
+series with ``Count(filter=...)``. ``monthly_counts_any`` counts a row in
+every month any of several date columns falls in. Datetime columns are bucketed by calendar
+month in the business timezone, the same days ``created_date__date`` filters
+see inside a request.
+"""
+
+from __future__ import annotations
+
+from calendar import month_abbr
+from datetime import date, datetime, time
+from typing import Dict, Hashable, Iterable, List, Mapping, Optional
+
+from django.db.models import Count, DateField, DateTimeField, Q
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from core.utils.dates import business_timezone
+
+
+def month_range(start: date, end: date) -> List[date]:
+    """First days of every month from ``start``'s month to ``end``'s month, inclusive."""
+    months = []
+    index, last = start.year * 12 + start.month - 1, end.year * 12 + end.month - 1
+    while index <= last:
+        months.append(date(index // 12, index % 12 + 1, 1))
+        index += 1
+    return months
+
+
+def month_labels(months: Iterable[date]) -> List[str]:
+    """Short month names ('Jan', 'Feb', ...) used on the chart axes."""
+    return [month_abbr[month.month] for month in months]
+
+
+def _month_after(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def _bucketed(queryset, date_field, months: List[date]):
+    """``queryset`` limited to ``months`` and annotated with the first day of each row's month as ``trend_month``."""
+    if isinstance(date_field, str):
+        source = queryset.model._meta.get_field(date_field)
+        if isinstance(source, DateTimeField):
+            tz = business_timezone()
+            bucket = TruncMonth(date_field, output_field=DateField(), tzinfo=tz)
+            queryset = queryset.filter(**{
+                f'{date_field}__gte': timezone.make_aware(datetime.combine(months[0], time.min), tz),
+                f'{date_field}__lt': timezone.make_aware(datetime.combine(_month_after(months[-1]), time.min), tz),
+            })
+        else:
+            bucket = TruncMonth(date_field, output_field=DateField())
+            queryset = queryset.filter(**{
+                f'{date_field}__gte': months[0], f'{date_field}__lt': _month_after(months[-1]),
+            })
+        return queryset.annotate(trend_month=bucket)
+    return queryset.annotate(trend_month=TruncMonth(date_field, output_field=DateField())).filter(
+        trend_month__gte=months[0], trend_month__lte=months[-1],
+    )
+
+
+def monthly_counts(queryset, date_field, months: List[date], series: Optional[Mapping[str, Optional[Q]]] = None,
+                   group_by: Optional[str] = None, groups: Iterable[Hashable] = ()) -> Dict[Hashable, Dict[str, List[int]]]:
+    """
+    Count rows of ``queryset`` per month of ``date_field`` over ``months``
+    (consecutive first-of-month dates, see ``month_range``).
+
+    ``date_field`` is a field name or a date-valued expression. ``series``
+    maps series names to an optional ``Q`` filter (None counts every row);
+    the default is a single ``'count'`` series. Results are keyed by the
+    ``group_by`` value (None when not grouping); every key in ``groups`` is
+    present even without rows. Each series is a list aligned with ``months``.
+    """
+    series = dict(series or {'count': None})
+    queryset = queryset.order_by()
+    if months:
+        queryset = _bucketed(queryset, date_field, months)
+
+    def empty():
+        return {name: [0] * len(months) for name in series}
+
+    result = {group: empty() for group in groups} if group_by else {None: empty()}
+    if not months:
+        return result
+    position = {month: index for index, month in enumerate(months)}
+    columns = (group_by, 'trend_month') if group_by else ('trend_month',)
+    aggregates = {name: Count('pk', filter=condition) for name, condition in series.items()}
+    for row in queryset.values(*columns).annotate(**aggregates):
+        index = position.get(row['trend_month'])
+        if index is None:
+            continue
+        counts = result.setdefault(row[group_by] if group_by else None, empty())
+        for name in series:
+            counts[name][index] = row[name]
+    return result
+
+
+def monthly_counts_any(queryset, date_fields: Iterable, months: List[date], group_by: Optional[str] = None,
+                       groups: Iterable[Hashable] = ()) -> Dict[Hashable, List[int]]:
+    """
+    Count rows of ``queryset`` in every month of ``months`` that any of
+    ``date_fields`` falls in: a task closed in March and completed in April
+    counts in both, one with both dates in March counts once. One query per
+    field, returning a (pk, month) pair per row and field; results are keyed
+    like ``monthly_counts`` but hold the single list of counts.
+    """
+    result = {group: [0] * len(months) for group in groups} if group_by else {None: [0] * len(months)}
+    if not months:
+        return result
+    position = {month: index for index, month in enumerate(months)}
+    columns = ('pk', group_by, 'trend_month') if group_by else ('pk', 'trend_month')
+    seen = set()
+    for date_field in date_fields:
+        seen.update(_bucketed(queryset.order_by(), date_field, months).values_list(*columns))
+    for row in seen:
+        index = position.get(row[-1])
+        if index is None:
+            continue
+        counts = result.setdefault(row[1] if group_by else None, [0] * len(months))
+        counts[index] += 1
+    return result
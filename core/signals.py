@@ -2,11 +2,15 @@ import logging
 from typing import Optional
 
 from django.conf import settings
-from django.core.mail import send_mail
-from django.db.models.signals import post_save
+from django.core.mail import EmailMessage, get_connection, send_mail
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
-from .models import Notification, CustomUser
+from .models import (
+    KPI, CustomUser, EmployeeProgress, MonthlyStatsSnapshot, Notification, QualityType, TaskEvaluationSettings,
+    TaskPriorityType,
+)
+from .services import monthly_stats, reference_data, score_rollup, score_simulation
 
 
 logger = logging.getLogger(__name__)
@@ -82,6 +86,45 @@ def send_notification_email(sender, instance: Notification, created: bool, **kwa
         logger.exception("Failed to send notification email for Notification id=%s. Error: %s", instance.id, str(e))
 
 
+def send_notification_emails(notifications) -> int:
+    """Email a batch of notifications over one connection.
+
+    Used for notifications created with ``bulk_create`` (which skips
+    ``post_save``). Returns the number of emails sent.
+    """
+    notifications = [n for n in notifications if n.recipient_id]
+    if not notifications:
+        return 0
+
+    recipient_emails = dict(
+        CustomUser.objects.filter(id__in={n.recipient_id for n in notifications})
+        .exclude(email='')
+        .values_list('id', 'email')
+    )
+    from_email = getattr(settings, "DEFAULT_FROM_EMAIL", None) or getattr(settings, "EMAIL_HOST_USER", None) or "no-reply@example.com"
+    emails = [
+        EmailMessage(
+            subject=_build_email_subject(n.message or ""),
+            body=_build_email_body(n.message or "", n.link or None),
+            from_email=from_email,
+            to=[recipient_emails[n.recipient_id]],
+        )
+        for n in notifications
+        if recipient_emails.get(n.recipient_id)
+    ]
+    if not emails:
+        return 0
+
+    try:
+        sent = get_connection(fail_silently=True).send_messages(emails) or 0
+    except Exception:  # noqa: BLE001 - best-effort; log and continue
+        logger.exception("Failed to send %s batched notification emails", len(emails))
+        return 0
+    if sent < len(emails):
+        logger.warning("Batched notification emails: sent %s of %s", sent, len(emails))
+    return sent
+
+
 @receiver(post_save, sender=CustomUser)
 def send_welcome_on_user_created(sender, instance: CustomUser, created: bool, **kwargs) -> None:
     """Notify and email a user when their account is created by an admin/manager.
@@ -162,10 +205,79 @@ def update_task_status_on_save(sender, instance, created, **kwargs):
     pass 
 
 
+@receiver(post_save, sender=Task)
+def refresh_score_rollups_on_save(sender, instance, **kwargs):
+    """Keep monthly score rollups in step with evaluated, re-scored or reassigned tasks."""
+    score_rollup.task_saved(instance)
 
 
+@receiver(post_delete, sender=Task)
+def refresh_score_rollups_on_delete(sender, instance, **kwargs):
+    score_rollup.task_deleted(instance)
 
 
+@receiver(post_save, sender=Task)
+def mark_progress_stale_on_save(sender, instance, **kwargs):
+    """Flag progress records whose period holds a task whose score contribution changed."""
+    change = score_rollup.task_change(instance)
+    if change is None:
+        return
+    counted = [values for values in change if values and score_rollup.rollup_key(values)]
+    EmployeeProgress.mark_stale((values['responsible_id'], values['completion_date']) for values in counted)
+
 
+@receiver(post_delete, sender=Task)
+def mark_progress_stale_on_delete(sender, instance, **kwargs):
+    if score_rollup.rollup_key({name: getattr(instance, name) for name in score_rollup.SOURCE_FIELDS}):
+        EmployeeProgress.mark_stale([(instance.responsible_id, instance.completion_date)])
 
 
+@receiver(post_save, sender=Task)
+def invalidate_monthly_stats_on_save(sender, instance, **kwargs):
+    """Drop the month-close statistics snapshot of the month an edited task was created in."""
+    monthly_stats.task_saved(instance)
+
+
+@receiver(post_delete, sender=Task)
+def invalidate_monthly_stats_on_delete(sender, instance, **kwargs):
+    monthly_stats.task_deleted(instance)
+
+
+@receiver([post_save, post_delete], sender=CustomUser)
+def invalidate_score_simulation(sender, update_fields=None, **kwargs):
+    """
+    The rescore simulation keeps a copy of every evaluated task with its
+    assignee's supervisor, which no task change reveals; drop it when users
+    change (versioned as the reference data).
+    """
+    if update_fields is not None and 'under_supervision' not in update_fields:
+        return  # last_login, password, ...
+    score_simulation.invalidate()
+
+
+@receiver(post_save, sender=KPI)
+def sync_score_rollup_weights(sender, instance, **kwargs):
+    """Rollups carry the KPI weight so scores can be summed without joining KPIs."""
+    score_rollup.sync_kpi(instance)
+
+
+@receiver([post_save, post_delete], sender=KPI)
+def mark_manager_progress_stale(sender, instance, **kwargs):
+    """KPI weights and the active set feed every progress record and statistics snapshot of the KPI's manager."""
+    if instance.created_by_id:
+        EmployeeProgress.objects.filter(manager_id=instance.created_by_id, is_stale=False).update(is_stale=True)
+        MonthlyStatsSnapshot.objects.filter(manager_id=instance.created_by_id).delete()
+
+
+@receiver([post_save, post_delete], sender=TaskEvaluationSettings)
+@receiver([post_save, post_delete], sender=TaskPriorityType)
+@receiver([post_save, post_delete], sender=QualityType)
+@receiver([post_save, post_delete], sender=KPI)
+def invalidate_reference_data(sender, **kwargs):
+    """
+    Drop cached reference snapshots when evaluation settings, priorities,
+    quality types or KPIs change. The version row is bumped in the saving
+    transaction: other processes see it when the change commits, and a
+    snapshot built from a rolled-back change no longer matches it.
+    """
+    reference_data.invalidate()
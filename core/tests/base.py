@@ -0,0 +1,59 @@
+"""
+Shared fixture of the ``core`` tests: a manager with a team, the reference
+rows most scenarios need, and helpers for users and evaluated tasks.
+"""
+
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from core.models import KPI, CustomUser, QualityType, Task, TaskPriorityType
+from core.services import reference_data
+from core.utils.dates import business_localdate
+
+
+def make_user(username, user_type='employee', **fields):
+    return CustomUser.objects.create_user(
+        username=username, email=f'{username}@example.com', password='x', user_type=user_type, **fields,
+    )
+
+
+def make_evaluated_task(responsible, manager_closure=False, **fields):
+    """A closed task scored with the automatic evaluation, saved through ``Task.save()``."""
+    today = business_localdate()
+    values = {
+        'issue_action': 'Prepare the report', 'start_date': today - timedelta(days=10), 'target_date': today,
+        'percentage_completion': 100, 'status': 'closed', 'completion_date': timezone.now(),
+    }
+    values.update(fields)
+    task = Task(responsible=responsible, **values)
+    task.apply_automatic_evaluation(manager_closure=manager_closure)
+    task.save()
+    return task
+
+
+class TeamTestCase(TestCase):
+    """
+    ``manager`` with ``EMPLOYEES`` subordinates (``employees``, first names
+    Emp0, Emp1, ...), the 'Good' quality (80%), the 'high' priority (x1.2)
+    and the manager's 'Delivery' KPI (weight 60). Scenarios add their own rows
+    in ``setUpTestData`` after calling super().
+    """
+    EMPLOYEES = 2
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.manager = make_user('mgr', 'manager')
+        cls.employees = [
+            make_user(f'emp{i}', under_supervision=cls.manager, first_name=f'Emp{i}') for i in range(cls.EMPLOYEES)
+        ]
+        cls.quality = QualityType.objects.create(name='Good', percentage=80)
+        cls.priority, _ = TaskPriorityType.objects.update_or_create(code='high', defaults={'name': 'High', 'multiplier': 1.2})
+        cls.kpi = KPI.objects.create(name='Delivery', weight=60, created_by=cls.manager)
+        cls.today = business_localdate()
+
+    def setUp(self):
+        # Reference data is cached per process; load it outside any measured block
+        reference_data.invalidate()
+        reference_data.get_snapshot()
@@ -0,0 +1,51 @@
+from unittest import mock
+
+from django.contrib.messages import get_messages
+
+from core import admin as core_admin
+from core.models import CustomUser, QualityType, Task
+from core.tests.base import TeamTestCase, make_evaluated_task
+
+
+class AdminRescoreTests(TeamTestCase):
+    """The admin re-score actions stay within a request-sized batch."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.admin = CustomUser.objects.create_superuser(username='root', email='root@example.com', password='x')
+        for i in range(3):
+            make_evaluated_task(cls.employees[0], issue_action=f'Task {i}', priority=cls.priority,
+                                kpi=cls.kpi, quality=cls.quality)
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.admin)
+        # A new quality percentage leaves the stored scores behind
+        quality = QualityType.objects.get(pk=self.quality.pk)
+        quality.percentage = 40
+        quality.save()
+        self.scores = set(Task.objects.values_list('final_score', flat=True))
+
+    def run_action(self, action, ids):
+        response = self.client.post(
+            '/admin/core/task/', {'action': action, '_selected_action': [str(pk) for pk in ids]}, follow=True,
+        )
+        return [str(message) for message in get_messages(response.wsgi_request)]
+
+    def test_selected_tasks_are_rescored(self):
+        ids = list(Task.objects.values_list('pk', flat=True))
+        messages = self.run_action('rescore_selected_tasks', ids)
+        self.assertTrue(any('3' in message for message in messages), messages)
+        self.assertNotEqual(set(Task.objects.values_list('final_score', flat=True)), self.scores)
+
+    def test_more_than_the_limit_points_to_the_command(self):
+        ids = list(Task.objects.values_list('pk', flat=True))
+        with mock.patch.object(core_admin, 'ADMIN_RESCORE_LIMIT', 2):
+            messages = self.run_action('rescore_selected_tasks', ids)
+        self.assertTrue(any('manage.py rescore_tasks' in message for message in messages), messages)
+        self.assertEqual(set(Task.objects.values_list('final_score', flat=True)), self.scores)
+
+    def test_settings_page_has_no_rescore_all_action(self):
+        response = self.client.get('/admin/core/taskevaluationsettings/')
+        self.assertNotContains(response, 'rescore_all_tasks')
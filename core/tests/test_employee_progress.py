@@ -0,0 +1,103 @@
+from datetime import timedelta
+
+from django.db.models import Avg, Sum
+from django.utils import timezone
+
+from core.models import KPI, EmployeeProgress, QualityType, Task
+from core.tests.base import TeamTestCase, make_evaluated_task
+from core.utils.dates import business_timezone
+
+
+def reference_progress(record):
+    """The calculation before the grouped query: five queries per KPI, task details kept inline."""
+    with timezone.override(business_timezone()):
+        tasks = Task.objects.filter(
+            responsible=record.employee,
+            completion_date__date__gte=record.period_start,
+            completion_date__date__lte=record.period_end,
+            status='closed', evaluation_status='evaluated', final_score__isnull=False,
+        )
+        breakdown, details = {}, []
+        total_weighted_score = total_weight = 0.0
+        for kpi in KPI.objects.filter(created_by=record.manager, is_active=True).order_by('sort_order'):
+            kpi_tasks = tasks.filter(kpi=kpi)
+            if not kpi_tasks.exists():
+                breakdown[kpi.name] = {'kpi_id': kpi.id, 'weight': kpi.weight, 'task_count': 0, 'average_score': 0, 'weighted_score': 0}
+                continue
+            task_count = kpi_tasks.count()
+            weighted_score = float(kpi_tasks.aggregate(total=Sum('final_score'))['total'] or 0) * float(kpi.weight)
+            breakdown[kpi.name] = {
+                'kpi_id': kpi.id, 'weight': kpi.weight, 'task_count': task_count,
+                'average_score': round(kpi_tasks.aggregate(avg=Avg('final_score'))['avg'], 2),
+                'weighted_score': round(weighted_score, 2),
+            }
+            details.append({
+                'kpi_name': kpi.name, 'task_count': task_count,
+                'tasks': sorted(kpi_tasks.values('id', 'kpi_id', 'issue_action', 'final_score', 'completion_date'), key=lambda t: t['id']),
+            })
+            total_weighted_score += weighted_score
+            total_weight += float(kpi.weight) * task_count
+        score = round(total_weighted_score / total_weight, 2) if total_weight > 0 else 0
+        return {'total_progress_score': score, 'progress_breakdown': breakdown, 'total_weight': total_weight}, details
+
+
+class EmployeeProgressCalculationTests(TeamTestCase):
+    """calculate_progress and kpi_task_details against the former per-KPI queries."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        poor = QualityType.objects.create(name='Poor', percentage=40)
+        delivery = cls.kpi
+        delivery.sort_order = 2
+        delivery.save()
+        safety = KPI.objects.create(name='Safety', weight=40, created_by=cls.manager, sort_order=1)
+        # A zero-weight KPI and an inactive one: listed and ignored respectively
+        KPI.objects.create(name='Learning', weight=0, created_by=cls.manager, sort_order=0)
+        KPI.objects.create(name='Retired', weight=50, created_by=cls.manager, is_active=False)
+        now = timezone.now()
+        for i in range(40):
+            make_evaluated_task(
+                cls.employees[i % 2], issue_action=f'Task {i}', priority=cls.priority,
+                start_date=cls.today - timedelta(days=40), target_date=cls.today - timedelta(days=i % 5),
+                quality=cls.quality if i % 3 else poor,
+                kpi=[delivery, safety, None][i % 3] if i < 30 else delivery,
+                completion_date=now - timedelta(days=i % 20, minutes=i),
+            )
+        # Open tasks do not count
+        Task.objects.create(issue_action='Open task', responsible=cls.employees[0], kpi=delivery,
+                            start_date=cls.today, target_date=cls.today)
+
+    def make_record(self, employee, days=10):
+        return EmployeeProgress.objects.create(
+            employee=employee, manager=self.manager, period_start=self.today - timedelta(days=days), period_end=self.today,
+        )
+
+    def test_matches_former_per_kpi_queries(self):
+        for employee in self.employees:
+            for days in (0, 10, 40):
+                with self.subTest(employee=employee.username, days=days):
+                    record = self.make_record(employee, days)
+                    expected, expected_details = reference_progress(record)
+                    with timezone.override(business_timezone()):
+                        self.assertEqual(record.calculate_progress(), expected)
+                        details = record.kpi_task_details()
+                    for entry in details:
+                        entry['tasks'] = sorted(entry['tasks'], key=lambda t: t['id'])
+                    self.assertEqual(details, expected_details)
+                    record.delete()
+
+    def test_one_query_per_record_and_one_for_details(self):
+        record = self.make_record(self.employees[0], 40)
+        with self.assertNumQueries(1):
+            result = record.calculate_progress()
+        self.assertEqual(list(result['progress_breakdown']), ['Learning', 'Safety', 'Delivery'])
+        with self.assertNumQueries(1):
+            record.kpi_task_details()
+
+    def test_manager_without_kpis(self):
+        record = EmployeeProgress.objects.create(
+            employee=self.employees[0], manager=self.employees[1], period_start=self.today, period_end=self.today,
+        )
+        with self.assertNumQueries(0):
+            self.assertIsNone(record.calculate_progress())
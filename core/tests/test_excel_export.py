@@ -0,0 +1,48 @@
+import io
+from datetime import datetime
+
+from django.test import SimpleTestCase
+from openpyxl import load_workbook
+
+from core.utils import excel
+
+
+def sample_rows(count):
+    yield ['Employee', 'Task', 'Score', 'Closed on']
+    for i in range(count):
+        yield [f'Emp{i % 7}', f'مهمة {i}', i * 1.5, datetime(2025, 1 + i % 12, 1 + i % 28, 9, 30)]
+    yield ['Total', None, 42, None]
+
+
+def read_rows(handle):
+    sheet = load_workbook(handle, read_only=True).worksheets[0]
+    return sheet, [list(row) for row in sheet.iter_rows(values_only=True)]
+
+
+class WriteOnlyWorkbookTests(SimpleTestCase):
+    """Write-only workbooks read back with the rows they were given."""
+
+    def test_rows_round_trip(self):
+        with excel.write_workbook('Tasks', sample_rows(2500)) as handle:
+            sheet, rows = read_rows(handle)
+            self.assertEqual(sheet.title, 'Tasks')
+        expected = [list(row) for row in sample_rows(2500)]
+        # Trailing empty cells are not written
+        expected[-1] = ['Total', None, 42]
+        self.assertEqual([row[:len(expected_row)] for row, expected_row in zip(rows, expected)], expected)
+        self.assertEqual(len(rows), len(expected))
+
+    def test_right_to_left_sheet_view(self):
+        for right_to_left in (False, True):
+            with self.subTest(right_to_left=right_to_left), excel.write_workbook('Tasks', sample_rows(1), right_to_left) as handle:
+                workbook = load_workbook(handle)
+                self.assertEqual(bool(workbook.active.sheet_view.rightToLeft), right_to_left)
+
+    def test_streaming_response(self):
+        response = excel.streaming_response('tasks.xlsx', 'Tasks', sample_rows(10))
+        self.assertEqual(response['Content-Type'], excel.XLSX_CONTENT_TYPE)
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename=tasks.xlsx')
+        _, rows = read_rows(io.BytesIO(b''.join(response.streaming_content)))
+        response.close()
+        self.assertEqual(rows[0], ['Employee', 'Task', 'Score', 'Closed on'])
+        self.assertEqual(len(rows), 12)
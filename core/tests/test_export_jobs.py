@@ -0,0 +1,222 @@
+import io
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from unittest import mock
+
+from django.core.management import call_command
+from django.db.models import QuerySet
+from django.test import TransactionTestCase, override_settings
+from django.utils import timezone
+from openpyxl import load_workbook
+
+from core.models import ExportJob
+from core.services import export_jobs, reference_data
+from core.tests.base import TeamTestCase, make_evaluated_task, make_user
+
+STATS_EXPORT = '/settings/monthly-stats/?upto=ytd&export=excel&lang=en'
+
+
+class ExportTestCase(TeamTestCase):
+    """Team with scored tasks; finished files go to a temporary EXPORT_ROOT."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        for i in range(6):
+            make_evaluated_task(cls.employees[i % 2], issue_action=f'Task {i}', priority=cls.priority,
+                                kpi=cls.kpi, quality=cls.quality)
+
+    def setUp(self):
+        super().setUp()
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+        settings_override = override_settings(EXPORT_ROOT=root, EXPORT_BACKGROUND=True)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.client.force_login(self.manager)
+
+    def export(self, url=STATS_EXPORT, **headers):
+        return self.client.get(url, HTTP_ACCEPT='application/json', **headers)
+
+    def finished_job(self):
+        self.assertEqual(self.export().status_code, 202)
+        job = export_jobs.claim_next()
+        self.assertTrue(export_jobs.run_job(job), ExportJob.objects.get(pk=job.pk).error)
+        return ExportJob.objects.get(pk=job.pk)
+
+
+class ExportJobViewTests(ExportTestCase):
+    """Queued exports through the report views and the job pages."""
+
+    def test_repeat_request_reuses_the_pending_job(self):
+        first = self.export().json()
+        second = self.export().json()
+        self.assertEqual(second['id'], first['id'])
+        self.assertFalse(first['reused'])
+        self.assertTrue(second['reused'])
+        self.assertEqual(ExportJob.objects.count(), 1)
+        # Another language is another file
+        self.export(STATS_EXPORT.replace('lang=en', 'lang=ar'))
+        self.assertEqual(ExportJob.objects.count(), 2)
+
+    def test_html_request_redirects_to_the_job_page(self):
+        response = self.client.get(STATS_EXPORT)
+        job = ExportJob.objects.get()
+        self.assertRedirects(response, f'/exports/{job.pk}/')
+        self.assertContains(self.client.get(response['Location']), 'data-export-state')
+
+    def test_worker_renders_the_file_for_download(self):
+        job = self.finished_job()
+        self.assertEqual(job.status, 'done')
+        self.assertEqual(self.client.get(f'/exports/{job.pk}/status/').json()['status'], 'done')
+        response = self.client.get(f'/exports/{job.pk}/download/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('attachment', response['Content-Disposition'])
+        workbook = load_workbook(io.BytesIO(b''.join(response.streaming_content)))
+        # Same file as rendering the report in the request
+        with override_settings(EXPORT_BACKGROUND=False):
+            direct = self.client.get(STATS_EXPORT)
+        expected = load_workbook(io.BytesIO(b''.join(direct.streaming_content) if direct.streaming else direct.content))
+        self.assertEqual(workbook.sheetnames, expected.sheetnames)
+        for name in workbook.sheetnames:
+            self.assertEqual(
+                [[cell.value for cell in row] for row in workbook[name].iter_rows()],
+                [[cell.value for cell in row] for row in expected[name].iter_rows()],
+            )
+
+    def test_another_users_job_is_not_found(self):
+        job = self.finished_job()
+        self.client.force_login(self.employees[0])
+        for suffix in ('', 'status/', 'download/'):
+            with self.subTest(page=suffix or 'job'):
+                self.assertEqual(self.client.get(f'/exports/{job.pk}/{suffix}').status_code, 404)
+
+    def test_expired_job_is_not_found(self):
+        job = self.finished_job()
+        ExportJob.objects.filter(pk=job.pk).update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(self.client.get(f'/exports/{job.pk}/download/').status_code, 404)
+        export_jobs.purge_expired()
+        self.assertEqual(self.client.get(f'/exports/{job.pk}/download/').status_code, 404)
+        self.assertEqual(self.client.get(f'/exports/{job.pk}/status/').json()['status'], 'expired')
+
+    def test_refused_replay_fails_the_job_with_the_views_message(self):
+        self.export('/settings/progress-report/?employee=999999&export=excel&lang=en')
+        job = export_jobs.claim_next()
+        self.assertFalse(export_jobs.run_job(job))
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+        self.assertTrue(job.error)
+
+
+class ExportAdmissionTests(ExportTestCase):
+    """Admission control, claiming and cleanup of the export queue."""
+
+    def queue_job(self, user, key, **fields):
+        return ExportJob.objects.create(
+            user=user, view_name='monthly-employee-stats', export_type='excel', params={'key': key},
+            params_hash=f'{user.pk}-{key}', **fields,
+        )
+
+    @override_settings(EXPORT_JOBS_PER_USER=2)
+    def test_per_user_limit_answers_429(self):
+        for lang in ('en', 'ar'):
+            self.assertEqual(self.export(STATS_EXPORT.replace('lang=en', f'lang={lang}')).status_code, 202)
+        refused = self.export(STATS_EXPORT + '&upto=month')
+        self.assertEqual(refused.status_code, 429)
+        self.assertEqual(refused['Retry-After'], '60')
+        self.assertIn('error', refused.json())
+        # An identical request is still answered with its job
+        self.assertEqual(self.export().status_code, 202)
+        # A page request goes back to the report, without the export parameters
+        response = self.client.get(STATS_EXPORT + '&upto=month')
+        self.assertEqual(response.status_code, 302)
+        self.assertNotIn('export=', response['Location'])
+        self.assertEqual(ExportJob.objects.count(), 2)
+
+    @override_settings(EXPORT_QUEUE_LIMIT=2)
+    def test_full_queue_answers_503(self):
+        for key in ('a', 'b'):
+            self.queue_job(self.employees[0], key)
+        self.assertEqual(self.export().status_code, 503)
+        self.assertEqual(export_jobs.queue_depth()['pending'], 2)
+
+    @override_settings(EXPORT_RUNNING_PER_USER=1)
+    def test_claim_skips_users_at_their_running_cap(self):
+        first = self.queue_job(self.manager, 'a')
+        self.queue_job(self.manager, 'b')
+        other = self.queue_job(self.employees[0], 'c')
+        self.assertEqual(export_jobs.claim_next().pk, first.pk)
+        # The manager's second job waits for the first; the other user's job goes ahead
+        self.assertEqual(export_jobs.claim_next().pk, other.pk)
+        self.assertIsNone(export_jobs.claim_next())
+
+    def test_claim_skips_a_job_another_worker_took(self):
+        taken = self.queue_job(self.manager, 'a')
+        waiting = self.queue_job(self.employees[0], 'b')
+        real_first = QuerySet.first
+
+        def first_taken_meanwhile(queryset):
+            job = real_first(queryset)
+            if job is not None and job.pk == taken.pk:
+                # Another worker claims the job between the SELECT and the conditional UPDATE
+                ExportJob.objects.filter(pk=job.pk).update(status='running', started_at=timezone.now())
+            return job
+
+        with mock.patch.object(QuerySet, 'first', first_taken_meanwhile):
+            claimed = export_jobs.claim_next()
+        self.assertEqual(claimed.pk, waiting.pk)
+        self.assertEqual(ExportJob.objects.filter(status='running').count(), 2)
+
+    def test_fail_abandoned_fails_only_old_running_jobs(self):
+        old = self.queue_job(self.manager, 'a', status='running', started_at=timezone.now() - timedelta(hours=1))
+        recent = self.queue_job(self.employees[0], 'b', status='running', started_at=timezone.now())
+        self.assertEqual(export_jobs.fail_abandoned(), 1)
+        old.refresh_from_db()
+        recent.refresh_from_db()
+        self.assertEqual((old.status, recent.status), ('failed', 'running'))
+        self.assertTrue(old.error)
+
+    def test_purge_expired_deletes_files_past_expiry(self):
+        expired = self.finished_job()
+        kept = self.queue_job(self.employees[0], 'b', status='done', file_path='kept/file.xlsx',
+                              expires_at=expired.expires_at + timedelta(hours=1))
+        storage = export_jobs.export_storage()
+        self.assertTrue(storage.exists(expired.file_path))
+        self.assertEqual(export_jobs.purge_expired(now=expired.expires_at + timedelta(seconds=1)), {'expired': 1})
+        self.assertFalse(storage.exists(expired.file_path))
+        self.assertFalse(os.path.exists(os.path.dirname(storage.path(expired.file_path))))
+        expired.refresh_from_db()
+        kept.refresh_from_db()
+        self.assertEqual((expired.status, expired.file_path), ('expired', ''))
+        self.assertEqual(kept.status, 'done')
+
+
+class ExportWorkerPoolTests(TransactionTestCase):
+    """run_export_jobs --workers N renders queued jobs through its pool."""
+
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+        settings_override = override_settings(EXPORT_ROOT=root, EXPORT_BACKGROUND=True, EXPORT_RUNNING_PER_USER=2)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        reference_data.invalidate()
+        self.manager = make_user('mgr', 'manager')
+        self.employee = make_user('emp0', under_supervision=self.manager)
+
+    def test_pool_renders_every_job(self):
+        self.client.force_login(self.manager)
+        for url in (STATS_EXPORT, STATS_EXPORT.replace('lang=en', 'lang=ar'),
+                    f'/settings/progress-report/?employee={self.employee.pk}&export=excel&lang=en'):
+            self.assertEqual(self.client.get(url, HTTP_ACCEPT='application/json').status_code, 202)
+        out = io.StringIO()
+        # Worker threads instead of processes: they share the test database
+        with mock.patch('core.management.commands.run_export_jobs.ProcessPoolExecutor', ThreadPoolExecutor):
+            call_command('run_export_jobs', '--once', '--workers', '2', stdout=out)
+        self.assertIn('Processed 3 export job(s).', out.getvalue())
+        self.assertEqual(
+            list(ExportJob.objects.values_list('status', 'error')), [('done', '')] * 3,
+        )
@@ -0,0 +1,144 @@
+import random
+from datetime import date, datetime, time, timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+
+from core.models import KPI, CustomUser, QualityType, Task, TaskPriorityType
+from core.services import monthly_stats
+from core.tests.base import TeamTestCase
+from core.utils.dates import business_timezone
+
+
+def reference_rows(manager, employees, start_date, end_date, created_in_period=False):
+    """The statistics the page computed before: a handful of queries per employee and a Python timeliness loop."""
+    with timezone.override(business_timezone()):
+        subordinates = CustomUser.objects.filter(under_supervision=manager).exclude(user_type='admin')
+        team_tasks = Task.objects.filter(responsible__in=subordinates).with_effective_status()
+        if created_in_period:
+            team_tasks = team_tasks.filter(created_date__date__gte=start_date, created_date__date__lte=end_date)
+        weights = {kpi.id: float(kpi.weight) for kpi in KPI.objects.filter(created_by=manager, is_active=True)}
+        rows = {}
+        for emp in employees:
+            assigned = team_tasks.filter(responsible=emp).filter(
+                Q(created_date__date__gte=start_date, created_date__date__lte=end_date) |
+                Q(target_date__gte=start_date, target_date__lte=end_date) |
+                Q(close_date__gte=start_date, close_date__lte=end_date) |
+                Q(completion_date__date__gte=start_date, completion_date__date__lte=end_date) |
+                (
+                    Q(created_date__date__lte=end_date) &
+                    (Q(close_date__isnull=True) | Q(close_date__gte=start_date) | Q(completion_date__date__gte=start_date))
+                )
+            )
+            completed = team_tasks.filter(responsible=emp, effective_status='closed').filter(
+                Q(close_date__gte=start_date, close_date__lte=end_date) |
+                Q(completion_date__date__gte=start_date, completion_date__date__lte=end_date)
+            )
+            total_assigned, total_completed = assigned.count(), completed.count()
+            days = [
+                (task.completion_date.date() - task.target_date).days
+                for task in completed if task.completion_date and task.target_date
+            ]
+            weighted_sum = total_weight = 0.0
+            for kpi_id, weight in weights.items():
+                scores = list(completed.filter(kpi_id=kpi_id, evaluation_status='evaluated', final_score__isnull=False)
+                              .values_list('final_score', flat=True))
+                weighted_sum += sum(scores) * weight
+                total_weight += weight * len(scores)
+            rows[emp.id] = {
+                'total_assigned': total_assigned,
+                'total_completed': total_completed,
+                'priority_high': assigned.filter(priority__code='high').count(),
+                'priority_medium': assigned.filter(priority__code='medium').count(),
+                'priority_low': assigned.filter(priority__code='low').count(),
+                'completion_rate': round(total_completed / total_assigned * 100, 2) if total_assigned else 0.0,
+                'avg_timeliness_days': round(sum(days) / len(days), 2) if days else None,
+                'open_count': assigned.filter(effective_status='open').count(),
+                'closed_count': assigned.filter(effective_status='closed').count(),
+                'due_count': assigned.filter(effective_status='due').count(),
+                'avg_final_score': round(weighted_sum / total_weight, 2) if total_weight > 0 else None,
+            }
+        return rows
+
+
+class MonthlyStatsTests(TeamTestCase):
+    """compute_rows against the former per-employee queries, and its query budget."""
+    EMPLOYEES = 6
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        rng = random.Random(17)
+        qualities = [cls.quality, QualityType.objects.create(name='Poor', percentage=40)]
+        priorities = [cls.priority] + [
+            TaskPriorityType.objects.update_or_create(code=code, defaults={'name': code.title(), 'multiplier': multiplier})[0]
+            for code, multiplier in (('medium', 1.1), ('low', 1.0))
+        ] + [None]
+        kpis = [cls.kpi, KPI.objects.create(name='Safety', weight=40, created_by=cls.manager), None]
+        now = timezone.now()
+        # The last employee has no tasks and must still get a row of zeros
+        for i in range(150):
+            done = rng.random() < 0.6
+            task = Task(
+                issue_action=f'Task {i}', responsible=rng.choice(cls.employees[:-1]),
+                start_date=cls.today - timedelta(days=90), target_date=cls.today - timedelta(days=rng.randint(-30, 60)),
+                percentage_completion=100 if done else rng.choice([0, 50]),
+                priority=rng.choice(priorities), kpi=rng.choice(kpis), quality=rng.choice(qualities) if done else None,
+                completion_date=now - timedelta(days=rng.randint(0, 70), hours=rng.randint(0, 23)) if done else None,
+            )
+            task.save()
+            Task.objects.filter(pk=task.pk).update(
+                created_date=now - timedelta(days=rng.randint(0, 100)),
+                close_date=task.completion_date.date() if done and rng.random() < 0.5 else None,
+            )
+
+    def periods(self):
+        this_month = monthly_stats.month_bounds(self.today)
+        last_month = monthly_stats.month_bounds(self.today.replace(day=1) - timedelta(days=1))
+        return [
+            ('current month', *this_month, False),
+            ('year to date', date(self.today.year, 1, 1), self.today, False),
+            ('past month, created in it', *last_month, True),
+            ('current month, created in it', *this_month, True),
+        ]
+
+    def test_rows_match_former_per_employee_queries(self):
+        ids = [emp.id for emp in self.employees]
+        for label, start, end, created_in_period in self.periods():
+            with self.subTest(period=label):
+                rows = monthly_stats.compute_rows(self.manager.id, ids, start, end, created_in_period=created_in_period)
+                self.assertEqual(rows, reference_rows(self.manager, self.employees, start, end, created_in_period))
+        self.assertEqual(rows[self.employees[-1].id], monthly_stats.empty_row())
+
+    def test_rows_take_two_queries_at_any_team_size(self):
+        start, end = date(self.today.year, 1, 1), self.today
+        for size in (1, len(self.employees)):
+            with self.subTest(employees=size), self.assertNumQueries(2):
+                monthly_stats.compute_rows(self.manager.id, [emp.id for emp in self.employees[:size]], start, end)
+
+    def test_page_query_count_does_not_grow_with_team(self):
+        self.client.force_login(self.manager)
+        self.client.get('/settings/monthly-stats/?upto=ytd')  # session and per-process caches
+        for size in (3, 6):
+            team = [emp.id for emp in self.employees[:size]]
+            CustomUser.objects.exclude(pk__in=team).filter(under_supervision=self.manager).update(under_supervision=None)
+            CustomUser.objects.filter(pk__in=team).update(under_supervision=self.manager)
+            with self.subTest(employees=size), self.assertNumQueries(10):
+                response = self.client.get('/settings/monthly-stats/?upto=ytd')
+            self.assertEqual(len(response.context['stats']), size)
+
+    def test_status_sweep_invalidates_open_and_due_counts_of_ended_months(self):
+        month = monthly_stats.month_bounds(self.today.replace(day=1) - timedelta(days=1))[0]
+        employee = self.employees[-1]
+        task = Task.objects.create(issue_action='Late task', responsible=employee,
+                                   start_date=month, target_date=self.today + timedelta(days=5))
+        Task.objects.filter(pk=task.pk).update(
+            created_date=timezone.make_aware(datetime.combine(month, time(12)), business_timezone()),
+        )
+        rows = monthly_stats.snapshot_rows(self.manager.id, month, [employee.id])
+        self.assertEqual((rows[employee.id]['open_count'], rows[employee.id]['due_count']), (1, 0))
+        # The target date passes without an edit; the sweep moves the task to due
+        Task.objects.filter(pk=task.pk).update(target_date=self.today - timedelta(days=1))
+        Task.update_all_statuses()
+        rows = monthly_stats.snapshot_rows(self.manager.id, month, [employee.id])
+        self.assertEqual((rows[employee.id]['open_count'], rows[employee.id]['due_count']), (0, 1))
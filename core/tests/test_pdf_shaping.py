@@ -0,0 +1,42 @@
+from collections import Counter
+
+from django.test import SimpleTestCase
+
+from core.utils import pdf
+
+
+class ShapeColumnsTests(SimpleTestCase):
+    """shape_columns gives the rows a per-cell shape would, shaping each distinct value once per column."""
+
+    def setUp(self):
+        self.rows = [
+            ['1', 'إعداد التقرير', 'مفتوح', 'أحمد'],
+            ['2', 'مراجعة الميزانية', 'مغلق', 'أحمد'],
+            ['3', 'إعداد التقرير', 'مفتوح', 'سارة'],
+            ['4', 'Plan Q3', 'مستحق', ''],
+            ['5', 'إعداد التقرير', 'مغلق', 'أحمد'],
+        ]
+
+    def test_matches_per_cell_shaping(self):
+        self.assertEqual(
+            pdf.shape_columns(iter(self.rows), pdf.shape_arabic),
+            [[pdf.shape_arabic(value) for value in row] for row in self.rows],
+        )
+
+    def test_each_value_shaped_once_per_column(self):
+        calls = Counter()
+
+        def shape(value):
+            calls[value] += 1
+            return f'<{value}>'
+
+        shaped = pdf.shape_columns(self.rows, shape)
+        self.assertEqual(shaped, [[f'<{value}>' for value in row] for row in self.rows])
+        self.assertEqual(calls['إعداد التقرير'], 1)
+        self.assertEqual(calls['أحمد'], 1)
+        self.assertEqual(sum(calls.values()), sum(len(set(column)) for column in zip(*self.rows)))
+
+    def test_ragged_and_empty_rows(self):
+        rows = [['أ', 'ب'], ['أ'], [], ['ج', 'ب', 'د']]
+        self.assertEqual(pdf.shape_columns(rows, '<{}>'.format), [['<أ>', '<ب>'], ['<أ>'], [], ['<ج>', '<ب>', '<د>']])
+        self.assertEqual(pdf.shape_columns([], '<{}>'.format), [])
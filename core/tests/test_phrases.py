@@ -0,0 +1,60 @@
+import json
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from core.services import phrases
+
+
+class PhraseCatalogTests(SimpleTestCase):
+    """The per-process catalog follows the phrase files on disk."""
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        self.base = os.path.join(directory, 'ar.json')
+        self.overrides = os.path.join(directory, 'phrases.ar.json')
+        paths = mock.patch.object(phrases, '_candidate_paths', return_value=[self.base, self.overrides])
+        paths.start()
+        self.addCleanup(paths.stop)
+        phrases.invalidate()
+        self.addCleanup(phrases.invalidate)
+        self.write(self.base, {'Task': 'مهمة', 'Status': 'الحالة', 'nav': {'home': 'الرئيسية'}})
+
+    def write(self, path, data, mtime_ns=None):
+        with open(path, 'w', encoding='utf-8') as fh:
+            json.dump(data, fh, ensure_ascii=False)
+        if mtime_ns is not None:
+            os.utime(path, ns=(mtime_ns, mtime_ns))
+
+    def test_lookup_with_export_overrides(self):
+        catalog = phrases.get_catalog('ar')
+        self.assertEqual(catalog.translate('Task'), 'مهمة')
+        # Headings stay in English, fallbacks fill gaps, nested sections are skipped
+        self.assertEqual(catalog.translate('Status'), 'Status')
+        self.assertEqual(catalog.translate('Employee'), phrases.ARABIC_FALLBACKS['Employee'])
+        self.assertEqual(catalog.translate('nav'), 'nav')
+        self.assertEqual(catalog.translate('Unknown'), 'Unknown')
+        self.assertEqual(catalog.translate(None), '')
+
+    def test_reloaded_after_the_file_changes(self):
+        catalog = phrases.get_catalog('ar')
+        self.write(self.base, {'Task': 'عمل'}, mtime_ns=os.stat(self.base).st_mtime_ns + 10 ** 9)
+        # Not checked again within the interval
+        self.assertIs(phrases.get_catalog('ar'), catalog)
+        with mock.patch.object(phrases, 'MTIME_CHECK_INTERVAL', 0):
+            self.assertEqual(phrases.translate('Task', 'ar'), 'عمل')
+            # Unchanged files keep the catalog
+            reloaded = phrases.get_catalog('ar')
+            self.assertIs(phrases.get_catalog('ar'), reloaded)
+
+    def test_reloaded_when_a_file_appears_or_disappears(self):
+        self.assertEqual(phrases.translate('Task', 'ar'), 'مهمة')
+        with mock.patch.object(phrases, 'MTIME_CHECK_INTERVAL', 0):
+            self.write(self.overrides, {'Task': 'مهمّة'})
+            self.assertEqual(phrases.translate('Task', 'ar'), 'مهمّة')
+            os.remove(self.overrides)
+            self.assertEqual(phrases.translate('Task', 'ar'), 'مهمة')
@@ -0,0 +1,39 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from core.models import DataVersion, TaskPriorityType
+from core.services import reference_data
+
+
+class ReferenceSnapshotTests(TestCase):
+    """The per-process snapshot follows the version counter in the database."""
+
+    def setUp(self):
+        reference_data.invalidate()
+
+    def test_reused_until_the_version_moves(self):
+        snapshot = reference_data.get_snapshot()
+        self.assertIs(reference_data.get_snapshot(), snapshot)
+        # Another process bumps the counter: seen at the next version check
+        DataVersion.bump(reference_data.VERSION_NAME)
+        with mock.patch.object(reference_data, 'VERSION_CHECK_INTERVAL', 0):
+            rebuilt = reference_data.get_snapshot()
+        self.assertIsNot(rebuilt, snapshot)
+        self.assertEqual(rebuilt.version, snapshot.version + 1)
+
+    def test_version_checks_are_throttled(self):
+        reference_data.get_snapshot()
+        with self.assertNumQueries(0):
+            reference_data.get_snapshot()
+        with mock.patch.object(reference_data, 'VERSION_CHECK_INTERVAL', 0), self.assertNumQueries(1):
+            reference_data.get_snapshot()
+
+    def test_saving_a_priority_rebuilds_with_the_new_multiplier(self):
+        priority, _ = TaskPriorityType.objects.update_or_create(code='high', defaults={'name': 'High', 'multiplier': 1.2})
+        self.assertEqual(reference_data.get_snapshot().priorities_by_id[priority.id].multiplier, 1.2)
+        version = DataVersion.current(reference_data.VERSION_NAME)
+        priority.multiplier = 1.5
+        priority.save()
+        self.assertGreater(DataVersion.current(reference_data.VERSION_NAME), version)
+        self.assertEqual(reference_data.get_snapshot().priorities_by_id[priority.id].multiplier, 1.5)
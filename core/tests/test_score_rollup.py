@@ -0,0 +1,77 @@
+from datetime import timedelta
+
+from django.utils import timezone
+
+from core.models import KPI, Task, TaskScoreRollup
+from core.services import score_rollup
+from core.tests.base import TeamTestCase, make_evaluated_task
+
+
+def recomputed_rollups():
+    """Rollup rows summed task by task from the task table."""
+    rows = {}
+    for task in Task.objects.select_related('kpi'):
+        key = score_rollup.rollup_key({name: getattr(task, name) for name in score_rollup.SOURCE_FIELDS})
+        if key is None:
+            continue
+        count, total, weight, manager_id = rows.get(key, (0, 0.0, task.kpi.weight, task.kpi.created_by_id))
+        rows[key] = (count + 1, round(total + task.final_score, 6), weight, manager_id)
+    return rows
+
+
+def stored_rollups():
+    return {
+        (row.employee_id, row.kpi_id, row.month): (row.task_count, round(row.score_sum, 6), row.weight, row.manager_id)
+        for row in TaskScoreRollup.objects.all()
+    }
+
+
+class ScoreRollupTests(TeamTestCase):
+    """Rollup rows match a recompute from the task table after every kind of task change."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.other_kpi = KPI.objects.create(name='Safety', weight=40, created_by=cls.manager)
+        for i in range(8):
+            make_evaluated_task(
+                cls.employees[i % 2], issue_action=f'Task {i}', priority=cls.priority, quality=cls.quality,
+                kpi=cls.kpi if i % 3 else cls.other_kpi, completion_date=timezone.now() - timedelta(days=20 * (i % 3)),
+            )
+
+    def assertRollupsCurrent(self):
+        self.assertEqual(stored_rollups(), recomputed_rollups())
+
+    def test_rows_follow_task_saves(self):
+        self.assertRollupsCurrent()
+        task = Task.objects.filter(kpi=self.kpi).first()
+        task.final_score = 55.5
+        task.save()
+        self.assertRollupsCurrent()
+        # Reassigned, moved to another KPI and to an earlier month in one save
+        task.responsible = self.employees[1 - self.employees.index(task.responsible)]
+        task.kpi = self.other_kpi
+        task.completion_date -= timedelta(days=70)
+        task.save()
+        self.assertRollupsCurrent()
+        # Reopened: no longer counted
+        task.status = 'open'
+        task.save()
+        self.assertRollupsCurrent()
+
+    def test_rows_follow_deletes(self):
+        for task in Task.objects.order_by('pk')[:3]:
+            task.delete()
+        self.assertRollupsCurrent()
+        Task.objects.all().delete()
+        self.assertEqual(stored_rollups(), {})
+
+    def test_rows_follow_kpi_weight(self):
+        self.other_kpi.weight = 25
+        self.other_kpi.save()
+        self.assertRollupsCurrent()
+
+    def test_rebuild_matches_maintained_rows(self):
+        maintained = stored_rollups()
+        score_rollup.rebuild()
+        self.assertEqual(stored_rollups(), maintained)
@@ -0,0 +1,126 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from core.models import KPI, CustomUser, QualityType, Task, TaskEvaluationSettings
+from core.services import score_simulation
+from core.tests.base import TeamTestCase, make_evaluated_task, make_user
+
+
+class TaskScoreColumnsTests(TeamTestCase):
+    """The cached task columns are rebuilt when tasks are reassigned or employees change supervisor."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.other_manager = make_user('mgr1', 'manager')
+        for i in range(6):
+            make_evaluated_task(cls.employees[i % 2], issue_action=f'Task {i}', priority=cls.priority,
+                                kpi=cls.kpi, quality=cls.quality)
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        score_simulation.invalidate()
+
+    def expected_columns(self):
+        rows = Task.objects.filter(evaluation_status='evaluated').order_by().values_list(
+            'responsible_id', 'responsible__under_supervision_id',
+        )
+        return sorted(rows)
+
+    def cached_columns(self):
+        columns = score_simulation.get_task_columns()
+        return sorted(zip(columns.responsible_id, columns.manager_id))
+
+    def test_reused_while_unchanged(self):
+        first = score_simulation.get_task_columns()
+        self.assertIs(score_simulation.get_task_columns(), first)
+        # Logins save last_login only
+        self.employees[0].last_login = timezone.now()
+        self.employees[0].save(update_fields=['last_login'])
+        self.assertIs(score_simulation.get_task_columns(), first)
+
+    def test_employee_moved_to_another_manager(self):
+        self.assertEqual(self.cached_columns(), self.expected_columns())
+        employee = CustomUser.objects.get(pk=self.employees[0].pk)
+        employee.under_supervision = self.other_manager
+        employee.save()
+        self.assertEqual(self.cached_columns(), self.expected_columns())
+
+    def test_supervisor_changed_by_queryset_update(self):
+        self.assertEqual(self.cached_columns(), self.expected_columns())
+        CustomUser.objects.filter(pk=self.employees[1].pk).update(under_supervision=self.other_manager)
+        self.assertEqual(self.cached_columns(), self.expected_columns())
+
+    def test_tasks_reassigned_by_queryset_update(self):
+        self.assertEqual(self.cached_columns(), self.expected_columns())
+        first_task = Task.objects.order_by('pk').first()
+        # Keeps updated_date, count and max id: only the assignee sum moves
+        Task.objects.filter(pk=first_task.pk).update(responsible=self.employees[1 - self.employees.index(first_task.responsible)])
+        self.assertEqual(self.cached_columns(), self.expected_columns())
+
+
+def reference_scores(settings, group):
+    """Per-task rescore through Task.calculate_automatic_evaluation, KPI-weighted per employee or manager."""
+    sums = {}
+    for task in Task.objects.filter(evaluation_status='evaluated').select_related('kpi', 'responsible'):
+        manager_id = task.responsible.under_supervision_id
+        new = task.calculate_automatic_evaluation(
+            manager_closure=task.percentage_completion < 100, settings=settings,
+        )['final_score']
+        kpi = task.kpi
+        if kpi is None or not kpi.is_active or not kpi.weight or kpi.created_by_id != manager_id:
+            continue
+        key = task.responsible_id if group == 'employee' else manager_id
+        total = sums.setdefault(key, [0.0, 0.0, 0.0])
+        total[0] += task.final_score * kpi.weight
+        total[1] += new * kpi.weight
+        total[2] += kpi.weight
+    return {key: (round(current / weight, 2), round(new / weight, 2)) for key, (current, new, weight) in sums.items()}
+
+
+class SimulationTests(TeamTestCase):
+    """simulate() against a per-task rescore and weighting."""
+    EMPLOYEES = 4
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        other_manager = make_user('mgr1', 'manager')
+        CustomUser.objects.filter(pk__in=[cls.employees[1].pk, cls.employees[3].pk]).update(under_supervision=other_manager)
+        poor = QualityType.objects.create(name='Poor', percentage=40)
+        kpis = [
+            cls.kpi,
+            KPI.objects.create(name='Safety', weight=40, created_by=cls.manager),
+            KPI.objects.create(name='Quality', weight=30, created_by=other_manager),
+            KPI.objects.create(name='Retired', weight=50, created_by=other_manager, is_active=False),
+            None,
+        ]
+        for i in range(40):
+            percentage = 100 if i % 4 else 60
+            make_evaluated_task(
+                cls.employees[i % 4], manager_closure=percentage < 100, issue_action=f'Task {i}',
+                priority=cls.priority if i % 3 else None, kpi=kpis[i % 5], quality=cls.quality if i % 2 else poor,
+                start_date=cls.today - timedelta(days=30), target_date=cls.today - timedelta(days=i % 7 - 3),
+                percentage_completion=percentage, completion_date=timezone.now() - timedelta(days=i % 5),
+            )
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        score_simulation.invalidate()
+
+    def test_scores_match_per_task_rescore(self):
+        settings = TaskEvaluationSettings(
+            early_completion_bonus_per_day=2.0, late_completion_penalty_per_day=5.0, manager_closure_penalty=10.0,
+        ).as_evaluation_settings()
+        result = score_simulation.simulate(settings)
+        self.assertEqual(result['task_count'], 40)
+        for group, key in (('employee', 'employees'), ('manager', 'managers')):
+            with self.subTest(group=group):
+                self.assertEqual(
+                    {row['id']: (row['current_score'], row['simulated_score']) for row in result[key] if row['current_score'] is not None},
+                    reference_scores(settings, group),
+                )
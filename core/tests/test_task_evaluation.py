@@ -0,0 +1,99 @@
+import itertools
+import random
+import unittest
+from datetime import date, timedelta
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from core.services import task_service
+from core.services.task_service import (
+    EvaluationSettings, TaskEvaluationInput, compute_automatic_evaluation, compute_automatic_evaluation_batch,
+)
+
+RESULT_KEYS = ('quality_score', 'priority_multiplier', 'time_bonus_penalty', 'final_score', 'manager_closure_penalty_applied')
+
+
+def settings_variants():
+    """Every on/off combination of the evaluation rules, plus non-default rates and caps."""
+    for flags in itertools.product((True, False), repeat=4):
+        yield EvaluationSettings(*flags, 1.0, 10.0, 2.0, 20.0, 20.0)
+    yield EvaluationSettings(True, True, True, True, 2.5, 7.0, 3.5, 15.0, 33.0)
+
+
+def sample_tasks(count=500, seed=8):
+    """(input, manager_closure) pairs covering missing dates and multipliers, early/late/on-time and over 100%."""
+    rng = random.Random(seed)
+    target = date(2025, 1, 15)
+
+    def some_date():
+        return rng.choice([None, target, target + timedelta(days=rng.randint(-40, 40))])
+
+    return [
+        (
+            TaskEvaluationInput(
+                quality_percentage=rng.choice([0.0, 40.0, 55.5, 80.0, 100.0]),
+                priority_multiplier=rng.choice([None, 0.0, 1.0, 1.2, 1.5]),
+                completion_date=some_date(),
+                target_date=some_date(),
+                percentage_completion=rng.choice([None, 0, 50, 99.9, 100, 120]),
+            ),
+            rng.random() < 0.3,
+        )
+        for _ in range(count)
+    ]
+
+
+class EvaluationBatchParityTests(SimpleTestCase):
+    """compute_automatic_evaluation_batch gives the scalar function's results, with and without numpy."""
+
+    tasks = sample_tasks()
+
+    def batch(self, settings, tasks, manager_closure=None):
+        inputs = [data for data, _ in tasks]
+        result = compute_automatic_evaluation_batch(
+            settings,
+            [data.quality_percentage for data in inputs],
+            [data.priority_multiplier for data in inputs],
+            [data.completion_date.toordinal() if data.completion_date else None for data in inputs],
+            [data.target_date.toordinal() if data.target_date else None for data in inputs],
+            [data.percentage_completion for data in inputs],
+            [closure for _, closure in tasks] if manager_closure is None else manager_closure,
+        )
+        return {key: list(result[key]) for key in RESULT_KEYS}
+
+    def assert_parity(self, settings, tasks, manager_closure=None):
+        columns = self.batch(settings, tasks, manager_closure)
+        for index, (data, closure) in enumerate(tasks):
+            closure = closure if manager_closure is None else manager_closure
+            expected = compute_automatic_evaluation(data, settings, manager_closure=closure)
+            for key in RESULT_KEYS:
+                if key == 'manager_closure_penalty_applied':
+                    self.assertEqual(bool(columns[key][index]), expected[key], (index, key))
+                else:
+                    self.assertAlmostEqual(float(columns[key][index]), float(expected[key]), places=9, msg=(index, key))
+
+    def check_all_settings(self):
+        for settings in settings_variants():
+            with self.subTest(settings=settings):
+                self.assert_parity(settings, self.tasks)
+
+    @unittest.skipIf(task_service.np is None, 'numpy is not installed')
+    def test_numpy_path(self):
+        self.check_all_settings()
+
+    def test_python_fallback(self):
+        with mock.patch.object(task_service, 'np', None):
+            self.check_all_settings()
+
+    def test_single_manager_closure_flag(self):
+        settings = next(settings_variants())
+        for closure in (True, False):
+            with self.subTest(manager_closure=closure):
+                self.assert_parity(settings, self.tasks, manager_closure=closure)
+
+    def test_empty_batch(self):
+        settings = next(settings_variants())
+        self.assertEqual(self.batch(settings, []), {key: [] for key in RESULT_KEYS})
+        with mock.patch.object(task_service, 'np', None):
+            self.assertEqual(self.batch(settings, []), {key: [] for key in RESULT_KEYS})
@@ -0,0 +1,87 @@
+from datetime import timedelta
+
+from core.models import Notification, Task
+from core.tests.base import TeamTestCase
+
+
+class TaskStatusQueryTests(TeamTestCase):
+    """Query budgets of Task.save() and the daily status sweep."""
+
+    def make_task(self, employee, percentage, target_offset, status):
+        task = Task.objects.create(
+            issue_action='Prepare the report', responsible=employee, kpi=self.kpi,
+            quality=self.quality, priority=self.priority,
+            start_date=self.today - timedelta(days=10), target_date=self.today + timedelta(days=target_offset),
+        )
+        # Put the task in the given state without going through save()
+        Task.objects.filter(pk=task.pk).update(percentage_completion=percentage, status=status)
+        return task.pk
+
+    def make_sweep_candidates(self, per_transition):
+        """Tasks due to close, to become due and to reopen; returns their ids by new status."""
+        ids = {'closed': [], 'due': [], 'open': []}
+        for i in range(per_transition):
+            employee = self.employees[i % 2]
+            ids['closed'].append(self.make_task(employee, 100, 3, 'open'))
+            ids['due'].append(self.make_task(employee, 10, -2, 'open'))
+            ids['open'].append(self.make_task(employee, 20, 2, 'due'))
+        return ids
+
+    def test_save_of_loaded_task_is_one_update(self):
+        task = Task.objects.get(pk=self.make_task(self.employees[0], 10, 5, 'open'))
+        task.issue_action = 'Prepare the quarterly report'
+        with self.assertNumQueries(1):
+            task.save()
+
+    def test_save_with_status_change_notifies_once(self):
+        task = Task.objects.get(pk=self.make_task(self.employees[0], 10, 5, 'open'))
+        notified = Notification.objects.filter(recipient=self.employees[0]).count()
+        task.target_date = self.today - timedelta(days=1)
+        with self.assertNumQueries(5):  # UPDATE, savepoint pair, recipient, notification INSERT
+            task.save()
+        self.assertEqual(task.status, 'due')
+        self.assertEqual(Notification.objects.filter(recipient=self.employees[0]).count(), notified + 1)
+
+    def test_update_all_statuses_query_count_does_not_grow_with_tasks(self):
+        for per_transition in (2, 20):
+            with self.subTest(per_transition=per_transition):
+                Task.objects.all().delete()
+                Notification.objects.all().delete()
+                ids = self.make_sweep_candidates(per_transition)
+                # Three transitions (lock + UPDATE each), evaluation, rollups, progress and
+                # statistics invalidation, then one notification batch after commit
+                with self.assertNumQueries(20), self.captureOnCommitCallbacks(execute=True):
+                    updates = Task.update_all_statuses()
+                self.assertEqual(updates, {
+                    'closed': per_transition, 'due': per_transition, 'open': per_transition,
+                    'total_updated': 3 * per_transition,
+                })
+                for status, task_ids in ids.items():
+                    self.assertEqual(Task.objects.filter(pk__in=task_ids, status=status).count(), per_transition)
+                self.assertEqual(Notification.objects.count(), 3 * per_transition)
+                self.assertEqual(
+                    Task.objects.filter(pk__in=ids['closed'], evaluation_status='evaluated').count(), per_transition,
+                )
+
+    def test_update_all_statuses_is_limited_to_queryset(self):
+        ids = self.make_sweep_candidates(1)
+        updates = Task.update_all_statuses(queryset=Task.objects.filter(pk=ids['due'][0]))
+        self.assertEqual(updates['total_updated'], 1)
+        self.assertEqual(Task.objects.get(pk=ids['due'][0]).status, 'due')
+        self.assertEqual(Task.objects.get(pk=ids['closed'][0]).status, 'open')
+        self.assertEqual(Task.objects.get(pk=ids['open'][0]).status, 'due')
+
+    def test_update_all_statuses_without_candidates(self):
+        # The three candidate lookups inside the transaction, and the empty rollup refresh
+        with self.assertNumQueries(7), self.captureOnCommitCallbacks(execute=True):
+            updates = Task.update_all_statuses()
+        self.assertEqual(updates['total_updated'], 0)
+
+    def test_update_all_statuses_updates_in_batches(self):
+        ids = self.make_sweep_candidates(5)
+        # Five ids per transition in batches of two: three UPDATEs each instead of one
+        with self.assertNumQueries(26), self.captureOnCommitCallbacks(execute=True):
+            updates = Task.update_all_statuses(batch_size=2)
+        self.assertEqual(updates['total_updated'], 15)
+        for status, task_ids in ids.items():
+            self.assertEqual(Task.objects.filter(pk__in=task_ids, status=status).count(), 5)
@@ -0,0 +1,71 @@
+import json
+from datetime import date, datetime, time
+
+from django.db.models import Q
+from django.utils import timezone
+
+from core.models import Task
+from core.services import trends
+from core.tests.base import TeamTestCase, make_evaluated_task
+from core.utils.dates import business_timezone
+
+
+def completed_on(day):
+    return timezone.make_aware(datetime.combine(day, time(12)), business_timezone())
+
+
+class MonthlyClosedCountsTests(TeamTestCase):
+    """Closed tasks count in every month their close or completion date falls in."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        employee = cls.employees[0]
+        # Closed by the manager in March, completed in April: counted in both months
+        make_evaluated_task(employee, close_date=date(2025, 3, 28), completion_date=completed_on(date(2025, 4, 2)))
+        # Both dates in May: counted once
+        make_evaluated_task(employee, close_date=date(2025, 5, 20), completion_date=completed_on(date(2025, 5, 18)))
+        # No close date: the completion month alone
+        make_evaluated_task(employee, close_date=None, completion_date=completed_on(date(2025, 1, 10)))
+        # Outside the range
+        make_evaluated_task(employee, close_date=date(2024, 12, 30), completion_date=completed_on(date(2024, 12, 30)))
+        make_evaluated_task(cls.employees[1], close_date=date(2025, 2, 3), completion_date=completed_on(date(2025, 2, 3)))
+
+    def setUp(self):
+        super().setUp()
+        self.months = trends.month_range(date(2025, 1, 1), date(2025, 6, 1))
+
+    def per_month_filter(self, employee):
+        """The per-month OR filter the counts replace."""
+        counts = []
+        for month in self.months:
+            end = trends._month_after(month)
+            counts.append(Task.objects.filter(responsible=employee).filter(
+                Q(close_date__gte=month, close_date__lt=end)
+                | Q(completion_date__date__gte=month, completion_date__date__lt=end)
+            ).count())
+        return counts
+
+    def test_counts_in_every_month_either_date_falls_in(self):
+        counts = trends.monthly_counts_any(
+            Task.objects.filter(responsible=self.employees[0]), ('close_date', 'completion_date'), self.months,
+        )[None]
+        self.assertEqual(counts, [1, 0, 1, 1, 1, 0])
+        self.assertEqual(counts, self.per_month_filter(self.employees[0]))
+
+    def test_grouped_by_employee(self):
+        counts = trends.monthly_counts_any(
+            Task.objects.all(), ('close_date', 'completion_date'), self.months,
+            group_by='responsible_id', groups=[employee.pk for employee in self.employees] + [self.manager.pk],
+        )
+        self.assertEqual(counts[self.employees[0].pk], [1, 0, 1, 1, 1, 0])
+        self.assertEqual(counts[self.employees[1].pk], [0, 1, 0, 0, 0, 0])
+        self.assertEqual(counts[self.manager.pk], [0] * 6)
+
+    def test_single_employee_chart_closed_series(self):
+        self.client.force_login(self.manager)
+        response = self.client.get('/settings/monthly-stats/', {'employee': 'emp0', 'month': '2025-06'})
+        chart = json.loads(response.context['employee_status_chart_json'])
+        self.assertEqual(chart['labels'], trends.month_labels(self.months))
+        closed = next(dataset['data'] for dataset in chart['datasets'] if dataset['label'] == 'Closed')
+        self.assertEqual(closed, [1, 0, 1, 1, 1, 0])
@@ -0,0 +1,146 @@
+import math
+import unittest
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from core.services import progress_service
+from core.services.progress_service import compute_weighted_progress, weighted_scores
+
+try:
+    from hypothesis import given, settings, strategies as st
+except ImportError:  # hypothesis is a development requirement (requirements-dev.txt)
+    given = None
+
+
+def legacy_inline_scores(group_ids, kpi_ids, final_scores, kpi_weights):
+    """The per-view loop weighted_scores replaced: per group and KPI, sum the scores, then weight them."""
+    totals = {}
+    for group_id in dict.fromkeys(group_ids):
+        weighted_sum = total_weight = 0.0
+        count = 0
+        for kpi_id, weight in kpi_weights.items():
+            scores = [score for g, k, score in zip(group_ids, kpi_ids, final_scores) if g == group_id and k == kpi_id]
+            if scores:
+                weighted_sum += float(sum(scores)) * float(weight)
+                total_weight += float(weight) * len(scores)
+                count += len(scores)
+        if count:
+            totals[group_id] = (weighted_sum, total_weight, count)
+    return totals
+
+
+def legacy_kpi_average_progress(tasks, kpis):
+    """compute_weighted_progress before it was unified: each KPI counts once, with its average score."""
+    grouped = {}
+    for task in tasks:
+        if task['kpi_id'] in {kpi['id'] for kpi in kpis} and task['final_score'] is not None:
+            grouped.setdefault(task['kpi_id'], []).append(float(task['final_score']))
+    total_weighted = total_weight = 0.0
+    for kpi in kpis:
+        scores = grouped.get(kpi['id'])
+        if scores:
+            total_weighted += (sum(scores) / len(scores)) * kpi['weight'] / 100.0
+            total_weight += kpi['weight']
+    return round(total_weighted / total_weight * 100, 2) if total_weight > 0 else 0.0
+
+
+def pure_python(func, *args, **kwargs):
+    with mock.patch.object(progress_service, 'np', None):
+        return func(*args, **kwargs)
+
+
+class WeightedScoresExampleTests(SimpleTestCase):
+    def test_each_task_counts_with_its_kpi_weight(self):
+        # Employee 1: two tasks under KPI 10 (weight 60), one under KPI 20 (weight 40); KPI 30 has no weight
+        totals = weighted_scores([1, 1, 1, 2, 2], [10, 10, 20, 20, 30], [80.0, 60.0, 90.0, 50.0, 100.0], {10: 60.0, 20: 40.0})
+        self.assertEqual(totals[1].task_count, 3)
+        self.assertEqual(totals[1].score, round((80 * 60 + 60 * 60 + 90 * 40) / (60 + 60 + 40), 2))
+        self.assertEqual(totals[2].score, 50.0)
+        self.assertEqual(totals[2].task_count, 1)
+
+    def test_groups_without_weighted_tasks_are_left_out(self):
+        self.assertEqual(weighted_scores([1, 2], [None, 30], [70.0, 80.0], {10: 50.0}), {})
+        self.assertEqual(weighted_scores([], [], [], {10: 50.0}), {})
+
+    def test_formula_change_of_compute_weighted_progress(self):
+        # KPI 1 (weight 60) has three tasks, KPI 2 (weight 40) one. The old formula averaged per KPI,
+        # the unified one weights every task: the well-populated KPI now pulls harder.
+        tasks = [{'kpi_id': 1, 'final_score': score} for score in (90.0, 90.0, 90.0)] + [{'kpi_id': 2, 'final_score': 30.0}]
+        kpis = [{'id': 1, 'name': 'Delivery', 'weight': 60.0}, {'id': 2, 'name': 'Safety', 'weight': 40.0}]
+        self.assertEqual(legacy_kpi_average_progress(tasks, kpis), 66.0)  # (90 * 60 + 30 * 40) / 100
+        result = compute_weighted_progress(tasks, kpis)
+        self.assertEqual(result['total_progress_score'], 79.09)  # (3 * 90 * 60 + 30 * 40) / (3 * 60 + 40)
+        self.assertEqual(result['total_weight'], 220.0)
+        self.assertEqual(result['progress_breakdown']['Delivery']['weighted_score'], 270.0 * 60)
+
+
+@unittest.skipIf(given is None, 'hypothesis is not installed')
+class WeightedScoresPropertyTests(SimpleTestCase):
+    """Pin weighted_scores and compute_weighted_progress to the implementations they replaced."""
+
+    if given is not None:
+        rows = st.lists(
+            st.tuples(st.integers(1, 6), st.one_of(st.none(), st.integers(1, 8)), st.floats(0, 110, allow_nan=False)),
+            max_size=60,
+        )
+        weight_maps = st.dictionaries(st.integers(1, 8), st.sampled_from([0.0, 5.0, 12.5, 20.0, 33.3, 60.0]), max_size=6)
+
+        @settings(max_examples=300, deadline=None)
+        @given(rows, weight_maps)
+        def test_matches_legacy_inline_loop_on_both_paths(self, rows, weights):
+            groups, kpis, scores = [r[0] for r in rows], [r[1] for r in rows], [r[2] for r in rows]
+            fast = weighted_scores(groups, kpis, scores, weights)
+            # numpy adds in input order (bincount), so the two paths agree exactly
+            self.assertEqual(fast, pure_python(weighted_scores, groups, kpis, scores, weights))
+            legacy = legacy_inline_scores(groups, kpis, scores, weights)
+            self.assertEqual(set(fast), set(legacy))
+            for group_id, (weighted_sum, total_weight, count) in legacy.items():
+                total = fast[group_id]
+                self.assertEqual(total.task_count, count)
+                self.assertTrue(math.isclose(total.weighted_sum, weighted_sum, rel_tol=1e-9, abs_tol=1e-9))
+                self.assertTrue(math.isclose(total.total_weight, total_weight, rel_tol=1e-12, abs_tol=1e-12))
+                if total_weight > 0:
+                    self.assertLessEqual(abs(total.score - round(weighted_sum / total_weight, 2)), 0.01)
+
+        @settings(max_examples=200, deadline=None)
+        @given(rows, weight_maps)
+        def test_grouped_rows_equal_per_task_rows(self, rows, weights):
+            per_task = weighted_scores([r[0] for r in rows], [r[1] for r in rows], [r[2] for r in rows], weights)
+            grouped = {}
+            for group_id, kpi_id, score in rows:
+                entry = grouped.setdefault((group_id, kpi_id), [0.0, 0])
+                entry[0] += score
+                entry[1] += 1
+            keys = list(grouped)
+            totals = weighted_scores(
+                [g for g, _ in keys], [k for _, k in keys], [grouped[key][0] for key in keys], weights,
+                task_counts=[grouped[key][1] for key in keys],
+            )
+            self.assertEqual(set(per_task), set(totals))
+            for group_id, total in per_task.items():
+                self.assertEqual(total.task_count, totals[group_id].task_count)
+                self.assertTrue(math.isclose(total.weighted_sum, totals[group_id].weighted_sum, rel_tol=1e-9, abs_tol=1e-9))
+
+        kpi_lists = st.lists(st.sampled_from([5.0, 12.5, 20.0, 40.0, 60.0]), min_size=1, max_size=5)
+        task_lists = st.lists(st.tuples(st.integers(0, 4), st.one_of(st.none(), st.floats(0, 110, allow_nan=False))), max_size=40)
+
+        @settings(max_examples=300, deadline=None)
+        @given(kpi_lists, task_lists)
+        def test_compute_weighted_progress_is_per_task_weighting(self, weights, task_rows):
+            kpis = [{'id': index + 1, 'name': f'KPI {index + 1}', 'weight': weight} for index, weight in enumerate(weights)]
+            tasks = [{'kpi_id': kpi_index + 1, 'final_score': score} for kpi_index, score in task_rows]
+            result = compute_weighted_progress(tasks, kpis)
+            scored = [task for task in tasks if task['final_score'] is not None and task['kpi_id'] <= len(kpis)]
+            expected = weighted_scores(
+                [0] * len(scored), [task['kpi_id'] for task in scored], [task['final_score'] for task in scored],
+                {kpi['id']: kpi['weight'] for kpi in kpis},
+            ).get(0)
+            self.assertEqual(result['total_progress_score'], expected.score if expected else 0.0)
+            self.assertEqual(result, pure_python(compute_weighted_progress, tasks, kpis))
+            # Where every scored KPI has the same number of tasks, the old per-KPI average formula agrees
+            counts = {task['kpi_id']: 0 for task in scored}
+            for task in scored:
+                counts[task['kpi_id']] += 1
+            if len(set(counts.values())) <= 1:
+                self.assertLessEqual(abs(result['total_progress_score'] - legacy_kpi_average_progress(tasks, kpis)), 0.011)
@@ -73,6 +73,7 @@ urlpatterns = [
     
     # --- TaskEvaluationSettings Management (Admin Only) ---
     path('settings/evaluation-settings/', views.TaskEvaluationSettingsView.as_view(), name='taskevaluationsettings'),
+    path('settings/evaluation-settings/simulate/', views.EvaluationSettingsSimulationView.as_view(), name='taskevaluationsettings-simulate'),
     
     # --- Evaluation Demo ---
     path('evaluation-demo/', views.EvaluationDemoView.as_view(), name='evaluation-demo'),
@@ -88,6 +89,12 @@ urlpatterns = [
 
     # --- Monthly Employee Stats (Manager Only) ---
     path('settings/monthly-stats/', views.MonthlyEmployeeStatsView.as_view(), name='monthly-employee-stats'),
+
+    # --- Report Exports (background jobs) ---
+    path('exports/queue/', views.ExportQueueStatusView.as_view(), name='export-queue'),
+    path('exports/<int:job_id>/', views.ExportJobView.as_view(), name='export-job'),
+    path('exports/<int:job_id>/status/', views.ExportJobStatusView.as_view(), name='export-job-status'),
+    path('exports/<int:job_id>/download/', views.ExportJobDownloadView.as_view(), name='export-job-download'),
     
     # --- My Notes Management (Managers and Employees) ---
     path('my-notes/', views.MyNotesListView.as_view(), name='my-notes'),
@@ -9,21 +9,26 @@ except Exception:  # pragma: no cover - very old Python fallback
     ZoneInfo = None  # type: ignore
 
 
-def business_localdate() -> date:
+def business_timezone():
     """
-    Return today's date in the business timezone.
-
-    - If settings.BUSINESS_TIMEZONE is set (e.g., 'Asia/Muscat'), compute the
-      date in that timezone explicitly, independent of the server TZ.
-    - Otherwise, fall back to Django's timezone.localdate().
+    Return the business timezone (settings.BUSINESS_TIMEZONE), falling back to
+    Django's current timezone when it is unset or unknown.
     """
     tz_name = getattr(settings, 'BUSINESS_TIMEZONE', None)
     if tz_name and ZoneInfo is not None:
         try:
-            tz = ZoneInfo(tz_name)
-            return timezone.now().astimezone(tz).date()
+            return ZoneInfo(tz_name)
         except Exception:
             pass
-    return timezone.localdate()
+    return timezone.get_current_timezone()
+
 
+def business_localdate() -> date:
+    """
+    Return today's date in the business timezone.
 
+    - If settings.BUSINESS_TIMEZONE is set (e.g., 'Asia/Muscat'), compute the
+      date in that timezone explicitly, independent of the server TZ.
+    - Otherwise, fall back to Django's timezone.localdate().
+    """
+    return timezone.now().astimezone(business_timezone()).date()
@@ -0,0 +1,234 @@
+"""
+Shared resources of the PDF report exports (reportlab).
+
+Font files are searched for and registered with ``pdfmetrics`` once per
+process, and the paragraph styles built on them are created once per
+language; the report views only lay out their content. ``warm_up`` does
+the work ahead of the first export (called from the WSGI module, so a
+``gunicorn --preload`` master does it once for all workers). The cached
+styles are shared between requests and must not be modified.
+
+Arabic text is reshaped and reordered for reportlab through a bounded LRU
+cache shared by all exports in the process: report tables repeat the same
+names, statuses, KPIs and priorities on thousands of rows.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+_registry_lock = threading.Lock()
+
+# Heading styles that switch to the header font for Arabic: the brand line,
+# and in the progress report also the title
+DEFAULT_HEADINGS = ('Heading1',)
+TITLE_HEADINGS = ('Heading1', 'Heading2')
+
+# Distinct strings kept by the Arabic shaping cache
+SHAPE_CACHE_SIZE = 8192
+
+_CONTROL_CHARS = re.compile(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]')
+
+
+@dataclass(frozen=True)
+class ReportFonts:
+    """Registered font names; None when no Unicode-capable file was found."""
+    regular: Optional[str] = None        # body text
+    bold: Optional[str] = None           # bold face from a bold font file
+    fallback_bold: Optional[str] = None  # Arial Bold from reportlab's search path
+
+    @property
+    def header(self) -> str:
+        # Prefer the regular Unicode font over Helvetica-Bold to avoid missing glyph squares
+        return self.bold or self.regular or self.fallback_bold or 'Helvetica-Bold'
+
+
+def _first_existing(paths: Iterable[Optional[str]]) -> Optional[str]:
+    for path in paths:
+        try:
+            if path and os.path.isfile(path):
+                return path
+        except Exception:
+            pass
+    return None
+
+
+def _font_candidates(static_names, windows_names, mac_names, linux_names, builtin_names):
+    from django.contrib.staticfiles import finders
+
+    win_fonts = os.path.join(os.environ.get('WINDIR', 'C:\\Windows'), 'Fonts')
+    system_fonts = '/System/Library/Fonts'  # macOS
+    linux_fonts = '/usr/share/fonts'  # Linux
+    return [
+        *(finders.find(f'core/fonts/{name}') for name in static_names),
+        *(os.path.join(win_fonts, name) for name in windows_names),
+        *(os.path.join(system_fonts, name) for name in mac_names),
+        *(os.path.join(linux_fonts, name) for name in linux_names),
+        *builtin_names,
+    ]
+
+
+def _register(name: str, path: str) -> bool:
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+
+    try:
+        pdfmetrics.registerFont(TTFont(name, path))
+        return True
+    except Exception as exc:
+        logger.debug('Could not register PDF font %s from %s: %s', name, path, exc)
+        return False
+
+
+@lru_cache(maxsize=None)
+def report_fonts() -> ReportFonts:
+    """Find and register the Arabic-capable fonts (first call in the process only)."""
+    with _registry_lock:
+        reg_font = _first_existing(_font_candidates(
+            ['DejaVuSans.ttf', 'NotoNaskhArabic-Regular.ttf', 'Amiri-Regular.ttf'],
+            ['arial.ttf', 'arialuni.ttf', 'tahoma.ttf', 'DejaVuSans.ttf', 'NotoNaskhArabic-Regular.ttf',
+             'Amiri-Regular.ttf', 'ARIALUNI.TTF', 'segoeui.ttf'],
+            ['Arial.ttf', 'Helvetica.ttc'],
+            ['truetype/dejavu/DejaVuSans.ttf', 'truetype/liberation/LiberationSans-Regular.ttf'],
+            ['arial.ttf', 'helvetica.ttf'],
+        ))
+        bold_font = _first_existing(_font_candidates(
+            ['DejaVuSans-Bold.ttf', 'NotoNaskhArabic-Bold.ttf', 'Amiri-Bold.ttf'],
+            ['arialbd.ttf', 'tahomabd.ttf', 'DejaVuSans-Bold.ttf', 'NotoNaskhArabic-Bold.ttf',
+             'Amiri-Bold.ttf', 'segoeuib.ttf'],
+            ['Arial Bold.ttf', 'Helvetica-Bold.ttc'],
+            ['truetype/dejavu/DejaVuSans-Bold.ttf', 'truetype/liberation/LiberationSans-Bold.ttf'],
+            ['arialbd.ttf', 'helvetica-bold.ttf'],
+        ))
+
+        regular = None
+        if reg_font and _register('ArabicBase', reg_font):
+            regular = 'ArabicBase'
+        elif _register('UnicodeBase', 'arial.ttf'):
+            # Use a built-in Unicode-capable font
+            regular = 'UnicodeBase'
+        bold = 'ArabicBase-Bold' if bold_font and _register('ArabicBase-Bold', bold_font) else None
+        fallback_bold = None
+        if not bold and _register('UnicodeBase-Bold', 'arialbd.ttf'):
+            fallback_bold = 'UnicodeBase-Bold'
+        fonts = ReportFonts(regular=regular, bold=bold, fallback_bold=fallback_bold)
+    logger.info('PDF report fonts: %s', fonts)
+    return fonts
+
+
+@dataclass(frozen=True)
+class ReportStyles:
+    styles: object  # reportlab StyleSheet1
+    brand: object
+    title: object
+    header_font: str
+
+
+@lru_cache(maxsize=None)
+def report_styles(is_ar: bool, headings: Tuple[str, ...] = DEFAULT_HEADINGS) -> ReportStyles:
+    """
+    Paragraph styles of a report: the sample stylesheet with 9pt body text,
+    plus the centred brand and title styles. For Arabic the body uses the
+    registered Unicode font and ``headings`` the header font.
+    """
+    from reportlab.lib import colors
+    from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+
+    styles = getSampleStyleSheet()
+    header_font_name = 'Helvetica-Bold'
+    if is_ar:
+        fonts = report_fonts()
+        styles['Normal'].fontName = fonts.regular or 'Helvetica'
+        header_font_name = fonts.header
+        for name in headings:
+            styles[name].fontName = header_font_name
+    else:
+        styles['Normal'].fontName = 'Helvetica'
+    styles['Normal'].fontSize = 9
+    brand_style = ParagraphStyle(
+        'Brand',
+        parent=styles['Heading1'],
+        alignment=1,
+        textColor=colors.HexColor('#0B5ED7'),
+        fontName=(styles['Heading1'].fontName or header_font_name),
+        fontSize=20,
+        leading=24,
+    )
+    title_style = ParagraphStyle(
+        'CenterTitle',
+        parent=styles['Heading2'],
+        alignment=1,
+        textColor=colors.HexColor('#2c3e50'),
+        spaceBefore=2,
+        spaceAfter=6,
+    )
+    return ReportStyles(styles=styles, brand=brand_style, title=title_style, header_font=header_font_name)
+
+
+@lru_cache(maxsize=None)
+def logo_path() -> Optional[str]:
+    """The Lynex logo shown at the top of the reports, if present."""
+    from django.conf import settings
+    from django.contrib.staticfiles import finders
+
+    try:
+        path = finders.find('core/img/logos/title.jpg')
+        if not path:
+            # Fallback to app static path if finders not available in this context
+            path = os.path.join(settings.BASE_DIR, 'OpticorAI_project_management_system', 'core', 'static', 'core', 'img', 'logos', 'title.jpg')
+        return path if os.path.isfile(path) else None
+    except Exception:
+        return None
+
+
+@lru_cache(maxsize=SHAPE_CACHE_SIZE)
+def shape_arabic(text: str) -> str:
+    """
+    ``text`` reshaped (joined letter forms) and in visual order (bidi), as
+    reportlab draws it left to right. Without the shaping libraries, or if
+    they fail, the text is returned without control characters.
+    """
+    try:
+        import arabic_reshaper  # type: ignore
+        from bidi.algorithm import get_display  # type: ignore
+
+        return get_display(arabic_reshaper.reshape(text)) or text
+    except Exception:
+        # Remove any control characters that might cause rendering issues
+        return _CONTROL_CHARS.sub('', text)
+
+
+def shape_columns(rows: Iterable[Sequence], shape: Callable[[object], str]) -> List[List[str]]:
+    """Apply ``shape`` to every cell of ``rows``, once per distinct value of each column."""
+    memos: List[dict] = []
+    shaped_rows = []
+    for row in rows:
+        shaped_row = []
+        for index, value in enumerate(row):
+            if index == len(memos):
+                memos.append({})
+            memo = memos[index]
+            if value not in memo:
+                memo[value] = shape(value)
+            shaped_row.append(memo[value])
+        shaped_rows.append(shaped_row)
+    return shaped_rows
+
+
+def warm_up() -> None:
+    """Resolve fonts, styles and the logo now instead of in the first export."""
+    try:
+        logo_path()
+        for is_ar in (False, True):
+            for headings in (DEFAULT_HEADINGS, TITLE_HEADINGS):
+                report_styles(is_ar, headings)
+    except Exception:
+        logger.exception('Could not prepare the PDF report fonts')
@@ -7,29 +7,30 @@ from django.core.paginator import Paginator, PageNotAnInteger, EmptyPage
 from django.db.models import Q
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.views.generic import ListView, CreateView, UpdateView, DeleteView
-from django.urls import reverse_lazy
+from django.urls import reverse, reverse_lazy
 from django.contrib.auth import get_user_model
 from django.utils import timezone
+from core.utils import excel, pdf
 from core.utils.dates import business_localdate
 from datetime import date
 import os
 from django.conf import settings
 from django import forms
-from django.http import JsonResponse
+from django.http import FileResponse, Http404, JsonResponse
 from django.views import View
 from django.db import models
 import requests
-from openpyxl import Workbook
 from reportlab.pdfgen import canvas
 from io import BytesIO
 from calendar import monthrange
 from django.db.models.functions import Concat
-from django.db.models import Value as V, Avg
+from django.db.models import Value as V, Avg, Sum
 from django.db.models import Exists, OuterRef
 from django.core.cache import cache
 from django.db.models import Case, When, IntegerField, Count
 from django.db.models import Count, Case, When, IntegerField
-from .models import CustomUser, Task, KPI, QualityType, Notification, TaskPriorityType, TaskEvaluationSettings, EmployeeProgress, ChatBot, ChatMessage
+from .models import CustomUser, Task, KPI, QualityType, Notification, TaskPriorityType, TaskEvaluationSettings, EmployeeProgress, ChatBot, ChatMessage, ExportJob
+from .services import export_jobs, monthly_stats, phrases, progress_service, reference_data, score_rollup, trends
 from django.utils.http import url_has_allowed_host_and_scheme
 from django.utils.timezone import make_aware
 from datetime import datetime, timedelta
@@ -366,19 +367,6 @@ class IndexView(View):
 class DashboardView(LoginRequiredMixin, View):
     def get(self, request):
         user = request.user
-        # Lightweight daily refresh of task statuses to keep dashboards accurate
-        try:
-            from django.utils import timezone
-            from .models import Task
-            today = business_localdate()
-            guard_key = f"task_status_auto_refresh:{today.isoformat()}"
-            if cache.get(guard_key) is None:
-                # Run once per day across all users; cache TTL ~ 24h
-                Task.update_all_statuses()
-                cache.set(guard_key, True, 60 * 60 * 24)
-        except Exception:
-            # Never block dashboard if refresh fails
-            pass
         if user.user_type == 'admin':
             users = CustomUser.objects.exclude(user_type='admin')
             managers = CustomUser.objects.filter(user_type='manager')
@@ -390,7 +378,7 @@ class DashboardView(LoginRequiredMixin, View):
             }
         elif user.user_type in ['manager']:
             # Managers can see tasks assigned to themselves OR their subordinates
-            all_manager_tasks = Task.objects.select_related('responsible', 'priority').for_manager(user)
+            all_manager_tasks = Task.objects.select_related('responsible', 'priority').for_manager(user).with_effective_status()
             subordinates = CustomUser.objects.filter(under_supervision=user)
             subordinate_tasks = Task.objects.select_related('responsible').filter(responsible__in=subordinates)
             # Cache dashboard totals briefly to reduce DB hits
@@ -400,9 +388,9 @@ class DashboardView(LoginRequiredMixin, View):
             if cached is None:
                 totals = all_manager_tasks.aggregate(
                     total=Count('id'),
-                    open_count=Count(Case(When(status='open', then=1), output_field=IntegerField())),
-                    closed_count=Count(Case(When(status='closed', then=1), output_field=IntegerField())),
-                    due_count=Count(Case(When(status='due', then=1), output_field=IntegerField())),
+                    open_count=Count(Case(When(effective_status='open', then=1), output_field=IntegerField())),
+                    closed_count=Count(Case(When(effective_status='closed', then=1), output_field=IntegerField())),
+                    due_count=Count(Case(When(effective_status='due', then=1), output_field=IntegerField())),
                 )
                 total_tasks = totals.get('total', 0) or 0
                 open_tasks = totals.get('open_count', 0) or 0
@@ -415,9 +403,13 @@ class DashboardView(LoginRequiredMixin, View):
 
             # Priority Report (dynamic by active priority types)
             priority_report = {}
-            priority_types = list(TaskPriorityType.objects.filter(is_active=True).values_list('name', flat=True))
-            for priority_type in TaskPriorityType.objects.filter(is_active=True):
-                priority_report[priority_type.name] = all_manager_tasks.filter(priority=priority_type).count()
+            active_priorities = reference_data.get_snapshot().active_priorities()
+            priority_types = [priority_type.name for priority_type in active_priorities]
+            priority_counts = dict(
+                Task.objects.for_manager(user).order_by().values_list('priority_id').annotate(count=Count('id'))
+            )
+            for priority_type in active_priorities:
+                priority_report[priority_type.name] = priority_counts.get(priority_type.id, 0)
             # Status Pie (Open/Closed/Due)
             status_report = {
                 'open': open_tasks,
@@ -427,11 +419,11 @@ class DashboardView(LoginRequiredMixin, View):
             # Status Distribution by User (aggregated)
             
             sub_qs = Task.objects.filter(responsible__in=subordinates)
-            agg = sub_qs.values('responsible__first_name', 'responsible__last_name', 'responsible__username') \
+            agg = sub_qs.with_effective_status().values('responsible__first_name', 'responsible__last_name', 'responsible__username') \
                 .annotate(
-                    open_count=Count(Case(When(status='open', then=1), output_field=IntegerField())),
-                    closed_count=Count(Case(When(status='closed', then=1), output_field=IntegerField())),
-                    due_count=Count(Case(When(status='due', then=1), output_field=IntegerField())),
+                    open_count=Count(Case(When(effective_status='open', then=1), output_field=IntegerField())),
+                    closed_count=Count(Case(When(effective_status='closed', then=1), output_field=IntegerField())),
+                    due_count=Count(Case(When(effective_status='due', then=1), output_field=IntegerField())),
                 )
             status_by_user = {}
             for row in agg:
@@ -500,11 +492,17 @@ class DashboardView(LoginRequiredMixin, View):
                 'pending_approvals': pending_approvals,
             }
         else:
-            my_tasks_qs = Task.objects.select_related('priority', 'kpi').for_responsible(user).order_by('-created_date')
-            total_tasks = my_tasks_qs.count()
-            open_tasks = my_tasks_qs.filter(status='open').count()
-            closed_tasks = my_tasks_qs.filter(status='closed').count()
-            due_tasks = my_tasks_qs.filter(status='due').count()
+            my_tasks_qs = Task.objects.select_related('priority', 'kpi').for_responsible(user).with_effective_status().order_by('-created_date')
+            totals = my_tasks_qs.aggregate(
+                total=Count('id'),
+                open_count=Count(Case(When(effective_status='open', then=1), output_field=IntegerField())),
+                closed_count=Count(Case(When(effective_status='closed', then=1), output_field=IntegerField())),
+                due_count=Count(Case(When(effective_status='due', then=1), output_field=IntegerField())),
+            )
+            total_tasks = totals['total'] or 0
+            open_tasks = totals['open_count'] or 0
+            closed_tasks = totals['closed_count'] or 0
+            due_tasks = totals['due_count'] or 0
             
             # Paginate recent tasks (3 per page)
             recent_tasks_paginator = Paginator(my_tasks_qs, 3)
@@ -860,6 +858,9 @@ class ProjectsView(LoginRequiredMixin, View):
             tasks_qs = Task.objects.select_related('responsible', 'priority', 'kpi').for_manager(user)
         else:
             tasks_qs = Task.objects.select_related('priority', 'kpi').for_responsible(user)
+        # Status is derived from completion/target date at query time so it is
+        # correct even when the daily status refresh has not run yet
+        tasks_qs = tasks_qs.with_effective_status()
 
         # Apply filters
         search_query = request.GET.get('search', '')
@@ -871,7 +872,7 @@ class ProjectsView(LoginRequiredMixin, View):
             )
         status_filter = request.GET.get('status', '')
         if status_filter:
-            tasks_qs = tasks_qs.filter(status=status_filter)
+            tasks_qs = tasks_qs.filter(effective_status=status_filter)
         start_date = request.GET.get('start_date', '')
         end_date = request.GET.get('end_date', '')
         if start_date:
@@ -1087,6 +1088,10 @@ class MonthlyEmployeeStatsView(LoginRequiredMixin, View):
         if user.user_type != 'manager':
             messages.error(request, 'Only managers can access monthly statistics.')
             return redirect('core:dashboard')
+        # Excel/PDF files are built by the export worker (run_export_jobs); the worker replays this request
+        if (request.GET.get('export', '').strip().lower() in export_jobs.EXPORT_TYPES and export_jobs.background_enabled()
+                and not getattr(request, 'export_job', None)):
+            return export_jobs.submit(request, 'monthly-employee-stats')
 
         # Filters
         employee_query = request.GET.get('employee', '').strip()
@@ -1141,108 +1146,28 @@ class MonthlyEmployeeStatsView(LoginRequiredMixin, View):
             last_day = monthrange(today.year, today.month)[1]
             end_date = date(today.year, today.month, last_day)
 
-        # Scope once to team tasks to avoid missing data and reduce queries
-        team_tasks = Task.objects.select_related('responsible', 'priority').filter(responsible__in=subordinates)
-        # Enforce exact-month dataset: when a specific month is selected (not YTD),
-        # restrict to tasks created in that month so previous months do not appear.
+        # Per-employee statistics for the team; a month that has ended is served from its snapshot
+        stat_employees = list(employees.order_by('first_name', 'last_name', 'username'))
+        employee_rows = None
         if month and upto != 'ytd':
-            team_tasks = team_tasks.filter(
-                created_date__date__gte=start_date,
-                created_date__date__lte=end_date,
+            employee_rows = monthly_stats.snapshot_rows(user.id, start_date, [emp.id for emp in stat_employees])
+        if employee_rows is None:
+            # Enforce exact-month dataset: when a specific month is selected (not YTD),
+            # restrict to tasks created in that month so previous months do not appear.
+            employee_rows = monthly_stats.compute_rows(
+                user.id, [emp.id for emp in stat_employees], start_date, end_date,
+                created_in_period=bool(month and upto != 'ytd'),
             )
 
         # Build stats per employee
         stats = []
         aggregate_open = aggregate_closed = aggregate_due = 0
-        for emp in employees.order_by('first_name', 'last_name', 'username'):
-            # Assigned within period: include any task that touches the period
-            # - created within the window OR
-            # - target date in the window OR
-            # - closed within the window OR
-            # - active during the window (created before end and not closed before start)
-            assigned_qs = team_tasks.filter(
-                responsible=emp
-            ).filter(
-                Q(created_date__date__gte=start_date, created_date__date__lte=end_date) |
-                Q(target_date__gte=start_date, target_date__lte=end_date) |
-                Q(close_date__gte=start_date, close_date__lte=end_date) |
-                Q(completion_date__date__gte=start_date, completion_date__date__lte=end_date) |
-                (
-                    Q(created_date__date__lte=end_date) &
-                    (Q(close_date__isnull=True) | Q(close_date__gte=start_date) | Q(completion_date__date__gte=start_date))
-                )
-            )
-            total_assigned = assigned_qs.count()
-
-            # Completed within period: by close_date window
-            completed_qs = team_tasks.filter(
-                responsible=emp,
-                status='closed'
-            ).filter(
-                Q(close_date__gte=start_date, close_date__lte=end_date) |
-                Q(completion_date__date__gte=start_date, completion_date__date__lte=end_date)
-            )
-            total_completed = completed_qs.count()
-
-            # Priority breakdown from assigned tasks in the period
-            high = assigned_qs.filter(priority__code='high').count()
-            medium = assigned_qs.filter(priority__code='medium').count()
-            low = assigned_qs.filter(priority__code='low').count()
-
-            completion_rate = round((total_completed / total_assigned) * 100, 2) if total_assigned else 0.0
-
-            # Timeliness: days before/after target date for tasks completed in the period
-            timeliness_days = []
-            for t in completed_qs.select_related(None).only('completion_date', 'target_date'):
-                if t.completion_date and t.target_date:
-                    delta = (t.completion_date - datetime.combine(t.target_date, datetime.min.time()).replace(tzinfo=t.completion_date.tzinfo)).days
-                    # Convert to date-based difference to avoid timezone issues
-                    delta = (t.completion_date.date() - t.target_date).days
-                    timeliness_days.append(delta)
-            avg_timeliness = round(sum(timeliness_days)/len(timeliness_days), 2) if timeliness_days else None
-
-            # Status breakdown for assigned tasks in the period
-            open_count = assigned_qs.filter(status='open').count()
-            closed_count = assigned_qs.filter(status='closed').count()
-            due_count = assigned_qs.filter(status='due').count()
-
-            aggregate_open += open_count
-            aggregate_closed += closed_count
-            aggregate_due += due_count
-
-            # KPI-weighted final score for CLOSED & evaluated tasks in period (align with Employees Progress)
-            try:
-                from core.models import KPI
-                eval_tasks = completed_qs.filter(evaluation_status='evaluated', final_score__isnull=False)
-                manager_kpis = KPI.objects.filter(created_by=user, is_active=True)
-                total_weighted_score = 0.0
-                total_weight = 0.0
-                for kpi in manager_kpis:
-                    kpi_tasks = eval_tasks.filter(kpi=kpi)
-                    if kpi_tasks.exists():
-                        from django.db.models import Sum as _Sum
-                        task_count = kpi_tasks.count()
-                        sum_scores = kpi_tasks.aggregate(total=_Sum('final_score'))['total'] or 0.0
-                        total_weighted_score += float(sum_scores) * float(kpi.weight)
-                        total_weight += float(kpi.weight) * float(task_count)
-                avg_final_score = round(total_weighted_score / total_weight, 2) if total_weight > 0 else None
-            except Exception:
-                avg_final_score = None
-
-            stats.append({
-                'employee': emp,
-                'total_assigned': total_assigned,
-                'total_completed': total_completed,
-                'priority_high': high,
-                'priority_medium': medium,
-                'priority_low': low,
-                'completion_rate': completion_rate,
-                'avg_timeliness_days': avg_timeliness,
-                'open_count': open_count,
-                'closed_count': closed_count,
-                'due_count': due_count,
-                'avg_final_score': None if avg_final_score is None else round(float(avg_final_score), 2),
-            })
+        for emp in stat_employees:
+            row = employee_rows[emp.id]
+            aggregate_open += row['open_count']
+            aggregate_closed += row['closed_count']
+            aggregate_due += row['due_count']
+            stats.append({'employee': emp, **row})
 
         # Chart data for overall status distribution and enhanced visuals
         import json as _json
@@ -1263,27 +1188,22 @@ class MonthlyEmployeeStatsView(LoginRequiredMixin, View):
 
         # Separate monthly trend (tasks created per month YTD), one series per employee
         try:
-            from calendar import month_abbr
             today_for_trend = business_localdate()
-            months_range = list(range(1, today_for_trend.month + 1))
-            trend_labels = [month_abbr[m] for m in months_range]
-            trend_datasets = []
-
-            for emp in employees.order_by('first_name', 'last_name', 'username'):
-                monthly_counts = []
-                for m in months_range:
-                    m_start = date(today_for_trend.year, m, 1)
-                    m_end = date(today_for_trend.year, m, monthrange(today_for_trend.year, m)[1])
-                    count = Task.objects.filter(
-                        responsible=emp,
-                        created_date__date__gte=m_start,
-                        created_date__date__lte=m_end,
-                    ).count()
-                    monthly_counts.append(count)
-                trend_datasets.append({
+            trend_months = trends.month_range(date(today_for_trend.year, 1, 1), today_for_trend)
+            trend_labels = trends.month_labels(trend_months)
+            trend_employees = list(employees.order_by('first_name', 'last_name', 'username'))
+            created_counts = trends.monthly_counts(
+                Task.objects.filter(responsible__in=[emp.id for emp in trend_employees]),
+                'created_date', trend_months,
+                group_by='responsible_id', groups=[emp.id for emp in trend_employees],
+            )
+            trend_datasets = [
+                {
                     'label': (emp.get_full_name() or emp.username),
-                    'data': monthly_counts,
-                })
+                    'data': created_counts[emp.id]['count'],
+                }
+                for emp in trend_employees
+            ]
 
             monthly_trend_chart_json = _json.dumps({
                 'labels': trend_labels,
@@ -1365,50 +1285,24 @@ class MonthlyEmployeeStatsView(LoginRequiredMixin, View):
             if emp_count_for_months == 1:
                 single_emp = employees.first() if hasattr(employees, 'first') else list(employees)[0]
             if single_emp:
-                from calendar import month_abbr
                 trend_year = start_date.year
                 end_month = end_date.month if end_date.year == trend_year else 12
-                months_range = list(range(1, end_month + 1))
-                month_labels = [month_abbr[m] for m in months_range]
-                # Build per-month counts by status
-                monthly_assigned = []
-                monthly_completed = []
-                monthly_open = []
-                monthly_closed = []
-                monthly_due = []
-                for m in months_range:
-                    m_start = date(trend_year, m, 1)
-                    m_end = date(trend_year, m, monthrange(trend_year, m)[1])
-                    assigned_cnt = Task.objects.filter(
-                        responsible=single_emp,
-                        created_date__date__gte=m_start,
-                        created_date__date__lte=m_end,
-                    ).count()
-                    completed_cnt = Task.objects.filter(
-                        responsible=single_emp,
-                        status='closed'
-                    ).filter(
-                        Q(close_date__gte=m_start, close_date__lte=m_end) |
-                        Q(completion_date__date__gte=m_start, completion_date__date__lte=m_end)
-                    ).count()
-                    open_cnt = Task.objects.filter(
-                        responsible=single_emp,
-                        status='open',
-                        created_date__date__gte=m_start,
-                        created_date__date__lte=m_end,
-                    ).count()
-                    closed_cnt = completed_cnt
-                    due_cnt = Task.objects.filter(
-                        responsible=single_emp,
-                        status='due',
-                        created_date__date__gte=m_start,
-                        created_date__date__lte=m_end,
-                    ).count()
-                    monthly_assigned.append(assigned_cnt)
-                    monthly_completed.append(completed_cnt)
-                    monthly_open.append(open_cnt)
-                    monthly_closed.append(closed_cnt)
-                    monthly_due.append(due_cnt)
+                employee_months = trends.month_range(date(trend_year, 1, 1), date(trend_year, end_month, 1))
+                month_labels = trends.month_labels(employee_months)
+                # Per-month counts by status: assigned/open/due by creation month, closed in every month its close or completion date falls in
+                employee_tasks = Task.objects.with_effective_status().filter(responsible=single_emp)
+                created = trends.monthly_counts(employee_tasks, 'created_date', employee_months, series={
+                    'assigned': None,
+                    'open': Q(effective_status='open'),
+                    'due': Q(effective_status='due'),
+                })[None]
+                completed = trends.monthly_counts_any(
+                    employee_tasks.filter(effective_status='closed'), ('close_date', 'completion_date'), employee_months,
+                )[None]
+                monthly_assigned = created['assigned']
+                monthly_open = created['open']
+                monthly_closed = completed
+                monthly_due = created['due']
 
                 employee_status_chart_json = _json.dumps({
                     'meta': { 'xaxis': 'months', 'employee': single_emp.get_full_name() or single_emp.username },
@@ -1429,75 +1323,8 @@ class MonthlyEmployeeStatsView(LoginRequiredMixin, View):
         if export_type in ('excel', 'pdf'):
             # Load frontend dictionaries for accurate translations
             is_ar = (export_lang == 'ar')
-            def _load_phrases(lang_code):
-                try:
-                    from django.contrib.staticfiles import finders as _static_finders
-                    import json as _json
-                    from django.conf import settings as _settings
-                    
-                    # Try multiple paths to find the translation files
-                    paths = [
-                        _static_finders.find(f'core/i18n/{lang_code}.json'),
-                        _static_finders.find(f'core/i18n/phrases.{lang_code}.json'),
-                        # Direct static file paths as fallback
-                        os.path.join(_settings.BASE_DIR, 'OpticorAI_Lynx_Project_Management_System', 'static', 'core', 'i18n', f'{lang_code}.json'),
-                        os.path.join(_settings.BASE_DIR, 'OpticorAI_Lynx_Project_Management_System', 'static', 'core', 'i18n', f'phrases.{lang_code}.json'),
-                        os.path.join(_settings.STATIC_ROOT or '', 'core', 'i18n', f'{lang_code}.json'),
-                        os.path.join(_settings.STATIC_ROOT or '', 'core', 'i18n', f'phrases.{lang_code}.json'),
-                    ]
-                    
-                    result = {}
-                    for p in paths:
-                        if p and os.path.isfile(p):
-                            try:
-                                with open(p, 'r', encoding='utf-8') as fh:
-                                    data = _json.load(fh)
-                                    if isinstance(data, dict):
-                                        result.update(data)
-                            except Exception as e:
-                                continue
-                    
-                    return result
-                except Exception as e:
-                    return {}
-            phrases_map = _load_phrases('ar' if is_ar else 'en')
-            def tr(text):
-                if not text:
-                    return ''
-                
-                # CRITICAL: Override any translations found in JSON files for specific headings
-                # Note: These headings should remain in English: "Monthly Employee Statistics", "Charts", "Monthly Status", "Number of Tasks", "Status", "Monthly Task Creation Trend", "Month"
-                english_headings = {
-                    'Monthly Employee Statistics', 'Charts', 'Monthly Status', 
-                    'Number of Tasks', 'Status', 'Monthly Task Creation Trend', 'Month',
-                    'Open', 'Closed', 'Due'
-                }
-                
-                if text in english_headings and is_ar:
-                    return text
-                
-                # Only check JSON translations for non-English headings
-                v = phrases_map.get(text)
-                if isinstance(v, str):
-                    return v
-                
-                # Direct fallback for specific translations if not found in files
-                if is_ar:
-                    fallback_translations = {
-                        'Task Priority Distribution': 'توزيع الأولويات للمهام',
-                        'Employee': 'الموظف',
-                        'Open': 'مفتوح',
-                        'Closed': 'مغلق',
-                        'Due': 'مستحق',
-                        'High': 'عالي',
-                        'Medium': 'متوسط',
-                        'Low': 'منخفض'
-                    }
-                    if text in fallback_translations:
-                        return fallback_translations[text]
-                
-                # Return original text if no translation found
-                return text
+            # Translations are looked up in the cached phrase catalog (no file I/O per export)
+            tr = phrases.get_catalog('ar' if is_ar else 'en').translate
             def fmt_date(d):
                 try:
                     if not d:
@@ -1554,31 +1381,20 @@ class MonthlyEmployeeStatsView(LoginRequiredMixin, View):
             period_label = f"{fmt_date(start_date)} — {fmt_date(end_date)}"
 
             if export_type == 'excel':
-                wb = Workbook()
-                ws = wb.active
-                ws.title = labels['title']
-                try:
-                    ws.sheet_view.rightToLeft = bool(is_ar)
-                except Exception:
-                    pass
-                ws.append([f"{labels['title']} ({period_label})"])
-                ws.append([])
-                headers = labels['headers']
-                ws.append(headers)
-                for r in rows:
-                    ws.append(r)
-                # Totals row
-                ws.append([])
-                ws.append([tr('Totals') or 'Totals', sum(x[1] for x in rows), sum(x[2] for x in rows), aggregate_open, aggregate_closed, aggregate_due, sum(x[6] for x in rows), sum(x[7] for x in rows), sum(x[8] for x in rows), '', '', ''])
-                output = BytesIO()
-                wb.save(output)
-                output.seek(0)
-                response = HttpResponse(output, content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-                response['Content-Disposition'] = f'attachment; filename=monthly_stats_{start_date}_{end_date}.xlsx'
-                return response
+                sheet_rows = [
+                    [f"{labels['title']} ({period_label})"],
+                    [],
+                    labels['headers'],
+                    *rows,
+                    # Totals row
+                    [],
+                    [tr('Totals') or 'Totals', sum(x[1] for x in rows), sum(x[2] for x in rows), aggregate_open, aggregate_closed, aggregate_due, sum(x[6] for x in rows), sum(x[7] for x in rows), sum(x[8] for x in rows), '', '', ''],
+                ]
+                return excel.streaming_response(
+                    f'monthly_stats_{start_date}_{end_date}.xlsx', labels['title'], sheet_rows, right_to_left=is_ar,
+                )
             else:
                 from reportlab.lib.pagesizes import A4
-                from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
                 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image, HRFlowable, PageBreak
                 from reportlab.lib import colors
                 from reportlab.lib.units import inch
@@ -1591,259 +1407,18 @@ class MonthlyEmployeeStatsView(LoginRequiredMixin, View):
 
                 buffer = BytesIO()
                 doc = SimpleDocTemplate(buffer, pagesize=A4, leftMargin=36, rightMargin=36, topMargin=36, bottomMargin=36)
-                styles = getSampleStyleSheet()
-                # Ensure readable fonts; register Arabic fonts if needed
-                header_font_name = 'Helvetica-Bold'
-                _arabic_base_registered = False
-                if is_ar:
-                    try:
-                        from django.contrib.staticfiles import finders as _static_finders
-                        from reportlab.pdfbase import pdfmetrics
-                        from reportlab.pdfbase.ttfonts import TTFont
-                        from django.conf import settings as _settings
-                        
-                        # Font registration for PDF generation
-                        
-                        # Function to create a robust Arabic font registration
-                        def _create_robust_arabic_font():
-                            """Create a robust Arabic font registration using multiple approaches"""
-                            try:
-                                from reportlab.pdfbase import pdfmetrics
-                                from reportlab.pdfbase.ttfonts import TTFont
-                                from reportlab.pdfbase.cidfonts import UnicodeCIDFont
-                                import tempfile
-                                import base64
-                                
-                                # Approach 1: Try to use ReportLab's built-in Unicode fonts
-                                try:
-                                    # Register a Unicode font that can handle Arabic
-                                    pdfmetrics.registerFont(UnicodeCIDFont('Helvetica'))
-                                    return 'Helvetica'
-                                except Exception:
-                                    pass
-                                
-                                # Approach 2: Try to create a minimal Arabic font using built-in fonts
-                                try:
-                                    # Use ReportLab's built-in fonts that have better Unicode support
-                                    # Try to register a font that can handle Arabic characters
-                                    pdfmetrics.registerFont(TTFont('ArabicFallback', 'helvetica.ttf'))
-                                    
-                                    # Validate the font can handle Arabic text
-                                    if _validate_font_arabic_support('ArabicFallback'):
-                                        return 'ArabicFallback'
-                                    else:
-                                        pass
-                                except Exception:
-                                    pass
-                                
-                                # Approach 3: Use system fonts with better Unicode support
-                                try:
-                                    # Try to register Arial Unicode MS if available
-                                    pdfmetrics.registerFont(TTFont('ArialUnicode', 'arialuni.ttf'))
-                                    return 'ArialUnicode'
-                                except Exception:
-                                    pass
-                                
-                                # Approach 4: Use ReportLab's default fonts with Unicode support
-                                try:
-                                    # Register Times-Roman with Unicode support
-                                    pdfmetrics.registerFont(TTFont('TimesUnicode', 'times.ttf'))
-                                    return 'TimesUnicode'
-                                except Exception:
-                                    pass
-                                
-                                # Approach 5: Use the best available built-in font
-                                return 'Helvetica'
-                                
-                            except Exception:
-                                return 'Helvetica'
-                        
-                        # Function to create a simple Arabic text fallback
-                        def _create_arabic_fallback():
-                            """Create a simple fallback that handles Arabic text without external fonts"""
-                            try:
-                                # Use ReportLab's built-in fonts with better Unicode support
-                                from reportlab.pdfbase import pdfmetrics
-                                from reportlab.pdfbase.ttfonts import TTFont
-                                
-                                # Try to use ReportLab's built-in fonts that have better Unicode support
-                                built_in_fonts = ['Helvetica', 'Times-Roman', 'Courier']
-                                for font_name in built_in_fonts:
-                                    try:
-                                        # Test if the font can handle Unicode
-                                        test_paragraph = Paragraph('<para>Test</para>', styles['Normal'])
-                                        # If we get here without error, the font is available
-                                        return font_name
-                                    except:
-                                        continue
-                                
-                                return 'Helvetica'  # Final fallback
-                            except Exception as e:
-                                return 'Helvetica'
-                        
-                        # Enhanced font search with more fallback options
-                        def _first_existing(paths):
-                            for p in paths:
-                                try:
-                                    if p and os.path.isfile(p):
-                                        return p
-                                except Exception:
-                                    pass
-                            return None
-                        
-                        # Get system font paths
-                        win_fonts = os.path.join(os.environ.get('WINDIR', 'C:\\Windows'), 'Fonts')
-                        system_fonts = '/System/Library/Fonts'  # macOS
-                        linux_fonts = '/usr/share/fonts'  # Linux
-                        
-                        # Comprehensive font search paths
-                        reg_font = _first_existing([
-                            # Static fonts
-                            _static_finders.find('core/fonts/DejaVuSans.ttf'),
-                            _static_finders.find('core/fonts/NotoNaskhArabic-Regular.ttf'),
-                            _static_finders.find('core/fonts/Amiri-Regular.ttf'),
-                            # Windows fonts
-                            os.path.join(win_fonts, 'arial.ttf'),
-                            os.path.join(win_fonts, 'arialuni.ttf'),
-                            os.path.join(win_fonts, 'tahoma.ttf'),
-                            os.path.join(win_fonts, 'DejaVuSans.ttf'),
-                            os.path.join(win_fonts, 'NotoNaskhArabic-Regular.ttf'),
-                            os.path.join(win_fonts, 'Amiri-Regular.ttf'),
-                            # macOS fonts
-                            os.path.join(system_fonts, 'Arial.ttf'),
-                            os.path.join(system_fonts, 'Helvetica.ttc'),
-                            # Linux fonts
-                            os.path.join(linux_fonts, 'truetype/dejavu/DejaVuSans.ttf'),
-                            os.path.join(linux_fonts, 'truetype/liberation/LiberationSans-Regular.ttf'),
-                            # Try built-in fonts as last resort
-                            'arial.ttf',
-                            'helvetica.ttf'
-                        ])
-                        
-                        bold_font = _first_existing([
-                            # Static fonts
-                            _static_finders.find('core/fonts/DejaVuSans-Bold.ttf'),
-                            _static_finders.find('core/fonts/NotoNaskhArabic-Bold.ttf'),
-                            _static_finders.find('core/fonts/Amiri-Bold.ttf'),
-                            # Windows fonts
-                            os.path.join(win_fonts, 'arialbd.ttf'),
-                            os.path.join(win_fonts, 'tahomabd.ttf'),
-                            os.path.join(win_fonts, 'DejaVuSans-Bold.ttf'),
-                            os.path.join(win_fonts, 'NotoNaskhArabic-Bold.ttf'),
-                            os.path.join(win_fonts, 'Amiri-Bold.ttf'),
-                            # macOS fonts
-                            os.path.join(system_fonts, 'Arial Bold.ttf'),
-                            os.path.join(system_fonts, 'Helvetica-Bold.ttc'),
-                            # Linux fonts
-                            os.path.join(linux_fonts, 'truetype/dejavu/DejaVuSans-Bold.ttf'),
-                            os.path.join(linux_fonts, 'truetype/liberation/LiberationSans-Bold.ttf'),
-                            # Try built-in fonts as last resort
-                            'arialbd.ttf',
-                            'helvetica-bold.ttf'
-                        ])
-                        
-                        # Register fonts with better error handling
-                        if reg_font:
-                            try:
-                                pdfmetrics.registerFont(TTFont('ArabicBase', reg_font))
-                                styles['Normal'].fontName = 'ArabicBase'
-                                _arabic_base_registered = True
-                            except Exception:
-                                # Try to use a built-in Unicode font
-                                try:
-                                    pdfmetrics.registerFont(TTFont('UnicodeBase', 'arial.ttf'))
-                                    styles['Normal'].fontName = 'UnicodeBase'
-                                    _arabic_base_registered = True
-                                except Exception as e2:
-                                    styles['Normal'].fontName = 'Helvetica'
-                        else:
-                            # Use built-in Unicode-capable fonts
-                            try:
-                                pdfmetrics.registerFont(TTFont('UnicodeBase', 'arial.ttf'))
-                                styles['Normal'].fontName = 'UnicodeBase'
-                                _arabic_base_registered = True
-                            except Exception as e:
-                                # Try direct Arabic font registration as fallback
-                                direct_font = _create_direct_arabic_font()
-                                styles['Normal'].fontName = direct_font
-                                _arabic_base_registered = True
-                        
-                        if bold_font:
-                            try:
-                                pdfmetrics.registerFont(TTFont('ArabicBase-Bold', bold_font))
-                                header_font_name = 'ArabicBase-Bold'
-                                styles['Heading1'].fontName = header_font_name
-                            except Exception as e:
-                                print(f"Failed to register Arabic bold font {bold_font}: {e}")
-                                # Fallback to regular Arabic font for headings
-                                if _arabic_base_registered:
-                                    header_font_name = styles['Normal'].fontName
-                                    styles['Heading1'].fontName = header_font_name
-                                else:
-                                    try:
-                                        pdfmetrics.registerFont(TTFont('UnicodeBase-Bold', 'arialbd.ttf'))
-                                        header_font_name = 'UnicodeBase-Bold'
-                                        styles['Heading1'].fontName = header_font_name
-                                    except:
-                                        styles['Heading1'].fontName = 'Helvetica-Bold'
-                        else:
-                            # Fallback to regular Arabic font for headings to avoid missing glyph squares
-                            if _arabic_base_registered:
-                                header_font_name = styles['Normal'].fontName
-                                styles['Heading1'].fontName = header_font_name
-                            else:
-                                try:
-                                    pdfmetrics.registerFont(TTFont('UnicodeBase-Bold', 'arialbd.ttf'))
-                                    header_font_name = 'UnicodeBase-Bold'
-                                    styles['Heading1'].fontName = header_font_name
-                                except:
-                                    styles['Heading1'].fontName = 'Helvetica-Bold'
-                    except Exception as e:
-                        print(f"Font registration error: {e}")
-                        # Final fallback to built-in fonts
-                        try:
-                            pdfmetrics.registerFont(TTFont('UnicodeBase', 'arial.ttf'))
-                            styles['Normal'].fontName = 'UnicodeBase'
-                            styles['Heading1'].fontName = 'UnicodeBase'
-                            header_font_name = 'UnicodeBase'
-                        except:
-                            styles['Normal'].fontName = 'Helvetica'
-                            styles['Heading1'].fontName = 'Helvetica-Bold'
-                else:
-                    styles['Normal'].fontName = 'Helvetica'
-                styles['Normal'].fontSize = 9
-                brand_style = ParagraphStyle(
-                    'Brand',
-                    parent=styles['Heading1'],
-                    alignment=1,
-                    textColor=colors.HexColor('#0B5ED7'),
-                    fontName=(styles['Heading1'].fontName or header_font_name),
-                    fontSize=20,
-                    leading=24,
-                )
-                title_style = ParagraphStyle(
-                    'CenterTitle',
-                    parent=styles['Heading2'],
-                    alignment=1,
-                    textColor=colors.HexColor('#2c3e50'),
-                    spaceBefore=2,
-                    spaceAfter=6,
-                )
+                # Fonts are registered and styles built once per process
+                report_styles = pdf.report_styles(is_ar)
+                styles = report_styles.styles
+                header_font_name = report_styles.header_font
+                brand_style, title_style = report_styles.brand, report_styles.title
 
                 story = []
                 # Branding: Lynex logo and name (centered, optional)
-                try:
-                    from django.contrib.staticfiles import finders as _static_finders
-                    logo_path = _static_finders.find('core/img/logos/title.jpg')
-                    if not logo_path:
-                        # Fallback to app static path if finders not available in this context
-                        from django.conf import settings as _settings
-                        logo_path = os.path.join(_settings.BASE_DIR, 'OpticorAI_project_management_system', 'core', 'static', 'core', 'img', 'logos', 'title.jpg')
-                    if logo_path and os.path.isfile(logo_path):
-                        story.append(Image(logo_path, width=160, height=42, hAlign='CENTER'))
-                        story.append(Spacer(1, 4))
-                except Exception:
-                    pass
+                logo_path = pdf.logo_path()
+                if logo_path:
+                    story.append(Image(logo_path, width=160, height=42, hAlign='CENTER'))
+                    story.append(Spacer(1, 4))
                 story.append(Paragraph('Lynex', brand_style))
                 story.append(HRFlowable(width='30%', thickness=1, color=colors.HexColor('#0B5ED7'), spaceBefore=4, spaceAfter=8, hAlign='CENTER'))
                 # Enhanced Arabic shaping helper with robust fallbacks
@@ -1854,150 +1429,9 @@ class MonthlyEmployeeStatsView(LoginRequiredMixin, View):
                     text_str = str(txt).strip()
                     if not text_str:
                         return text_str
-                    
-                    # First, try the standard Arabic shaping
-                    try:
-                        import arabic_reshaper  # type: ignore
-                        from bidi.algorithm import get_display  # type: ignore
-                        
-                        # Reshape Arabic text
-                        shaped = arabic_reshaper.reshape(text_str)
-                        if shaped:
-                            result = get_display(shaped)
-                            # Additional validation to prevent malformed text
-                            if result and len(result) > 0:
-                                return result
-                        
-                        return text_str
-                    except ImportError:
-                        # If libraries are not available, try a simple fallback
-                        return _simple_arabic_fallback(text_str)
-                    except Exception:
-                        # Log the error for debugging but return the original text
-                        return _simple_arabic_fallback(text_str)
-                
-                # Function to create a simple Arabic-compatible font
-                def _create_simple_arabic_font():
-                    """Create a simple Arabic-compatible font using ReportLab's built-in capabilities"""
-                    try:
-                        from reportlab.pdfbase import pdfmetrics
-                        from reportlab.pdfbase.ttfonts import TTFont
-                        
-                        # Try to use ReportLab's built-in fonts that can handle Unicode
-                        # Use a font that's known to work with Arabic characters
-                        try:
-                            # Try to register a font that can handle Arabic
-                            pdfmetrics.registerFont(TTFont('SimpleArabic', 'helvetica.ttf'))
-                            
-                            # Test if this font can handle Arabic text
-                            if _validate_font_arabic_support('SimpleArabic'):
-                                return 'SimpleArabic'
-                            else:
-                                pass
-                        except Exception as e:
-                            pass
-                        
-                        # Fallback to standard Helvetica
-                        return 'Helvetica'
-                        
-                    except Exception as e:
-                        return 'Helvetica'
-                
-                # Function to create a direct Arabic font solution
-                def _create_direct_arabic_font():
-                    """Create a direct Arabic font solution that works without external dependencies"""
-                    try:
-                        from reportlab.pdfbase import pdfmetrics
-                        from reportlab.pdfbase.ttfonts import TTFont
-                        
-                        # Try to create a font that can handle Arabic text directly
-                        # Use ReportLab's built-in capabilities
-                        try:
-                            # Register a font using ReportLab's built-in font
-                            pdfmetrics.registerFont(TTFont('DirectArabic', 'helvetica.ttf'))
-                            
-                            # Test the font with Arabic text
-                            if _validate_font_arabic_support('DirectArabic'):
-                                return 'DirectArabic'
-                            else:
-                                pass
-                        except Exception as e:
-                            pass
-                        
-                        # Final fallback - use Helvetica with proper text handling
-                        return 'Helvetica'
-                        
-                    except Exception as e:
-                        pass
-                        return 'Helvetica'
-                
-                # Simple fallback for Arabic text when shaping libraries are not available
-                def _simple_arabic_fallback(text):
-                    """Simple fallback that ensures Arabic text is readable even without proper fonts"""
-                    try:
-                        # Basic Arabic character validation and cleanup
-                        import re
-                        
-                        # Remove any control characters that might cause rendering issues
-                        cleaned = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]', '', text)
-                        
-                        # Ensure the text contains valid Arabic characters
-                        arabic_chars = re.findall(r'[\u0600-\u06FF\u0750-\u077F\u08A0-\u08FF\uFB50-\uFDFF\uFE70-\uFEFF]', cleaned)
-                        if arabic_chars:
-                            return cleaned
-                        else:
-                            return cleaned
-                    except Exception as e:
-                        return str(text)
-                
-                # Function to validate font and test Arabic text rendering
-                def _validate_font_arabic_support(font_name, test_text="مرحبا"):
-                    """Test if a font can render Arabic text properly"""
-                    try:
-                        from reportlab.platypus import Paragraph
-                        from reportlab.lib.styles import ParagraphStyle
-                        from reportlab.lib import colors
-                        
-                        # Create a test paragraph with Arabic text
-                        test_style = ParagraphStyle(
-                            'TestStyle',
-                            fontName=font_name,
-                            fontSize=12,
-                            textColor=colors.black
-                        )
-                        
-                        # Try to create a paragraph with Arabic text
-                        test_paragraph = Paragraph(test_text, test_style)
-                        
-                        # If we get here without error, the font can handle Arabic
-                        return True
-                        
-                    except Exception as e:
-                        return False
-                
-                # Function to create a minimal Arabic font registration
-                def _create_minimal_arabic_font():
-                    """Create a minimal Arabic font registration using built-in fonts"""
-                    try:
-                        from reportlab.pdfbase import pdfmetrics
-                        from reportlab.pdfbase.ttfonts import TTFont
-                        
-                        # Try to register a simple Unicode font that can handle Arabic
-                        # Use ReportLab's built-in fonts with Unicode support
-                        try:
-                            # Try to register Helvetica with Unicode support
-                            pdfmetrics.registerFont(TTFont('HelveticaUnicode', 'helvetica.ttf'))
-                            return 'HelveticaUnicode'
-                        except:
-                            try:
-                                # Try to register Times with Unicode support
-                                pdfmetrics.registerFont(TTFont('TimesUnicode', 'times.ttf'))
-                                return 'TimesUnicode'
-                            except:
-                                # Use standard Helvetica as fallback
-                                return 'Helvetica'
-                    except Exception as e:
-                        return 'Helvetica'
+                    # Reshape + bidi through the process-wide cache
+                    return pdf.shape_arabic(text_str)
+
                 story.append(Paragraph(_ar_shape(labels['title']), title_style))
                 story.append(Paragraph(_ar_shape(f"{labels['period']} {period_label}"), styles['Normal']))
                 story.append(Spacer(1, 8))
@@ -2007,8 +1441,8 @@ class MonthlyEmployeeStatsView(LoginRequiredMixin, View):
                 data = [[Paragraph(_ar_shape(text), styles['Normal']) for text in header_cells]]
 
                 # Convert each data cell to Paragraph to ensure long values wrap
-                for r in rows:
-                    data.append([Paragraph(_ar_shape(str(c)), styles['Normal']) for c in r])
+                for r in pdf.shape_columns(([str(c) for c in r] for r in rows), _ar_shape):
+                    data.append([Paragraph(c, styles['Normal']) for c in r])
 
                 table = Table(
                     data,
@@ -3036,7 +2470,7 @@ class EvaluateTaskView(LoginRequiredMixin, View):
     """
     def get(self, request, task_id):
         user = request.user
-        task = get_object_or_404(Task, id=task_id)
+        task = get_object_or_404(Task.objects.select_related('responsible', 'quality', 'priority'), id=task_id)
         
         if not task.can_user_evaluate(user):
             messages.error(request, 'You do not have permission to evaluate this task.')
@@ -3057,7 +2491,7 @@ class EvaluateTaskView(LoginRequiredMixin, View):
     
     def post(self, request, task_id):
         user = request.user
-        task = get_object_or_404(Task, id=task_id)
+        task = get_object_or_404(Task.objects.select_related('responsible', 'quality', 'priority'), id=task_id)
         
         if not task.can_user_evaluate(user):
             messages.error(request, 'You do not have permission to evaluate this task.')
@@ -3083,7 +2517,7 @@ class EvaluateTaskView(LoginRequiredMixin, View):
                 # best-effort; fallback handled in apply_automatic_evaluation
                 pass
             
-            # Apply automatic evaluation
+            # Apply automatic evaluation in memory; save() writes it in a single UPDATE
             if task.apply_automatic_evaluation():
                 task.evaluated_by = user
                 task.evaluated_date = timezone.now()
@@ -3441,6 +2875,21 @@ class TaskEvaluationSettingsView(LoginRequiredMixin, AdminRequiredMixin, View):
                 'settings': settings
             })
 
+class EvaluationSettingsSimulationView(LoginRequiredMixin, AdminRequiredMixin, View):
+    """
+    What-if preview for evaluation settings - admins only.
+    Rescores every evaluated task in memory with the posted (unsaved) settings
+    and returns score deltas per manager and employee as JSON.
+    """
+    def post(self, request):
+        from core.services.score_simulation import simulate
+
+        candidate = TaskEvaluationSettings.objects.first() or TaskEvaluationSettings()
+        form = TaskEvaluationSettingsForm(request.POST, instance=candidate, user=request.user)
+        if not form.is_valid():
+            return JsonResponse({'errors': form.errors}, status=400)
+        return JsonResponse(simulate(form.instance.as_evaluation_settings()))
+
 # --- Evaluation Demo View ---
 class EvaluationDemoView(LoginRequiredMixin, View):
     """
@@ -3557,29 +3006,9 @@ class UpdateTaskStatusesView(LoginRequiredMixin, View):
         # Only update statuses for this manager's subordinates' tasks
         subordinates = CustomUser.objects.filter(under_supervision=user)
         tasks = Task.objects.filter(responsible__in=subordinates)
-        today = date.today()
-        closed = due = open_ = total_updated = 0
-        # Closed tasks
-        closed_tasks = tasks.filter(percentage_completion__gte=100, status__in=['open', 'due'])
-        for task in closed_tasks:
-            task.status = 'closed'
-            task.save()
-            closed += 1
-            total_updated += 1
-        # Due tasks (past target date)
-        due_tasks = tasks.filter(target_date__lt=today, percentage_completion__lt=100, status='open')
-        for task in due_tasks:
-            task.status = 'due'
-            task.save()
-            due += 1
-            total_updated += 1
-        # Open tasks (not past target date)
-        open_tasks = tasks.filter(target_date__gte=today, percentage_completion__lt=100, status='due')
-        for task in open_tasks:
-            task.status = 'open'
-            task.save()
-            open_ += 1
-            total_updated += 1
+        updates = Task.update_all_statuses(queryset=tasks)
+        closed, due, open_ = updates['closed'], updates['due'], updates['open']
+        total_updated = updates['total_updated']
         if total_updated > 0:
             messages.success(
                 request,
@@ -3804,6 +3233,10 @@ class ProgressReportView(LoginRequiredMixin, View):
         if user.user_type != 'manager':
             messages.error(request, 'Only managers can access progress reports.')
             return redirect('core:dashboard')
+        # Excel/PDF files are built by the export worker (run_export_jobs); the worker replays this request
+        if (request.GET.get('export') in export_jobs.EXPORT_TYPES and request.GET.get('employee')
+                and export_jobs.background_enabled() and not getattr(request, 'export_job', None)):
+            return export_jobs.submit(request, 'progress-report')
         subordinates = CustomUser.objects.filter(under_supervision=user)
         selected_employee_id = request.GET.get('employee')
         start_date = request.GET.get('start_date')
@@ -3839,7 +3272,6 @@ class ProgressReportView(LoginRequiredMixin, View):
                     tasks = tasks.filter(issue_action__icontains=search_query)
 
                 # Compute Employee Progress Score for the filtered period (or all-time if dates not provided)
-                from django.db.models import Avg
                 if start_date and end_date:
                     progress_record = EmployeeProgress.calculate_employee_progress(
                         employee=selected_employee,
@@ -3851,24 +3283,23 @@ class ProgressReportView(LoginRequiredMixin, View):
                         employee_progress_score = progress_record.total_progress_score
                         progress_period_label = f"{start_date} to {end_date}"
                 else:
-                    # Only consider CLOSED & evaluated tasks
-                    eval_tasks = tasks.filter(status='closed', evaluation_status='evaluated', final_score__isnull=False)
-                    manager_kpis = KPI.objects.filter(created_by=user, is_active=True)
-                    total_weighted_score = 0.0
-                    total_weight = 0.0
-                    for kpi in manager_kpis:
-                        kpi_tasks = eval_tasks.filter(kpi=kpi)
-                        # Per-task weighting
-                        if kpi_tasks.exists():
-                            task_count = kpi_tasks.count()
-                            sum_scores = kpi_tasks.aggregate(total=Avg('final_score'))
-                            # Use Sum for scores; Avg used above mistakenly—compute correctly
-                            from django.db.models import Sum as _Sum
-                            sum_scores = kpi_tasks.aggregate(total=_Sum('final_score'))['total'] or 0.0
-                            total_weighted_score += float(sum_scores) * float(kpi.weight)
-                            total_weight += float(kpi.weight) * float(task_count)
-                    if total_weight > 0:
-                        employee_progress_score = round(total_weighted_score / total_weight, 2)
+                    # Only consider CLOSED & evaluated tasks, per-task KPI weighting
+                    manager_kpi_weights = {
+                        kpi.id: float(kpi.weight) for kpi in reference_data.get_snapshot().kpis_for_manager(user.id)
+                    }
+                    kpi_rows = list(tasks.filter(
+                        status='closed', evaluation_status='evaluated', final_score__isnull=False,
+                        kpi_id__in=list(manager_kpi_weights),
+                    ).order_by().values('kpi_id').annotate(task_count=Count('id'), score_sum=Sum('final_score')))
+                    progress = progress_service.weighted_scores(
+                        [selected_employee.id] * len(kpi_rows),
+                        [row['kpi_id'] for row in kpi_rows],
+                        [row['score_sum'] or 0.0 for row in kpi_rows],
+                        manager_kpi_weights,
+                        task_counts=[row['task_count'] for row in kpi_rows],
+                    ).get(selected_employee.id)
+                    if progress and progress.score is not None:
+                        employee_progress_score = progress.score
                         progress_period_label = "All time (based on current filters)"
             except CustomUser.DoesNotExist:
                 selected_employee = None
@@ -3876,76 +3307,8 @@ class ProgressReportView(LoginRequiredMixin, View):
         if export_type and selected_employee:
             # Localization using the same frontend dictionaries for accuracy
             is_ar = (export_lang == 'ar')
-            def _load_phrases(lang_code):
-                try:
-                    from django.contrib.staticfiles import finders as _static_finders
-                    import json as _json
-                    from django.conf import settings as _settings
-                    
-                    # Try multiple paths to find the translation files
-                    paths = [
-                        _static_finders.find(f'core/i18n/{lang_code}.json'),
-                        _static_finders.find(f'core/i18n/phrases.{lang_code}.json'),
-                        # Direct static file paths as fallback
-                        os.path.join(_settings.BASE_DIR, 'OpticorAI_Lynx_Project_Management_System', 'static', 'core', 'i18n', f'{lang_code}.json'),
-                        os.path.join(_settings.BASE_DIR, 'OpticorAI_Lynx_Project_Management_System', 'static', 'core', 'i18n', f'phrases.{lang_code}.json'),
-                        os.path.join(_settings.STATIC_ROOT or '', 'core', 'i18n', f'{lang_code}.json'),
-                        os.path.join(_settings.STATIC_ROOT or '', 'core', 'i18n', f'phrases.{lang_code}.json'),
-                    ]
-                    
-                    result = {}
-                    for p in paths:
-                        if p and os.path.isfile(p):
-                            try:
-                                with open(p, 'r', encoding='utf-8') as fh:
-                                    data = _json.load(fh)
-                                    if isinstance(data, dict):
-                                        result.update(data)
-                            except Exception as e:
-                                continue
-                    
-                    return result
-                except Exception as e:
-                    return {}
-            phrases_map = _load_phrases('ar' if is_ar else 'en')
-            def tr(text):
-                if not text:
-                    return ''
-                
-                # CRITICAL: Override any translations found in JSON files for specific headings
-                # Note: These headings should remain in English: "Monthly Employee Statistics", "Charts", "Monthly Status", "Number of Tasks", "Status", "Monthly Task Creation Trend", "Month"
-                english_headings = {
-                    'Monthly Employee Statistics', 'Charts', 'Monthly Status', 
-                    'Number of Tasks', 'Status', 'Monthly Task Creation Trend', 'Month',
-                    'Open', 'Closed', 'Due'
-                }
-                
-                if text in english_headings and is_ar:
-                    return text
-                
-                # Only check JSON translations for non-English headings
-                v = phrases_map.get(text)
-                if isinstance(v, str):
-                    return v
-                
-                # Direct fallback for specific translations if not found in files
-                if is_ar:
-                    fallback_translations = {
-                        'Task Priority Distribution': 'توزيع الأولويات للمهام',
-                        'Employee': 'الموظف',
-                        'Open': 'مفتوح',
-                        'Closed': 'مغلق',
-                        'Due': 'مستحق',
-                        'High': 'عالي',
-                        'Medium': 'متوسط',
-                        'Low': 'منخفض'
-                    }
-                    if text in fallback_translations:
-                        return fallback_translations[text]
-                
-                # Return original text if no translation found
-                # nested dicts are not used here; fallback
-                return text
+            # Translations are looked up in the cached phrase catalog (no file I/O per export)
+            tr = phrases.get_catalog('ar' if is_ar else 'en').translate
             # Labels via dictionaries to match frontend
             labels = {
                 'title': tr('Progress Report'),
@@ -3989,218 +3352,57 @@ class ProgressReportView(LoginRequiredMixin, View):
                 except Exception:
                     return str(d)
             if export_type == 'excel':
-                # Excel export using openpyxl
-                wb = Workbook()
-                ws = wb.active
-                ws.title = labels['title']
-                # For Arabic, set sheet view RTL so columns render right-to-left in Excel-compatible viewers
-                try:
-                    ws.sheet_view.rightToLeft = bool(is_ar)
-                except Exception:
-                    pass
-                # Summary header
-                ws.append([f"{tr('Progress Report of')} {selected_employee.get_full_name()}"])
-                if start_date and end_date and not progress_period_label:
-                    range_text = f"{start_date} {'إلى' if is_ar else 'to'} {end_date}"
-                    ws.append([f"{labels['period']} {range_text}"])
-                else:
-                    alt = tr('All time (based on current filters)') if is_ar else tr('All time (based on current filters)') or 'All time (based on current filters)'
-                    ws.append([alt])
-                if employee_progress_score is not None:
-                    ws.append([f"{labels['emp_progress_score']} {employee_progress_score}%"])
-                ws.append([])
-                ws.append(labels['columns'])
-                for task in tasks:
-                    status_disp = tr_status(task.get_status_display())
-                    close_date_text = fmt_date(task.close_date) if task.close_date else ''
-                    ws.append([
-                        task.issue_action,
-                        status_disp,
-                        (task.kpi.name if getattr(task, 'kpi', None) else ''),
-                        (task.priority.name if getattr(task, 'priority', None) else '-'),
-                        fmt_date(task.start_date),
-                        close_date_text,
-                        '' if task.final_score is None else task.final_score
-                    ])
-                output = BytesIO()
-                wb.save(output)
-                output.seek(0)
-                filename = f"progress_report_{selected_employee.id}.xlsx"
-                response = HttpResponse(output, content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-                response['Content-Disposition'] = f'attachment; filename={filename}'
-                return response
+                # Excel export using openpyxl in write-only mode; tasks are streamed from the database
+                def sheet_rows():
+                    # Summary header
+                    yield [f"{tr('Progress Report of')} {selected_employee.get_full_name()}"]
+                    if start_date and end_date and not progress_period_label:
+                        range_text = f"{start_date} {'إلى' if is_ar else 'to'} {end_date}"
+                        yield [f"{labels['period']} {range_text}"]
+                    else:
+                        alt = tr('All time (based on current filters)') if is_ar else tr('All time (based on current filters)') or 'All time (based on current filters)'
+                        yield [alt]
+                    if employee_progress_score is not None:
+                        yield [f"{labels['emp_progress_score']} {employee_progress_score}%"]
+                    yield []
+                    yield labels['columns']
+                    for task in tasks.iterator(chunk_size=excel.QUERYSET_CHUNK_SIZE):
+                        status_disp = tr_status(task.get_status_display())
+                        close_date_text = fmt_date(task.close_date) if task.close_date else ''
+                        yield [
+                            task.issue_action,
+                            status_disp,
+                            (task.kpi.name if getattr(task, 'kpi', None) else ''),
+                            (task.priority.name if getattr(task, 'priority', None) else '-'),
+                            fmt_date(task.start_date),
+                            close_date_text,
+                            '' if task.final_score is None else task.final_score
+                        ]
+                return excel.streaming_response(
+                    f"progress_report_{selected_employee.id}.xlsx", labels['title'], sheet_rows(), right_to_left=is_ar,
+                )
             elif export_type == 'pdf':
                 # PDF export using reportlab with wrapping
                 from reportlab.lib.pagesizes import A4
-                from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
                 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image, HRFlowable
                 from reportlab.lib import colors
                 from reportlab.lib.units import inch
                 from reportlab.lib.enums import TA_LEFT
-                from reportlab.pdfbase import pdfmetrics
-                from reportlab.pdfbase.ttfonts import TTFont
 
                 buffer = BytesIO()
                 doc = SimpleDocTemplate(buffer, pagesize=A4, leftMargin=36, rightMargin=36, topMargin=36, bottomMargin=36)
-                styles = getSampleStyleSheet()
-                # Try to use fonts that support Arabic if needed
-                header_font_name = 'Helvetica-Bold'
-                if is_ar:
-                    try:
-                        from django.contrib.staticfiles import finders as _static_finders
-                        from django.conf import settings as _settings
-                        
-                        # Enhanced font search with more fallback options
-                        def _first_existing(paths):
-                            for p in paths:
-                                try:
-                                    if p and os.path.isfile(p):
-                                        return p
-                                except Exception:
-                                    pass
-                            return None
-                        
-                        # Get system font paths
-                        win_fonts = os.path.join(os.environ.get('WINDIR', 'C:\\Windows'), 'Fonts')
-                        system_fonts = '/System/Library/Fonts'  # macOS
-                        linux_fonts = '/usr/share/fonts'  # Linux
-                        
-                        # Comprehensive font search paths
-                        reg_font = _first_existing([
-                            # Static fonts
-                            _static_finders.find('core/fonts/DejaVuSans.ttf'),
-                            _static_finders.find('core/fonts/NotoNaskhArabic-Regular.ttf'),
-                            _static_finders.find('core/fonts/Amiri-Regular.ttf'),
-                            # Windows fonts
-                            os.path.join(win_fonts, 'arial.ttf'),
-                            os.path.join(win_fonts, 'arialuni.ttf'),
-                            os.path.join(win_fonts, 'tahoma.ttf'),
-                            os.path.join(win_fonts, 'DejaVuSans.ttf'),
-                            os.path.join(win_fonts, 'NotoNaskhArabic-Regular.ttf'),
-                            os.path.join(win_fonts, 'Amiri-Regular.ttf'),
-                            os.path.join(win_fonts, 'ARIALUNI.TTF'),
-                            os.path.join(win_fonts, 'segoeui.ttf'),
-                            # macOS fonts
-                            os.path.join(system_fonts, 'Arial.ttf'),
-                            os.path.join(system_fonts, 'Helvetica.ttc'),
-                            # Linux fonts
-                            os.path.join(linux_fonts, 'truetype/dejavu/DejaVuSans.ttf'),
-                            os.path.join(linux_fonts, 'truetype/liberation/LiberationSans-Regular.ttf'),
-                            # Try built-in fonts as last resort
-                            'arial.ttf',
-                            'helvetica.ttf'
-                        ])
-                        
-                        bold_font = _first_existing([
-                            # Static fonts
-                            _static_finders.find('core/fonts/DejaVuSans-Bold.ttf'),
-                            _static_finders.find('core/fonts/NotoNaskhArabic-Bold.ttf'),
-                            _static_finders.find('core/fonts/Amiri-Bold.ttf'),
-                            # Windows fonts
-                            os.path.join(win_fonts, 'arialbd.ttf'),
-                            os.path.join(win_fonts, 'tahomabd.ttf'),
-                            os.path.join(win_fonts, 'DejaVuSans-Bold.ttf'),
-                            os.path.join(win_fonts, 'NotoNaskhArabic-Bold.ttf'),
-                            os.path.join(win_fonts, 'Amiri-Bold.ttf'),
-                            os.path.join(win_fonts, 'segoeuib.ttf'),
-                            # macOS fonts
-                            os.path.join(system_fonts, 'Arial Bold.ttf'),
-                            os.path.join(system_fonts, 'Helvetica-Bold.ttc'),
-                            # Linux fonts
-                            os.path.join(linux_fonts, 'truetype/dejavu/DejaVuSans-Bold.ttf'),
-                            os.path.join(linux_fonts, 'truetype/liberation/LiberationSans-Bold.ttf'),
-                            # Try built-in fonts as last resort
-                            'arialbd.ttf',
-                            'helvetica-bold.ttf'
-                        ])
-                        
-                        # Register fonts with better error handling
-                        if reg_font:
-                            try:
-                                pdfmetrics.registerFont(TTFont('ArabicBase', reg_font))
-                                styles['Normal'].fontName = 'ArabicBase'
-                            except Exception as e:
-                                print(f"Failed to register Arabic font {reg_font}: {e}")
-                                # Try to use a built-in Unicode font
-                                try:
-                                    pdfmetrics.registerFont(TTFont('UnicodeBase', 'arial.ttf'))
-                                    styles['Normal'].fontName = 'UnicodeBase'
-                                except:
-                                    styles['Normal'].fontName = 'Helvetica'
-                        else:
-                            # Use built-in Unicode-capable fonts
-                            try:
-                                pdfmetrics.registerFont(TTFont('UnicodeBase', 'arial.ttf'))
-                                styles['Normal'].fontName = 'UnicodeBase'
-                            except:
-                                styles['Normal'].fontName = 'Helvetica'
-                        
-                        if bold_font:
-                            try:
-                                pdfmetrics.registerFont(TTFont('ArabicBase-Bold', bold_font))
-                                header_font_name = 'ArabicBase-Bold'
-                                styles['Heading1'].fontName = header_font_name
-                                styles['Heading2'].fontName = header_font_name
-                            except Exception as e:
-                                print(f"Failed to register Arabic bold font {bold_font}: {e}")
-                                # Fallback to regular Arabic font for headings
-                                try:
-                                    pdfmetrics.registerFont(TTFont('UnicodeBase-Bold', 'arialbd.ttf'))
-                                    header_font_name = 'UnicodeBase-Bold'
-                                    styles['Heading1'].fontName = header_font_name
-                                    styles['Heading2'].fontName = header_font_name
-                                except:
-                                    styles['Heading1'].fontName = 'Helvetica-Bold'
-                                    styles['Heading2'].fontName = 'Helvetica-Bold'
-                        else:
-                            try:
-                                pdfmetrics.registerFont(TTFont('UnicodeBase-Bold', 'arialbd.ttf'))
-                                header_font_name = 'UnicodeBase-Bold'
-                                styles['Heading1'].fontName = header_font_name
-                                styles['Heading2'].fontName = header_font_name
-                            except:
-                                styles['Heading1'].fontName = 'Helvetica-Bold'
-                                styles['Heading2'].fontName = 'Helvetica-Bold'
-                    except Exception:
-                        styles['Normal'].fontName = 'Helvetica'
-                        styles['Heading1'].fontName = header_font_name
-                        styles['Heading2'].fontName = header_font_name
-                else:
-                    styles['Normal'].fontName = 'Helvetica'
-                    styles['Heading1'].fontName = header_font_name
-                    styles['Heading2'].fontName = header_font_name
-                styles['Normal'].fontSize = 9
-                brand_style = ParagraphStyle(
-                    'Brand',
-                    parent=styles['Heading1'],
-                    alignment=1,
-                    textColor=colors.HexColor('#0B5ED7'),
-                    fontName=(styles['Heading1'].fontName or 'Helvetica-Bold'),
-                    fontSize=20,
-                    leading=24,
-                )
-                title_style = ParagraphStyle(
-                    'CenterTitle',
-                    parent=styles['Heading2'],
-                    alignment=1,
-                    textColor=colors.HexColor('#2c3e50'),
-                    spaceBefore=2,
-                    spaceAfter=6,
-                )
+                # Fonts are registered and styles built once per process
+                report_styles = pdf.report_styles(is_ar, pdf.TITLE_HEADINGS)
+                styles = report_styles.styles
+                header_font_name = report_styles.header_font
+                brand_style, title_style = report_styles.brand, report_styles.title
                 story = []
 
                 # Branding: Lynex logo and name (centered, optional)
-                try:
-                    from django.contrib.staticfiles import finders as _static_finders
-                    _logo = _static_finders.find('core/img/logos/title.jpg')
-                    if not _logo:
-                        from django.conf import settings as _settings
-                        _logo = os.path.join(_settings.BASE_DIR, 'OpticorAI_project_management_system', 'core', 'static', 'core', 'img', 'logos', 'title.jpg')
-                    if _logo and os.path.isfile(_logo):
-                        story.append(Image(_logo, width=160, height=42, hAlign='CENTER'))
-                        story.append(Spacer(1, 4))
-                except Exception:
-                    pass
+                _logo = pdf.logo_path()
+                if _logo:
+                    story.append(Image(_logo, width=160, height=42, hAlign='CENTER'))
+                    story.append(Spacer(1, 4))
 
                 story.append(Paragraph('Lynex', brand_style))
                 story.append(HRFlowable(width='30%', thickness=1, color=colors.HexColor('#0B5ED7'), spaceBefore=4, spaceAfter=8, hAlign='CENTER'))
@@ -4208,12 +3410,8 @@ class ProgressReportView(LoginRequiredMixin, View):
                 def _ar_shape(txt):
                     if not (is_ar and txt):
                         return '' if txt is None else str(txt)
-                    try:
-                        import arabic_reshaper  # type: ignore
-                        from bidi.algorithm import get_display  # type: ignore
-                        return get_display(arabic_reshaper.reshape(str(txt)))
-                    except Exception:
-                        return str(txt)
+                    # Reshape + bidi through the process-wide cache
+                    return pdf.shape_arabic(str(txt))
                 # Title: "Progress Report of {EmployeeName}"
                 title = Paragraph(_ar_shape(f"{tr('Progress Report of')} {selected_employee.get_full_name()}"), title_style)
                 story.append(title)
@@ -4234,18 +3432,22 @@ class ProgressReportView(LoginRequiredMixin, View):
                 story.append(Spacer(1, 12))
                 # Header row
                 data = [[Paragraph(_ar_shape(col), styles['Normal']) for col in labels['columns']]]
+                task_rows = []
                 for task in tasks:
                     status_disp = tr_status(task.get_status_display())
                     close_date_text = fmt_date(task.close_date) if task.close_date else ''
-                    data.append([
-                        Paragraph(_ar_shape(task.issue_action or ''), styles['Normal']),
-                        Paragraph(_ar_shape(status_disp), styles['Normal']),
-                        Paragraph(_ar_shape(task.kpi.name if getattr(task, 'kpi', None) else ''), styles['Normal']),
-                        Paragraph(_ar_shape(task.priority.name if getattr(task, 'priority', None) else '-'), styles['Normal']),
-                        Paragraph(_ar_shape(fmt_date(task.start_date)), styles['Normal']),
-                        Paragraph(_ar_shape(close_date_text), styles['Normal']),
-                        Paragraph(_ar_shape('-' if task.final_score is None else str(int(round(task.final_score)))), styles['Normal']),
+                    task_rows.append([
+                        task.issue_action or '',
+                        status_disp,
+                        task.kpi.name if getattr(task, 'kpi', None) else '',
+                        task.priority.name if getattr(task, 'priority', None) else '-',
+                        fmt_date(task.start_date),
+                        close_date_text,
+                        '-' if task.final_score is None else str(int(round(task.final_score))),
                     ])
+                # Shape column by column: statuses, KPIs, priorities and dates repeat on many rows
+                for row in pdf.shape_columns(task_rows, _ar_shape):
+                    data.append([Paragraph(cell, styles['Normal']) for cell in row])
 
                 table = Table(data, repeatRows=1, colWidths=[2.5*inch, 0.9*inch, 1.0*inch, 0.9*inch, 0.9*inch, 0.9*inch, 1.0*inch])
                 table.setStyle(TableStyle([
@@ -4294,13 +3496,46 @@ class ProgressReportView(LoginRequiredMixin, View):
         }
         return render(request, 'core/progress_report.html', context)
 
+class ExportJobView(LoginRequiredMixin, View):
+    """Status page of a background export; polls the status endpoint until the file is ready."""
+    def get(self, request, job_id):
+        job = get_object_or_404(ExportJob, id=job_id, user=request.user)
+        from urllib.parse import urlencode
+        report_params = {key: value for key, value in job.params.items() if key not in ('export', 'lang')}
+        back_url = reverse(f'core:{job.view_name}') + (f'?{urlencode(report_params)}' if report_params else '')
+        return render(request, 'core/export_job.html', {'job': job, 'job_status': job.as_status(), 'back_url': back_url})
+
+
+class ExportJobStatusView(LoginRequiredMixin, View):
+    def get(self, request, job_id):
+        job = get_object_or_404(ExportJob, id=job_id, user=request.user)
+        return JsonResponse(job.as_status())
+
+
+class ExportJobDownloadView(LoginRequiredMixin, View):
+    def get(self, request, job_id):
+        job = get_object_or_404(ExportJob, id=job_id, user=request.user)
+        fh = export_jobs.open_file(job)
+        if fh is None:
+            raise Http404('This export is not ready or has expired.')
+        return FileResponse(fh, as_attachment=True, filename=job.file_name, content_type=job.content_type or None)
+
+
+class ExportQueueStatusView(LoginRequiredMixin, View):
+    """Queue depth of the background exports (admins only), for monitoring."""
+    def get(self, request):
+        if request.user.user_type != 'admin' and not request.user.is_superuser:
+            return JsonResponse({'error': 'Permission denied'}, status=403)
+        return JsonResponse(export_jobs.queue_depth())
+
+
 class CloseIncompleteTaskView(LoginRequiredMixin, View):
     """
     View for managers to close incomplete tasks with automatic evaluation
     """
     def get(self, request, task_id):
         user = request.user
-        task = get_object_or_404(Task, id=task_id)
+        task = get_object_or_404(Task.objects.select_related('responsible', 'quality', 'priority'), id=task_id)
         
         if not task.can_user_evaluate(user):
             messages.error(request, 'You do not have permission to close this task.')
@@ -4327,7 +3562,7 @@ class CloseIncompleteTaskView(LoginRequiredMixin, View):
     
     def post(self, request, task_id):
         user = request.user
-        task = get_object_or_404(Task, id=task_id)
+        task = get_object_or_404(Task.objects.select_related('responsible', 'quality', 'priority'), id=task_id)
         
         if not task.can_user_evaluate(user):
             messages.error(request, 'You do not have permission to close this task.')
@@ -4470,28 +3705,16 @@ class EmployeeProgressListView(LoginRequiredMixin, View):
         # Build all-employees summary for chart/table (all-time)
         employees_summary = []
         employees_summary_json = []
-        manager_kpis = KPI.objects.filter(created_by=user, is_active=True)
-        for emp in subordinates:
-            emp_tasks = Task.objects.filter(
-                responsible=emp,
-                status='closed',
-                evaluation_status='evaluated',
-                final_score__isnull=False,
-            )
-            total_weighted_score = 0.0
-            total_weight = 0.0
-            for kpi in manager_kpis:
-                kpi_tasks = emp_tasks.filter(kpi=kpi)
-                if kpi_tasks.exists():
-                    from django.db.models import Sum as _Sum
-                    task_count = kpi_tasks.count()
-                    sum_scores = kpi_tasks.aggregate(total=_Sum('final_score'))['total'] or 0.0
-                    total_weighted_score += float(sum_scores) * float(kpi.weight)
-                    total_weight += float(kpi.weight) * float(task_count)
-            score = round(total_weighted_score / total_weight, 2) if total_weight > 0 else None
-            # If a specific employee is selected, restrict the summary to that employee only
-            if selected_employee and emp.id != selected_employee.id:
-                continue
+        summary_employees = [selected_employee] if selected_employee else list(subordinates)
+        # All-time scores: the monthly score rollups of the manager's active KPIs plus undated scored tasks
+        scores = score_rollup.employee_scores(
+            user.id,
+            employee_ids=[emp.id for emp in summary_employees],
+            kpi_ids=[kpi.id for kpi in reference_data.get_snapshot().kpis_for_manager(user.id)],
+            include_undated=True,
+        )
+        for emp in summary_employees:
+            score = scores.get(emp.id)
             employees_summary.append({'employee': emp, 'score': score})
             if score is not None:
                 employees_summary_json.append({'name': emp.get_full_name(), 'score': score})
@@ -4548,15 +3771,19 @@ class EmployeeProgressDetailView(LoginRequiredMixin, View):
                 period_end=period_end
             )
         
-        # Get historical progress records
-        historical_records = EmployeeProgress.objects.filter(
+        # Get historical progress records, bringing stale ones up to date
+        historical_records = list(EmployeeProgress.objects.filter(
             employee=employee,
             manager=user
-        ).order_by('-period_end')[:10]
+        ).defer('progress_breakdown').order_by('-period_end')[:10])
+        for record in historical_records:
+            if record.is_stale:
+                record.recalculate()
         
         context = {
             'employee': employee,
             'progress_record': progress_record,
+            'kpi_task_details': progress_record.kpi_task_details() if progress_record else [],
             'historical_records': historical_records,
             'period_start': period_start,
             'period_end': period_end,
@@ -0,0 +1,73 @@
+"""
+Shared setup of the benchmark scripts: Django with the project's settings
+(dev by default) and, for the scripts that need rows, a throwaway test
+database created and destroyed like the test runner does.
+"""
+
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def setup_django():
+    sys.path.insert(0, ROOT)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'OpticorAI_project_management_system.settings.dev')
+    import django
+
+    django.setup()
+
+
+@contextmanager
+def test_database():
+    """Run the block against a fresh test database (emails go to the locmem backend)."""
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+@contextmanager
+def measure(label, count=None, unit='tasks'):
+    """Print wall time and query count of the block."""
+    from django.db import connection
+
+    queries = 0
+
+    def count_query(execute, sql, params, many, context):
+        nonlocal queries
+        queries += 1
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(count_query):
+        started = time.perf_counter()
+        yield
+        elapsed = time.perf_counter() - started
+    rate = f'  {count / elapsed:12,.0f} {unit}/s' if count else ''
+    print(f'{label:<28} {elapsed * 1000:9.0f} ms  {queries:7,} queries{rate}')
+
+
+def make_team(employees, kpis=0):
+    """A manager, ``employees`` subordinates and ``kpis`` KPIs with weights 10..60, plus evaluation references."""
+    from core.models import KPI, CustomUser, QualityType, TaskPriorityType
+
+    manager = CustomUser.objects.create_user(username='bench-manager', email='manager@bench.invalid', password='x', user_type='manager')
+    CustomUser.objects.bulk_create([
+        CustomUser(username=f'bench-{i}', email=f'employee{i}@bench.invalid', first_name=f'Employee {i}',
+                   user_type='employee', under_supervision=manager)
+        for i in range(employees)
+    ])
+    team = list(CustomUser.objects.filter(under_supervision=manager).order_by('pk'))
+    KPI.objects.bulk_create([KPI(name=f'KPI {i}', weight=10 * (i % 6 + 1), created_by=manager) for i in range(kpis)])
+    quality = QualityType.objects.create(name='Good', percentage=80)
+    priority, _ = TaskPriorityType.objects.update_or_create(code='high', defaults={'name': 'High', 'multiplier': 1.2})
+    return manager, team, list(KPI.objects.filter(created_by=manager).order_by('pk')), quality, priority
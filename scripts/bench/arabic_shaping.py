@@ -0,0 +1,82 @@
+"""
+Benchmark of the Arabic text shaping of the PDF exports: reshape + bidi on
+every cell of every row (as the views did) against pdf.shape_columns with
+the cached pdf.shape_arabic, with a cold and a warm cache. The rows look
+like the progress report's task table; no database is used.
+
+    python scripts/bench/arabic_shaping.py [--rows 2000] [--repeat 1]
+"""
+
+import argparse
+import random
+import time
+from datetime import date, timedelta
+
+from _common import setup_django
+
+setup_django()
+
+import arabic_reshaper  # noqa: E402
+from bidi.algorithm import get_display  # noqa: E402
+
+from core.utils import pdf  # noqa: E402
+
+TASKS = ['مراجعة التقرير الشهري', 'تحديث قاعدة البيانات', 'إعداد عرض العميل', 'متابعة الموردين', 'تدريب الفريق الجديد']
+STATUSES = ['مفتوح', 'مغلق', 'مستحق']
+KPIS = ['جودة العمل', 'الالتزام بالمواعيد', 'رضا العملاء', 'الإنتاجية', 'التطوير المهني', 'العمل الجماعي']
+PRIORITIES = ['عالي', 'متوسط', 'منخفض']
+
+
+def make_rows(count, rng):
+    start = date(2025, 1, 1)
+    return [
+        [
+            f'{rng.choice(TASKS)} {rng.randint(1, count // 10 or 1)}',
+            rng.choice(STATUSES),
+            rng.choice(KPIS),
+            rng.choice(PRIORITIES),
+            str(start + timedelta(days=rng.randint(0, 300))),
+            str(start + timedelta(days=rng.randint(0, 300))),
+            str(rng.randint(40, 100)),
+        ]
+        for _ in range(count)
+    ]
+
+
+def per_cell(rows):
+    return [[get_display(arabic_reshaper.reshape(cell)) or cell for cell in row] for row in rows]
+
+
+def timed(label, func, repeat, count, before=None):
+    elapsed = 0.0
+    for _ in range(repeat):
+        if before:
+            before()
+        started = time.perf_counter()
+        result = func()
+        elapsed += time.perf_counter() - started
+    elapsed /= repeat
+    print(f'{label:<28} {elapsed * 1000:9.1f} ms  {count / elapsed:12,.0f} rows/s')
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=1)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows, random.Random(24))
+    distinct = len({cell for row in rows for cell in row})
+    print(f'{args.rows} rows x {len(rows[0])} columns, {distinct:,} distinct cells, mean of {args.repeat} runs')
+    before = timed('before: every cell', lambda: per_cell(rows), args.repeat, args.rows)
+    cold = timed(
+        'shape_columns, cold cache', lambda: pdf.shape_columns(rows, pdf.shape_arabic), args.repeat, args.rows,
+        before=pdf.shape_arabic.cache_clear,
+    )
+    warm = timed('shape_columns, warm cache', lambda: pdf.shape_columns(rows, pdf.shape_arabic), args.repeat, args.rows)
+    print(f'same output: {before == cold == warm}')
+
+
+if __name__ == '__main__':
+    main()
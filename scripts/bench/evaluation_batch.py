@@ -0,0 +1,77 @@
+"""
+Benchmark of task scoring: compute_automatic_evaluation called per task
+(the loop the batch kernel replaced) against compute_automatic_evaluation_batch
+with numpy and with its pure-Python fallback. No database is used.
+
+    python scripts/bench/evaluation_batch.py [--tasks 20000] [--repeat 5]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'OpticorAI_project_management_system.settings.dev')
+
+import django  # noqa: E402
+
+django.setup()
+
+from core.services import task_service  # noqa: E402
+from core.services.task_service import (  # noqa: E402
+    EvaluationSettings, TaskEvaluationInput, compute_automatic_evaluation, compute_automatic_evaluation_batch,
+)
+
+
+def timed(label, func, repeat, count):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    elapsed = (time.perf_counter() - started) / repeat
+    print(f'{label:<14} {elapsed * 1000:9.1f} ms  {count / elapsed:12,.0f} tasks/s')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--tasks', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    target = date(2025, 1, 15)
+    inputs = [
+        TaskEvaluationInput(
+            rng.choice([40.0, 55.5, 80.0, 100.0]), rng.choice([None, 1.0, 1.2, 1.5]),
+            rng.choice([None, target + timedelta(days=rng.randint(-30, 30))]), target, rng.choice([50, 100]),
+        )
+        for _ in range(args.tasks)
+    ]
+    closures = [rng.random() < 0.2 for _ in inputs]
+    settings = EvaluationSettings(True, True, True, True, 1.0, 10.0, 2.0, 20.0, 20.0)
+    columns = (
+        [data.quality_percentage for data in inputs],
+        [data.priority_multiplier for data in inputs],
+        [data.completion_date.toordinal() if data.completion_date else None for data in inputs],
+        [data.target_date.toordinal() for data in inputs],
+        [data.percentage_completion for data in inputs],
+        closures,
+    )
+
+    print(f'{args.tasks} tasks, mean of {args.repeat} runs')
+    timed('scalar loop', lambda: [
+        compute_automatic_evaluation(data, settings, manager_closure=closure) for data, closure in zip(inputs, closures)
+    ], args.repeat, args.tasks)
+    if task_service.np is not None:
+        timed('batch numpy', lambda: compute_automatic_evaluation_batch(settings, *columns), args.repeat, args.tasks)
+    numpy, task_service.np = task_service.np, None
+    try:
+        timed('batch python', lambda: compute_automatic_evaluation_batch(settings, *columns), args.repeat, args.tasks)
+    finally:
+        task_service.np = numpy
+
+
+if __name__ == '__main__':
+    main()
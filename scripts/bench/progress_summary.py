@@ -0,0 +1,110 @@
+"""
+Benchmark of the all-employees summary of the employee progress page: the
+former exists/count/sum queries per (employee, KPI) against one grouped
+query over the team's tasks and against the score rollups the page reads
+now (score_rollup.employee_scores), plus the whole page through the test
+client. The scores of all three are compared.
+
+    python scripts/bench/progress_summary.py [--employees 10 40] [--kpis 6] [--tasks-per-employee 12]
+"""
+
+import argparse
+from datetime import timedelta
+
+from _common import make_team, measure, setup_django, test_database
+
+setup_django()
+
+from django.db.models import Count, Sum  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from core.models import CustomUser, Task  # noqa: E402
+from core.services import reference_data, score_rollup  # noqa: E402
+
+
+def per_pair_scores(manager, employees):
+    """The former summary: for every employee and KPI, exists(), count() and a Sum aggregate."""
+    scores = {}
+    kpis = reference_data.get_snapshot().kpis_for_manager(manager.id)
+    for emp in employees:
+        emp_tasks = Task.objects.filter(responsible=emp, status='closed', evaluation_status='evaluated', final_score__isnull=False)
+        total_weighted_score = total_weight = 0.0
+        for kpi in kpis:
+            kpi_tasks = emp_tasks.filter(kpi_id=kpi.id)
+            if kpi_tasks.exists():
+                total_weighted_score += float(kpi_tasks.aggregate(total=Sum('final_score'))['total'] or 0.0) * float(kpi.weight)
+                total_weight += float(kpi.weight) * kpi_tasks.count()
+        scores[emp.id] = round(total_weighted_score / total_weight, 2) if total_weight > 0 else None
+    return scores
+
+
+def grouped_scores(manager, employees):
+    """One aggregate grouped by (employee, KPI), weighted in Python."""
+    weights = {kpi.id: float(kpi.weight) for kpi in reference_data.get_snapshot().kpis_for_manager(manager.id)}
+    totals = {}
+    for row in Task.objects.filter(
+        responsible__in=employees, status='closed', evaluation_status='evaluated', final_score__isnull=False,
+        kpi_id__in=list(weights),
+    ).order_by().values('responsible_id', 'kpi_id').annotate(task_count=Count('id'), total=Sum('final_score')):
+        weighted_score, total_weight = totals.get(row['responsible_id'], (0.0, 0.0))
+        totals[row['responsible_id']] = (
+            weighted_score + float(row['total'] or 0.0) * weights[row['kpi_id']],
+            total_weight + weights[row['kpi_id']] * row['task_count'],
+        )
+    return {
+        emp.id: round(totals[emp.id][0] / totals[emp.id][1], 2) if totals.get(emp.id, (0, 0))[1] > 0 else None
+        for emp in employees
+    }
+
+
+def populate(employees, kpis, tasks_per_employee):
+    manager, team, kpi_list, quality, priority = make_team(employees, kpis)
+    now = timezone.now()
+    tasks = [
+        Task(issue_action=f'Task {i}', responsible=emp, kpi=kpi_list[i % len(kpi_list)], quality=quality, priority=priority,
+             status='closed', evaluation_status='evaluated', percentage_completion=100, final_score=40 + (i * 7 + emp.id) % 60,
+             start_date=(now - timedelta(days=90)).date(), target_date=(now - timedelta(days=30)).date(),
+             completion_date=now - timedelta(days=i * 5 % 80))
+        for emp in team for i in range(tasks_per_employee)
+    ]
+    Task.objects.bulk_create(tasks)
+    score_rollup.rebuild()
+    reference_data.invalidate()
+    return manager, team
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--employees', type=int, nargs='+', default=[10, 40])
+    parser.add_argument('--kpis', type=int, default=6)
+    parser.add_argument('--tasks-per-employee', type=int, default=12)
+    args = parser.parse_args()
+
+    with test_database():
+        for employees in args.employees:
+            Task.objects.all().delete()
+            CustomUser.objects.filter(username__startswith='bench-').delete()
+            manager, team = populate(employees, args.kpis, args.tasks_per_employee)
+            reference_data.get_snapshot()
+            print(f'{employees} employees, {args.kpis} KPIs, {args.tasks_per_employee} scored tasks each')
+            with measure('  before: per (employee, KPI)', employees, 'employees'):
+                before = per_pair_scores(manager, team)
+            with measure('  grouped query', employees, 'employees'):
+                grouped = grouped_scores(manager, team)
+            kpi_ids = [kpi.id for kpi in reference_data.get_snapshot().kpis_for_manager(manager.id)]
+            with measure('  score rollups (current)', employees, 'employees'):
+                after = score_rollup.employee_scores(
+                    manager.id, employee_ids=[emp.id for emp in team], kpi_ids=kpi_ids, include_undated=True,
+                )
+            print(f'  same scores: {before == grouped == {emp.id: after.get(emp.id) for emp in team}}')
+            client = Client()
+            client.force_login(manager)
+            client.get('/settings/employee-progress/')  # session and per-process caches
+            with measure('  page (after)'):
+                response = client.get('/settings/employee-progress/')
+            assert response.status_code == 200, response.status_code
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmark of the daily task status sweep: the per-task save() loop it
+replaced against Task.update_all_statuses (one UPDATE per transition and
+one notification batch). Every task is open and past its target date, so
+each run moves all of them to due and notifies their owners.
+
+    python scripts/bench/status_sweep.py [--tasks 1000 5000]
+"""
+
+import argparse
+from datetime import timedelta
+
+from _common import make_team, measure, setup_django, test_database
+
+setup_django()
+
+from core.models import Notification, Task  # noqa: E402
+from core.utils.dates import business_localdate  # noqa: E402
+
+
+def per_task_sweep():
+    """The former sweep (due transition): save() and a notification for every task."""
+    today = business_localdate()
+    for task in Task.objects.filter(target_date__lt=today, percentage_completion__lt=100, status='open'):
+        task.status = 'due'
+        task.save()
+        if task.responsible:
+            Notification.objects.create(
+                recipient=task.responsible, sender=None, link=f'/projects/task/{task.id}/',
+                message=f"Your task '{task.issue_action[:40]}...' is now due (past target date).",
+            )
+
+
+def reset(team, count):
+    Task.objects.all().delete()
+    Notification.objects.all().delete()
+    today = business_localdate()
+    Task.objects.bulk_create([
+        Task(issue_action=f'Task {i}', responsible=team[i % len(team)], status='open', percentage_completion=10,
+             start_date=today - timedelta(days=30), target_date=today - timedelta(days=1))
+        for i in range(count)
+    ])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--tasks', type=int, nargs='+', default=[1000, 5000])
+    parser.add_argument('--employees', type=int, default=50)
+    args = parser.parse_args()
+
+    with test_database():
+        _, team, _, _, _ = make_team(args.employees)
+        for count in args.tasks:
+            print(f'{count:,} tasks, {args.employees} employees')
+            reset(team, count)
+            with measure('  before: save() per task', count):
+                per_task_sweep()
+            reset(team, count)
+            with measure('  after: update_all_statuses', count):
+                Task.update_all_statuses()
+            print(f'  moved to due: {Task.objects.filter(status="due").count():,}, '
+                  f'notifications: {Notification.objects.count():,}')
+
+
+if __name__ == '__main__':
+    main()
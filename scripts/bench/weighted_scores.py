@@ -0,0 +1,90 @@
+"""
+Benchmark of progress_service.weighted_scores on a large task set: numpy
+from arrays, numpy from Python lists (as the views pass query results) and
+the pure-Python fallback, checked to give identical totals. The former
+inline loop (one scan per employee and KPI) is timed on a sample, since
+it is quadratic. No database is used.
+
+    python scripts/bench/weighted_scores.py [--tasks 1000000] [--employees 5000] [--kpis 300]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'OpticorAI_project_management_system.settings.dev')
+
+import django  # noqa: E402
+
+django.setup()
+
+from core.services import progress_service  # noqa: E402
+from core.services.progress_service import weighted_scores  # noqa: E402
+
+
+def legacy_inline(group_ids, kpi_ids, final_scores, kpi_weights):
+    """The loop the views used before: per employee and KPI, filter the tasks and sum them."""
+    totals = {}
+    for group_id in dict.fromkeys(group_ids):
+        weighted_sum = total_weight = 0.0
+        for kpi_id, weight in kpi_weights.items():
+            scores = [s for g, k, s in zip(group_ids, kpi_ids, final_scores) if g == group_id and k == kpi_id]
+            if scores:
+                weighted_sum += sum(scores) * weight
+                total_weight += weight * len(scores)
+        if total_weight:
+            totals[group_id] = weighted_sum / total_weight
+    return totals
+
+
+def timed(label, func, count):
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    print(f'{label:<24} {elapsed * 1000:9.0f} ms  {count / elapsed:14,.0f} tasks/s')
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--tasks', type=int, default=1_000_000)
+    parser.add_argument('--employees', type=int, default=5000)
+    parser.add_argument('--kpis', type=int, default=300)
+    parser.add_argument('--legacy-sample', type=int, default=1000, help='Tasks given to the former inline loop (0: skip).')
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    groups = [rng.randint(1, args.employees) for _ in range(args.tasks)]
+    kpis = [rng.randint(1, args.kpis) for _ in range(args.tasks)]
+    scores = [rng.uniform(0, 110) for _ in range(args.tasks)]
+    # Every seventh KPI is inactive (no weight), as for deactivated KPIs
+    weights = {k: float(rng.choice([10, 20, 25, 40])) for k in range(1, args.kpis + 1) if k % 7}
+
+    print(f'{args.tasks:,} tasks, {args.employees:,} employees, {args.kpis} KPIs')
+    results = []
+    np = progress_service.np
+    if np is not None:
+        arrays = np.array(groups), np.array(kpis), np.array(scores)
+        results.append(timed('numpy, arrays', lambda: weighted_scores(*arrays, weights), args.tasks))
+        results.append(timed('numpy, lists', lambda: weighted_scores(groups, kpis, scores, weights), args.tasks))
+    progress_service.np = None
+    try:
+        results.append(timed('pure Python', lambda: weighted_scores(groups, kpis, scores, weights), args.tasks))
+    finally:
+        progress_service.np = np
+    print('identical totals:', all(result == results[0] for result in results))
+
+    sample = args.legacy_sample
+    if sample:
+        timed(
+            f'former loop ({sample:,})',
+            lambda: legacy_inline(groups[:sample], kpis[:sample], scores[:sample], weights),
+            sample,
+        )
+
+
+if __name__ == '__main__':
+    main()